@@ -0,0 +1,85 @@
+"""Benchmarks the client stack against the local mock server.
+
+Run with: python benchmarks/bench_client.py
+"""
+
+import statistics
+import time
+
+from spaceterminal import space
+from spaceterminal.cache import ResponseCache
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.constants import URL
+from spaceterminal.mockserver import MockServer
+
+FLEET_SIZES = [1000, 5000]
+LATENCY = 0.02
+REQUESTS = 200
+
+# The real rate limit would make every run take minutes, so it is lifted to measure
+# the overhead of the client stack itself.
+UNLIMITED = RequestScheduler(per_second=1_000_000, burst=1_000_000)
+
+
+def new_client() -> Client:
+    """Creates a client without a response cache, so every call is a request."""
+    return Client("mock-token", cache=ResponseCache({}), scheduler=UNLIMITED)
+
+
+def bench_fleet(size: int) -> None:
+    """Fetches every page of a fleet, sequentially and concurrently."""
+    with MockServer(ships=size, latency=LATENCY) as server:
+        URL.set_base(server.base_url)
+        for workers in (1, 4, 8):
+            client = new_client()
+            start = time.perf_counter()
+            pages = list(space.get_pages(client, URL.SHIPS, max_workers=workers))
+            elapsed = time.perf_counter() - start
+            ships = sum(len(page["data"]) for page in pages)
+            print(
+                f"{size:>6} ships {workers:>2} workers {elapsed:>7.2f} s "
+                f"{len(pages) / elapsed:>7.1f} pages/s {ships / elapsed:>8.0f} ships/s "
+                f"{client.connections_opened:>3} connections"
+            )
+            client.close()
+
+
+def bench_latency() -> None:
+    """Measures the latency added by the client, without server latency."""
+    with MockServer() as server:
+        URL.set_base(server.base_url)
+        client = new_client()
+        client.get(URL.AGENT)
+        times = []
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            client.get(URL.AGENT)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        print(
+            f"GET /my/agent x{REQUESTS}: p50 {statistics.median(times) * 1000:.2f} ms "
+            f"p95 {times[int(len(times) * 0.95)] * 1000:.2f} ms "
+            f"max {times[-1] * 1000:.2f} ms"
+        )
+
+        client = Client("mock-token", scheduler=UNLIMITED)
+        client.get(URL.AGENT)
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            client.get(URL.AGENT)
+        elapsed = time.perf_counter() - start
+        print(f"GET /my/agent x{REQUESTS} cached: {elapsed / REQUESTS * 1e6:.1f} us")
+
+
+def main() -> None:
+    base = URL.BASE
+    try:
+        bench_latency()
+        for size in FLEET_SIZES:
+            bench_fleet(size)
+    finally:
+        URL.set_base(base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmarks planning routes across a synthetic galaxy.
+
+Run with: python benchmarks/bench_navigation.py
+"""
+
+import random
+import statistics
+import time
+
+from spaceterminal.navigation import RoutePlanner
+from spaceterminal.synthetic import make_galaxy
+
+SYSTEMS = 10_000
+QUERIES = 50
+# Fuel capacity of a ship, and the fraction of systems that sell fuel.
+FUEL_CAPACITY = 400
+REFUEL_RATIO = 0.3
+
+
+def main() -> None:
+    rng = random.Random(0)
+    start = time.perf_counter()
+    systems = make_galaxy(SYSTEMS, waypoints=0)
+    points = {system["symbol"]: (system["x"], system["y"]) for system in systems}
+    refuel = {symbol for symbol in points if rng.random() < REFUEL_RATIO}
+    planner = RoutePlanner(points, refuel)
+    print(f"built planner of {SYSTEMS} systems in {time.perf_counter() - start:.2f} s")
+
+    symbols = list(points)
+    times = []
+    legs = []
+    unreachable = 0
+    for _ in range(QUERIES):
+        origin, destination = rng.sample(symbols, 2)
+        start = time.perf_counter()
+        route = planner.plan(
+            origin, destination, speed=30, fuel=FUEL_CAPACITY, fuel_capacity=400
+        )
+        times.append(time.perf_counter() - start)
+        if route is None:
+            unreachable += 1
+        else:
+            legs.append(len(route.legs))
+
+    times.sort()
+    print(f"{QUERIES} queries, {unreachable} unreachable")
+    print(f"median legs {statistics.median(legs)}")
+    print(
+        f"median {statistics.median(times) * 1000:.1f} ms, "
+        f"p95 {times[int(len(times) * 0.95)] * 1000:.1f} ms, "
+        f"max {times[-1] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmarks the JSON tree builder against the recursive one it replaced.
+
+The recursive builder highlighted the label of every value again each time it was
+added, and set the label of each node after adding it. The labels of values are now
+cached, each node is added with its label, and the tree is built from a stack.
+Each fleet is added eagerly with an empty label cache, then once more, like a
+refresh that adds the tree again, and finally nested data deeper than the recursion
+limit is added, which the recursive builder can't do.
+
+Run with: python benchmarks/bench_render.py
+"""
+
+import time
+
+from rich.highlighter import ReprHighlighter
+from rich.text import Text
+from textual.widgets import Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal.synthetic import make_fleet
+
+FLEET_SIZES = [1000, 5000]
+DEPTH = 5000
+
+
+def recursive_add_json(node, json_data: object, name: str = "Ships") -> None:
+    """Adds JSON data to a node, like add_json did before labels were cached."""
+    highlighter = ReprHighlighter()
+
+    def add_node(name: str, node, data: object) -> None:
+        node.data = data
+        if isinstance(data, dict):
+            node.set_label(Text(f"{{}} {name}"))
+            for key, value in data.items():
+                add_node(key, node.add(""), value)
+        elif isinstance(data, list):
+            node.set_label(Text(f"[] {name}"))
+            for index, value in enumerate(data):
+                add_node(jt.item_name(index, value), node.add(""), value)
+        else:
+            node.allow_expand = False
+            if name:
+                node.set_label(
+                    Text.assemble(
+                        Text.from_markup(f"[b]{name}[/b]="), highlighter(repr(data))
+                    )
+                )
+            else:
+                node.set_label(Text(repr(data)))
+
+    add_node(name, node, json_data)
+
+
+def timed(add, data: object) -> float:
+    """Adds data to a new tree, and gets the milliseconds taken."""
+    node = Tree("Root").root.add("")
+    start = time.perf_counter()
+    add(node, data)
+    return (time.perf_counter() - start) * 1000
+
+
+def nested(depth: int) -> dict:
+    data = value = {}
+    for _ in range(depth):
+        value["next"] = value = {}
+    value["end"] = True
+    return data
+
+
+def main() -> None:
+    print(f"{'ships':>6} {'recursive':>10} {'cold':>10} {'warm':>10} {'hit rate':>9}")
+    for size in FLEET_SIZES:
+        ships = make_fleet(size)
+        recursive = timed(recursive_add_json, ships)
+        jt.value_label.cache_clear()
+        cold = timed(jt.add_json, ships)
+        warm = timed(jt.add_json, ships)
+        info = jt.value_label.cache_info()
+        rate = info.hits / (info.hits + info.misses)
+        print(f"{size:>6} {recursive:>10.1f} {cold:>10.1f} {warm:>10.1f} {rate:>9.0%}")
+    print("(milliseconds)")
+
+    data = nested(DEPTH)
+    try:
+        result = f"{timed(recursive_add_json, data):.1f} ms"
+    except RecursionError:
+        result = "RecursionError"
+    print(f"depth {DEPTH}: recursive {result}, stack {timed(jt.add_json, data):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmarks the ships pipeline offline, by replaying a recorded session.
+
+Without a log, a session is first recorded against the mock server. A log recorded
+from the real API, with SPACETERMINAL_RECORD or the daemon's --record, can be given
+instead, to profile with real data and timing.
+
+Run with: python benchmarks/bench_replay.py [log]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from textual.widgets import Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal import space
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.constants import URL
+from spaceterminal.mockserver import MockServer
+from spaceterminal.recording import Recorder, ReplayAdapter, read_log
+
+SHIPS = 1000
+LATENCY = 0.05
+SPEEDS = [1, 10, 0]
+
+
+def record(path: str) -> None:
+    base = URL.BASE
+    recorder = Recorder(path)
+    with MockServer(ships=SHIPS, latency=LATENCY) as server:
+        URL.set_base(server.base_url)
+        try:
+            scheduler = RequestScheduler(per_second=1000, burst=1000)
+            client = Client("mock-token", scheduler=scheduler, recorder=recorder)
+            list(space.get_my_ships_pages(client))
+        finally:
+            URL.set_base(base)
+    recorder.close()
+
+
+def replay(path: str, speed: float) -> tuple[float, float, int]:
+    """Fetches the pages of ships from the log, and builds the Ships tree from them.
+
+    Returns:
+        A tuple of (fetch seconds, tree seconds, ships).
+    """
+    client = Client("mock-token", replay=ReplayAdapter(path, speed))
+    start = time.perf_counter()
+    ships = []
+    for page in space.get_my_ships_pages(client):
+        ships.extend(page["data"])
+    fetched = time.perf_counter()
+    jt.add_json(Tree("Root").root.add("Ships"), ships, lazy=True)
+    return fetched - start, time.perf_counter() - fetched, len(ships)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(directory, "log")
+        if len(sys.argv) <= 1:
+            record(path)
+        entries = read_log(path)
+        print(f"{len(entries)} requests, {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{'speed':>6} {'ships':>6} {'fetch ms':>10} {'tree ms':>10}")
+        for speed in SPEEDS:
+            fetch, tree, ships = replay(path, speed)
+            print(f"{speed:>6} {ships:>6} {fetch * 1000:>10.1f} {tree * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmarks showing the last session from a snapshot, against loading every page.
+
+The pages are loaded from the mock server with 50 ms of latency, like a session
+starting with an empty cache.
+
+Run with: python benchmarks/bench_snapshot.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from spaceterminal import space as s
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.constants import URL
+from spaceterminal.mockserver import MockServer
+from spaceterminal.snapshots import SnapshotStore
+
+SHIP_COUNTS = [100, 1000, 5000]
+
+
+def main() -> None:
+    print(
+        f"{'ships':>6} {'pages ms':>10} {'save ms':>8} {'KB':>7} {'raw KB':>7} "
+        f"{'load ms':>8}"
+    )
+    base = URL.BASE
+    for count in SHIP_COUNTS:
+        with MockServer(ships=count, latency=0.05) as server:
+            URL.set_base(server.base_url)
+            try:
+                client = Client(
+                    "mock-token",
+                    scheduler=RequestScheduler(per_second=1000, burst=1000),
+                )
+                start = time.perf_counter()
+                ships = [
+                    ship
+                    for page in s.get_my_ships_pages(client)
+                    for ship in page["data"]
+                ]
+                pages = time.perf_counter() - start
+
+                with tempfile.TemporaryDirectory() as directory:
+                    store = SnapshotStore(directory)
+                    start = time.perf_counter()
+                    store.save("mock-token", "ships", ships)
+                    save = time.perf_counter() - start
+                    size = os.path.getsize(store.path("mock-token"))
+
+                    start = time.perf_counter()
+                    loaded = SnapshotStore(directory).load("mock-token")
+                    load = time.perf_counter() - start
+                    assert loaded["ships"]["data"] == ships
+            finally:
+                URL.set_base(base)
+        raw = len(json.dumps(ships, separators=(",", ":")))
+        print(
+            f"{count:>6} {pages * 1000:>10.0f} {save * 1000:>8.1f} {size / 1024:>7.0f} "
+            f"{raw / 1024:>7.0f} {load * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
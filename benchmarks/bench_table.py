@@ -0,0 +1,118 @@
+"""Benchmarks the ships table against the Ships tree, for large fleets.
+
+Each page of 20 ships is added as it would arrive, then the table is filtered,
+sorted, and refreshed with a tenth of the ships changed. The times include drawing
+the next frame, which is when the table measures its new rows, so a redraw of the
+table without any change is given for comparison. Adding a page should cost about
+the same whatever the size of the fleet, as only the visible rows are drawn.
+
+Run with: python benchmarks/bench_table.py
+"""
+
+import asyncio
+import dataclasses
+import statistics
+import time
+
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable, Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal.fleetview import COLUMNS, FleetView
+from spaceterminal.models import Ship
+from spaceterminal.synthetic import make_fleet
+
+FLEET_SIZES = [1000, 5000]
+PAGE_SIZE = 20
+
+
+class BenchApp(App):
+    def compose(self) -> ComposeResult:
+        yield DataTable()
+        yield Tree("Root")
+
+
+async def timed(pilot, func) -> float:
+    """Runs func and draws the next frame, and gets the milliseconds taken."""
+    start = time.perf_counter()
+    func()
+    await pilot.pause()
+    return (time.perf_counter() - start) * 1000
+
+
+async def bench(size: int) -> dict:
+    data = make_fleet(size)
+    pages = [data[i : i + PAGE_SIZE] for i in range(0, size, PAGE_SIZE)]
+    fleet = FleetView()
+    results = {}
+    app = BenchApp()
+    async with app.run_test(size=(140, 50)) as pilot:
+        table = app.query_one(DataTable)
+        for key, label in COLUMNS:
+            table.add_column(label, key=key)
+
+        def add_page(page: list) -> None:
+            for symbol in fleet.update(Ship.from_json(ship) for ship in page):
+                table.add_row(*fleet.cells[symbol], key=symbol)
+
+        times = [await timed(pilot, lambda: add_page(page)) for page in pages]
+        results["redraw"] = statistics.median(
+            [await timed(pilot, table.refresh) for _ in range(5)]
+        )
+        results["first page"] = times[0]
+        results["last pages"] = statistics.median(times[-10:])
+
+        def rebuild(text: str) -> None:
+            fleet.set_filter(text)
+            table.clear()
+            for symbol in fleet.visible():
+                table.add_row(*fleet.cells[symbol], key=symbol)
+
+        results["filter"] = await timed(pilot, lambda: rebuild("docked"))
+        results["unfilter"] = await timed(pilot, lambda: rebuild(""))
+
+        def sort() -> None:
+            fleet.sort_by("fuel")
+            table.sort("symbol", key=fleet.sort_key, reverse=fleet.reverse)
+
+        results["sort"] = await timed(pilot, sort)
+
+        def refresh() -> None:
+            ships = [fleet.ships[symbol] for symbol in list(fleet.ships)[::10]]
+            changed = fleet.update(
+                dataclasses.replace(
+                    ship, fuel=dataclasses.replace(ship.fuel, current=0)
+                )
+                for ship in ships
+            )
+            for symbol in changed:
+                table.update_cell(symbol, "fuel", fleet.cells[symbol][4])
+
+        results["refresh"] = await timed(pilot, refresh)
+
+        tree = app.query_one(Tree)
+
+        def add_tree() -> None:
+            node = tree.root.add("Ships")
+            jt.add_json(node, pages[0], lazy=True)
+            for page in pages[1:]:
+                jt.add_json_items(node, page, len(node.children), lazy=True)
+            tree.root.expand()
+
+        results["tree"] = await timed(pilot, add_tree)
+    return results
+
+
+def main() -> None:
+    columns = None
+    for size in FLEET_SIZES:
+        results = asyncio.run(bench(size))
+        if columns is None:
+            columns = list(results)
+            print(f"{'ships':>6} " + " ".join(f"{name:>12}" for name in columns))
+        print(f"{size:>6} " + " ".join(f"{results[name]:>12.1f}" for name in columns))
+    print("(milliseconds)")
+
+
+if __name__ == "__main__":
+    main()
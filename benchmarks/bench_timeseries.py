@@ -0,0 +1,58 @@
+"""Benchmarks querying months of per-minute samples from the time-series store.
+
+The samples are written straight to the file, since appending them one by one would
+take longer than the queries being measured.
+
+Run with: python benchmarks/bench_timeseries.py
+"""
+
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from spaceterminal.timeseries import DAY, SAMPLE, TimeSeriesStore
+
+DAY_COUNTS = [30, 90, 365]
+
+
+def main() -> None:
+    print(
+        f"{'days':>6} {'samples':>10} {'MB':>6} {'last day ms':>12} "
+        f"{'sparkline ms':>13} {'append ms':>10}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        store = TimeSeriesStore(directory, raw_retention=400 * DAY)
+        for days in DAY_COUNTS:
+            series = store.series(f"credits-{days}")
+            count = days * 24 * 60
+            now = time.time()
+            samples = np.empty(count, SAMPLE)
+            samples["time"] = now - np.arange(count)[::-1] * 60
+            samples["value"] = np.cumsum(np.random.default_rng(0).normal(size=count))
+            samples.tofile(series.raw_path)
+            size = samples.nbytes / 1e6
+            del samples
+
+            start = time.perf_counter()
+            series.read(now - DAY, now)
+            last_day = time.perf_counter() - start
+
+            start = time.perf_counter()
+            series.recent(days * DAY, 80)
+            sparkline = time.perf_counter() - start
+
+            start = time.perf_counter()
+            series.append(0)
+            append = time.perf_counter() - start
+            print(
+                f"{days:>6} {count:>10} {size:>6.1f} {last_day * 1000:>12.2f} "
+                f"{sparkline * 1000:>13.2f} {append * 1000:>10.2f}"
+            )
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Peak memory: {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmarks ranking trade routes over synthetic markets.
+
+Run with: python benchmarks/bench_trade.py
+"""
+
+import random
+import time
+
+import numpy as np
+
+from spaceterminal.synthetic import make_market
+from spaceterminal.trade import MarketSnapshot
+
+MARKET_COUNTS = [500, 1000, 2000, 5000]
+# Markets per system, the rest of the markets are in other systems.
+MARKETS_PER_SYSTEM = 5
+
+
+def make_snapshot(count: int) -> MarketSnapshot:
+    rng = random.Random(0)
+    markets = [
+        f"X1-S{index // MARKETS_PER_SYSTEM}-W{index % MARKETS_PER_SYSTEM}"
+        for index in range(count)
+    ]
+    trade_goods = [make_market(market)["tradeGoods"] for market in markets]
+    goods = sorted({good["symbol"] for market in trade_goods for good in market})
+    good_index = {good: index for index, good in enumerate(goods)}
+
+    purchase = np.full((count, len(goods)), np.nan, np.float32)
+    sell = np.full((count, len(goods)), np.nan, np.float32)
+    for market, market_goods in enumerate(trade_goods):
+        for good in market_goods:
+            purchase[market, good_index[good["symbol"]]] = good["purchasePrice"]
+            sell[market, good_index[good["symbol"]]] = good["sellPrice"]
+
+    systems = np.arange(count) // MARKETS_PER_SYSTEM
+    system_positions = {
+        system: (rng.randint(-5000, 5000), rng.randint(-5000, 5000))
+        for system in set(systems)
+    }
+    positions = np.array(
+        [
+            (*system_positions[system], rng.randint(-100, 100), rng.randint(-100, 100))
+            for system in systems
+        ],
+        np.float32,
+    )
+    return MarketSnapshot(markets, goods, purchase, sell, positions, systems)
+
+
+def main() -> None:
+    print(f"{'markets':>8} {'pairs':>10} {'rank ms':>10}")
+    for count in MARKET_COUNTS:
+        snapshot = make_snapshot(count)
+        start = time.perf_counter()
+        snapshot.rank_routes(60, 400, speed=30)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8} {count * (count - 1):>10} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,17 @@ from spaceterminal.constants import URL
 class Agent:
     """Holds my agent information."""
 
+    __slots__ = (
+        "client",
+        "account_id",
+        "symbol",
+        "headquarters",
+        "my_credits",
+        "starting_faction",
+        "last_updated",
+        "error",
+    )
+
     def __init__(self, client: Client):
         self.client = client
         self.account_id: str = "Not loaded yet"
@@ -24,7 +35,7 @@ class Agent:
 
         https://api.spacetraders.io/v2/my/agent
         """
-        return self.client.session.get(URL.AGENT)
+        return self.client.get(URL.AGENT)
 
     def update_agent(self, response: requests.Response = None) -> None:
         """Updates my agent information.
@@ -41,26 +52,33 @@ class Agent:
         if response is None:
             response = self.get_agent_response()
         # TODO Error checking
+        json = response.json()
 
         if (
             response.status_code == requests.codes.ok
             or response.status_code == requests.codes.created
         ):
             # This accounts for the response when creating account having different json.
-            if "agent" in response.json()["data"]:
-                agent = response.json()["data"]["agent"]
+            if "agent" in json["data"]:
+                self.update_from_json(json["data"]["agent"])
             else:
-                agent = response.json()["data"]
-
-            self.account_id = agent["accountId"]
-            self.symbol = agent["symbol"]
-            self.headquarters = agent["headquarters"]
-            self.my_credits = agent["credits"]
-            self.starting_faction = agent["startingFaction"]
-            self.last_updated = datetime.datetime.now()
-            self.error = None
-        elif "error" in response.json():
-            self.error = response.json()["error"]
+                self.update_from_json(json["data"])
+        elif "error" in json:
+            self.error = json["error"]
+
+    def update_from_json(self, agent: dict) -> None:
+        """Updates my agent information from the decoded agent JSON.
+
+        Args:
+            agent: The agent data of a response.
+        """
+        self.account_id = agent["accountId"]
+        self.symbol = agent["symbol"]
+        self.headquarters = agent["headquarters"]
+        self.my_credits = agent["credits"]
+        self.starting_faction = agent["startingFaction"]
+        self.last_updated = datetime.datetime.now()
+        self.error = None
 
     def register_agent(self, symbol: str = "", faction: str = "COSMIC") -> None:
         """Registers a new agent.
@@ -71,13 +89,28 @@ class Agent:
             symbol: The unique call sign associated with agent identity.
             faction: The starting faction, which determines which system you start in.
         """
-        payload = {"symbol": symbol, "faction": faction.upper()}
-        response = self.client.session.post(URL.REGISTER, json=payload)
+        response = self.client.post(
+            URL.REGISTER, json=self.register_payload(symbol, faction)
+        )
+        self.update_registered_agent(response)
+
+    @staticmethod
+    def register_payload(symbol: str = "", faction: str = "COSMIC") -> dict:
+        """Gets the JSON payload for the register agent endpoint."""
+        return {"symbol": symbol, "faction": faction.upper()}
+
+    def update_registered_agent(self, response: requests.Response) -> None:
+        """Updates the client access token and agent from a register agent response.
+
+        Args:
+            response: The requests response from the register agent endpoint.
+        """
+        json = response.json()
 
         if response.status_code == requests.codes.created:
-            self.client.access_token = response.json()["data"]["token"]
-            self.update_agent(response)
+            self.client.access_token = json["data"]["token"]
+            self.update_from_json(json["data"]["agent"])
             # TODO The response from register contains contract, faction, and ship data too.
             # That should be updated here as well.
-        elif "error" in response.json():
-            self.error = response.json()["error"]
+        elif "error" in json:
+            self.error = json["error"]
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from spaceterminal.constants import URL
+
+# Seconds a response stays fresh, by endpoint path. The longest matching path wins.
+TTLS = {
+    "": 5 * 60,
+    "/factions": 60 * 60,
+    "/my/agent": 10,
+    "/my/ships": 15,
+    "/my/contracts": 60,
+}
+
+
+class CacheEntry:
+    """A cached response, and when it stops being fresh."""
+
+    __slots__ = ("response", "expires")
+
+    def __init__(self, response: requests.Response, expires: float):
+        self.response = response
+        self.expires = expires
+
+    @property
+    def validators(self) -> dict:
+        """Headers to revalidate the response with the server once it has expired."""
+        headers = {}
+        if "ETag" in self.response.headers:
+            headers["If-None-Match"] = self.response.headers["ETag"]
+        if "Last-Modified" in self.response.headers:
+            headers["If-Modified-Since"] = self.response.headers["Last-Modified"]
+        return headers
+
+
+class ResponseCache:
+    """Caches GET responses by access token and URL.
+
+    Each endpoint has its own time to live, see TTLS. Expired responses are kept, so
+    they can be revalidated with the server instead of downloaded again. The least
+    recently used response is dropped once there are more than max_entries.
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = 1024):
+        self.ttls = TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(access_token: str, url: str, params: dict = None) -> tuple:
+        """Gets the cache key of a request."""
+        prepared = requests.Request("GET", url, params=params).prepare()
+        return access_token, prepared.url
+
+    def ttl(self, url: str) -> float:
+        """Gets the number of seconds a response from the URL stays fresh."""
+        path = url.removeprefix(URL.BASE).split("?")[0].rstrip("/")
+        best = None
+        for prefix in self.ttls:
+            if path == prefix or (prefix and path.startswith(f"{prefix}/")):
+                if best is None or len(prefix) > len(best):
+                    best = prefix
+        return 0 if best is None else self.ttls[best]
+
+    def lookup(self, key: tuple) -> tuple[CacheEntry, bool]:
+        """Gets a cached response, counting it as a hit when it is still fresh.
+
+        Returns:
+            A tuple of the entry, or None if there isn't one, and if it is fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and entry.expires > time.monotonic()
+            if fresh:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+            return entry, fresh
+
+    def store(self, key: tuple, response: requests.Response) -> None:
+        """Caches a response, if its endpoint is cacheable."""
+        ttl = self.ttl(key[1])
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = CacheEntry(response, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: tuple) -> CacheEntry:
+        """Marks an expired response as fresh again, after the server confirmed it."""
+        with self._lock:
+            entry = self._entries[key]
+            entry.expires = time.monotonic() + self.ttl(key[1])
+            self.revalidations += 1
+            return entry
+
+    def invalidate(self, access_token: str, *urls: str) -> None:
+        """Drops the cached responses of an access token.
+
+        Args:
+            access_token: The access token the responses were cached for.
+            *urls: Only drop the responses of these URLs, and the URLs below them.
+                If none are given, every response of the access token is dropped.
+        """
+        prefixes = [url.rstrip("/") for url in urls]
+        with self._lock:
+            for key in list(self._entries):
+                token, url = key
+                if token != access_token:
+                    continue
+                if not prefixes or any(
+                    url.split("?")[0].rstrip("/") == prefix
+                    or url.startswith(f"{prefix}/")
+                    or url.startswith(f"{prefix}?")
+                    for prefix in prefixes
+                ):
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Gets the hit and miss statistics of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "revalidations": self.revalidations,
+                "invalidations": self.invalidations,
+            }
@@ -1,5 +1,259 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from enum import IntEnum
+
+import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
-from requests_ratelimiter import LimiterSession
+
+from spaceterminal.cache import ResponseCache
+from spaceterminal.metrics import (
+    CACHE_HITS,
+    LIMITER_WAIT_SECONDS,
+    RATE_LIMITED,
+    REQUEST_ERRORS,
+    REQUEST_SECONDS,
+    REQUESTS,
+    RETRIES,
+    endpoint,
+)
+from spaceterminal.recording import Recorder, ReplayAdapter, retry_after_value
+
+# SpaceTraders allows 2 requests per second, with bursts of up to 10 seconds worth.
+# These are only the starting values, they are adapted to the rate limit headers.
+PER_SECOND = 2
+BURST = 10
+
+# A request that failed with a status like 502 may still have been handled, so only
+# requests that can safely be sent twice are retried. A 429 is never handled.
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+class Priority(IntEnum):
+    """Priority of a request, the lower value is sent first."""
+
+    USER = 0
+    BACKGROUND = 1
+
+
+PRIORITY = contextvars.ContextVar("priority", default=Priority.USER)
+
+
+@contextlib.contextmanager
+def priority(level: Priority):
+    """Sends the requests made within the context with the given priority.
+
+    The priority is kept by asyncio.to_thread, so it applies to AsyncClient calls too.
+    """
+    token = PRIORITY.set(level)
+    try:
+        yield
+    finally:
+        PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """A token bucket that can be corrected by the rate limit headers of the server."""
+
+    def __init__(self, per_second: float, burst: float):
+        self.per_second = per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.per_second
+        )
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Gets the seconds until a token can be taken."""
+        self._refill()
+        paused = self.paused_until - time.monotonic()
+        if self.tokens >= 1:
+            return max(paused, 0.0)
+        return max(paused, (1 - self.tokens) / self.per_second)
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket and stops handing out tokens for a number of seconds."""
+        self._refill()
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def adapt(self, headers) -> None:
+        """Adapts the rate, burst, and remaining tokens to the rate limit headers."""
+        self._refill()
+        try:
+            if "x-ratelimit-limit-per-second" in headers:
+                self.per_second = float(headers["x-ratelimit-limit-per-second"])
+            if "x-ratelimit-limit-burst" in headers:
+                self.burst = float(headers["x-ratelimit-limit-burst"])
+            if "x-ratelimit-remaining" in headers:
+                self.tokens = min(self.burst, float(headers["x-ratelimit-remaining"]))
+        except ValueError:
+            pass
+
+
+class RequestScheduler:
+    """Schedules every request of the process within the rate limit.
+
+    Requests wait in a queue ordered by priority, then by arrival, and are sent when
+    the token bucket allows. The bucket is adapted to the x-ratelimit-* headers of
+    each response. Responses with a retry status are retried after the Retry-After
+    header, or an exponential backoff with jitter.
+
+    Args:
+        per_second: Requests per second, until the server says otherwise.
+        burst: Requests allowed in a burst, until the server says otherwise.
+        max_retries: Number of times to retry a request.
+        backoff: Seconds to wait before the first retry, doubled for each retry.
+        retry_statuses: Response statuses that are retried.
+    """
+
+    def __init__(
+        self,
+        per_second: float = PER_SECOND,
+        burst: float = BURST,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        retry_statuses: tuple = (429, 502),
+    ):
+        self.bucket = TokenBucket(per_second, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_statuses = retry_statuses
+        self._condition = threading.Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.max_queue_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def acquire(self, level: Priority = Priority.USER) -> float:
+        """Waits for the turn of a request, and takes a token for it.
+
+        Returns:
+            The seconds the request waited.
+        """
+        start = time.monotonic()
+        with self._condition:
+            ticket = (level, next(self._counter))
+            heapq.heappush(self._queue, ticket)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            while True:
+                if self._queue[0] == ticket:
+                    wait = self.bucket.wait_time()
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+            heapq.heappop(self._queue)
+            self.bucket.take()
+            waited = time.monotonic() - start
+            self.requests += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._condition.notify_all()
+        LIMITER_WAIT_SECONDS.observe(waited, priority=level.name.lower())
+        return waited
+
+    def feedback(self, response: requests.Response) -> bool:
+        """Adapts the bucket to a response.
+
+        A 429 response with a Retry-After header pauses the bucket until then. Other
+        retry statuses are only retried for IDEMPOTENT_METHODS.
+
+        Returns:
+            If the request should be retried.
+        """
+        with self._condition:
+            self.bucket.adapt(response.headers)
+            if response.status_code == requests.codes.too_many_requests:
+                self.rate_limited += 1
+                RATE_LIMITED.inc()
+                retry_after = retry_after_seconds(response)
+                if retry_after is not None:
+                    self.bucket.pause(retry_after)
+            self._condition.notify_all()
+        if response.status_code not in self.retry_statuses:
+            return False
+        return (
+            response.status_code == requests.codes.too_many_requests
+            or response.request.method in IDEMPOTENT_METHODS
+        )
+
+    def send(self, send, level: Priority = None) -> requests.Response:
+        """Sends a request when its turn comes, retrying it if needed.
+
+        Args:
+            send: Function that sends the request and returns the response.
+            level: Priority of the request, taken from the context if not given.
+        """
+        level = PRIORITY.get() if level is None else level
+        for attempt in range(self.max_retries + 1):
+            self.acquire(level)
+            response = send()
+            if not self.feedback(response) or attempt == self.max_retries:
+                return response
+            with self._condition:
+                self.retries += 1
+            RETRIES.inc()
+            # The jitter keeps the retries of concurrent requests from arriving
+            # together. With Retry-After the bucket is already paused until then.
+            if retry_after_seconds(response) is None:
+                time.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))
+            else:
+                time.sleep(random.uniform(0, self.backoff))
+        return response
+
+    def stats(self) -> dict:
+        """Gets the queue depth, wait time, and retry statistics."""
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "wait_total": self.wait_total,
+                "wait_average": (
+                    self.wait_total / self.requests if self.requests else 0.0
+                ),
+                "wait_max": self.wait_max,
+                "per_second": self.bucket.per_second,
+                "burst": self.bucket.burst,
+            }
+
+
+def retry_after_seconds(response: requests.Response) -> float:
+    """Gets the seconds from the Retry-After header, or None if there isn't one."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    return retry_after_value(value)
+
+
+# A single scheduler shared by every session in the process, so the rate limit holds
+# across sessions and requests are ordered by priority between them.
+SCHEDULER = RequestScheduler()
 
 
 class BearerAuth(AuthBase):
@@ -13,10 +267,95 @@ class BearerAuth(AuthBase):
         return r
 
 
+class ScheduledSession(requests.Session):
+    """Session that sends every request through a RequestScheduler.
+
+    The latency and status of each request are measured per endpoint, see metrics.
+    """
+
+    def __init__(self, scheduler: RequestScheduler):
+        super().__init__()
+        self.scheduler = scheduler
+
+    def send(self, request, **kwargs) -> requests.Response:
+        labels = {"method": request.method, "endpoint": endpoint(request.url)}
+
+        def send() -> requests.Response:
+            start = time.perf_counter()
+            try:
+                response = super(ScheduledSession, self).send(request, **kwargs)
+            except requests.exceptions.RequestException:
+                REQUEST_ERRORS.inc(**labels)
+                raise
+            REQUEST_SECONDS.observe(time.perf_counter() - start, **labels)
+            REQUESTS.inc(**labels, status=response.status_code)
+            return response
+
+        return self.scheduler.send(send)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTP adapter that keeps connections alive and reports how they were used."""
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Gets the number of connections opened, and requests sent on them.
+
+        Returns:
+            A tuple of (connections opened, requests sent) over all the pools.
+        """
+        opened = 0
+        requests_sent = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+        return opened, requests_sent
+
+
 class Client:
-    """Holds the account access token and session for API calls."""
+    """Holds the account access token and session for API calls.
 
-    def __init__(self, access_token: str = None):
+    The session is kept alive between calls, so the connection pool is reused, and
+    every request goes through the shared RequestScheduler. It is only rebuilt when
+    the access token changes. GET requests made with get are cached, see
+    ResponseCache.
+
+    Every request and response can be recorded to a log, and a log can be replayed
+    instead of sending requests, to profile a session offline. A replaying client
+    gets its own scheduler, sped up like the replay.
+
+    Args:
+        access_token: The access token of the agent.
+        pool_maxsize: The number of connections kept open.
+        cache: The cache of GET responses.
+        scheduler: The scheduler of the requests, the shared SCHEDULER by default.
+        recorder: Records every response to a log, see recording.Recorder.
+        replay: Serves the responses of a log, see recording.ReplayAdapter.
+    """
+
+    def __init__(
+        self,
+        access_token: str = None,
+        pool_maxsize: int = 10,
+        cache: ResponseCache = None,
+        scheduler: RequestScheduler = None,
+        recorder: Recorder = None,
+        replay: ReplayAdapter = None,
+    ):
+        if scheduler is None and replay is not None:
+            # A replay without waiting is not limited at all.
+            per_second = PER_SECOND * replay.speed if replay.speed > 0 else 1e9
+            scheduler = RequestScheduler(per_second, BURST)
+        self.pool_maxsize = pool_maxsize
+        self.scheduler = SCHEDULER if scheduler is None else scheduler
+        self.recorder = recorder
+        self.replay = replay
+        self.cache = ResponseCache() if cache is None else cache
+        self._session = None
+        self._adapter = None
+        self._closed_opened = 0
+        self._closed_requests = 0
         self.access_token = access_token
 
     @property
@@ -25,17 +364,167 @@ class Client:
 
     @property
     def session(self):
-        s = LimiterSession(limit_statuses=[429, 502], per_second=2, burst=10)
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> ScheduledSession:
+        s = ScheduledSession(self.scheduler)
+        if self.replay is not None:
+            self._adapter = self.replay
+        else:
+            self._adapter = PooledAdapter(
+                pool_connections=1, pool_maxsize=self.pool_maxsize
+            )
+        s.mount("https://", self._adapter)
+        s.mount("http://", self._adapter)
+        if self.recorder is not None:
+            s.hooks["response"].append(self.recorder.record)
         # This check is needed for registering new account, the POST can't use auth.
         if self.access_token is not None:
             s.auth = self.auth
         s.headers = {"Content-Type": "application/json", "Accept": "application/json"}
         return s
 
+    def get(self, url: str, params: dict = None, **kwargs) -> requests.Response:
+        """Sends a GET request, or gets the cached response while it is fresh.
+
+        Once a cached response has expired, it is revalidated with the server, so an
+        unchanged response doesn't need to be downloaded again.
+        """
+        key = self.cache.key(self.access_token, url, params)
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            CACHE_HITS.inc()
+            return entry.response
+
+        headers = kwargs.pop("headers", {})
+        if entry is not None:
+            headers = {**entry.validators, **headers}
+        response = self.session.get(url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == requests.codes.not_modified and entry is not None:
+            return self.cache.refresh(key).response
+        if response.ok:
+            self.cache.store(key, response)
+        return response
+
+    def post(self, url: str, invalidate: tuple = (), **kwargs) -> requests.Response:
+        """Sends a POST request, and drops the cached responses it may have changed.
+
+        Args:
+            url: The endpoint to post to.
+            invalidate: URLs of the cached responses to drop after a successful post.
+                If none are given, all of the cached responses of the access token are
+                dropped.
+        """
+        access_token = self.access_token
+        response = self.session.post(url, **kwargs)
+        if response.ok:
+            self.cache.invalidate(access_token, *invalidate)
+        return response
+
+    def close(self) -> None:
+        """Closes the session and its pooled connections."""
+        if self._session is None:
+            return
+        opened, requests_sent = self._adapter.connection_counts()
+        self._closed_opened += opened
+        self._closed_requests += requests_sent
+        self._session.close()
+        self._session = None
+        self._adapter = None
+
+    def _connection_counts(self) -> tuple[int, int]:
+        opened, requests_sent = self._closed_opened, self._closed_requests
+        if self._adapter is not None:
+            current_opened, current_requests = self._adapter.connection_counts()
+            opened += current_opened
+            requests_sent += current_requests
+        return opened, requests_sent
+
+    @property
+    def connections_opened(self) -> int:
+        """Number of new connections opened, each costing a TCP and TLS handshake."""
+        return self._connection_counts()[0]
+
+    @property
+    def connections_reused(self) -> int:
+        """Number of requests that were sent on an already open connection."""
+        opened, requests_sent = self._connection_counts()
+        return max(requests_sent - opened, 0)
+
     @property
     def access_token(self):
         return self._access_token
 
     @access_token.setter
     def access_token(self, access_token):
+        if self._session is not None and access_token != self._access_token:
+            self.close()
         self._access_token = access_token
+
+
+class AsyncClient:
+    """Awaitable API calls, sharing the session and scheduler of a Client.
+
+    Each request runs on a worker thread, so waiting on the network or on the
+    scheduler never blocks the event loop. The auth always follows the access token of
+    the wrapped client.
+    """
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await asyncio.to_thread(self.client.get, url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await asyncio.to_thread(self.client.post, url, **kwargs)
+
+    async def run(self, func, *args, **kwargs):
+        """Runs a blocking API helper, like space.get_my_ships, on a worker thread."""
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """Yields the items of a blocking iterator, like space.get_pages.
+
+        The iterator runs on its own thread, so it keeps fetching while the caller
+        handles the items already received. When the caller stops early, the iterator
+        is stopped and closed on its thread.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def produce() -> None:
+            try:
+                for item in iterator:
+                    if stop.is_set():
+                        break
+                    put((item, None))
+            except Exception as error:
+                put((None, error))
+            finally:
+                if hasattr(iterator, "close"):
+                    iterator.close()
+                put((done, None))
+
+        # The context is copied, so the iterator keeps the priority of the caller.
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+        try:
+            while True:
+                item, error = await queue.get()
+                if error is not None:
+                    raise error
+                if item is done:
+                    return
+                yield item
+        finally:
+            stop.set()
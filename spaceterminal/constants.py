@@ -1,9 +1,58 @@
+import os
+
+
 class URL:
-    """URL endpoints for SpaceTraders API."""
+    """URL endpoints for SpaceTraders API.
+
+    The base URL can be changed with the SPACETERMINAL_BASE_URL environment variable,
+    or with set_base, to use another server like the local mock server.
+    """
 
-    BASE = "https://api.spacetraders.io/v2"
+    BASE = os.environ.get(
+        "SPACETERMINAL_BASE_URL", "https://api.spacetraders.io/v2"
+    ).rstrip("/")
+    STATUS = f"{BASE}/"
     REGISTER = f"{BASE}/register"
     AGENT = f"{BASE}/my/agent"
     FACTIONS = f"{BASE}/factions"
     SHIPS = f"{BASE}/my/ships"
     CONTRACTS = f"{BASE}/my/contracts"
+    SYSTEMS = f"{BASE}/systems"
+    SYSTEMS_JSON = f"{BASE}/systems.json"
+
+    ENDPOINTS = [
+        "STATUS",
+        "REGISTER",
+        "AGENT",
+        "FACTIONS",
+        "SHIPS",
+        "CONTRACTS",
+        "SYSTEMS",
+        "SYSTEMS_JSON",
+    ]
+
+    @classmethod
+    def set_base(cls, base: str) -> None:
+        """Changes the base URL of every endpoint.
+
+        Args:
+            base: The new base URL, like http://127.0.0.1:8080/v2.
+        """
+        base = base.rstrip("/")
+        for name in cls.ENDPOINTS:
+            endpoint = getattr(cls, name).removeprefix(cls.BASE)
+            setattr(cls, name, f"{base}{endpoint}")
+        cls.BASE = base
+
+
+class PATH:
+    """Local file locations used by SpaceTerminal."""
+
+    PACKAGE = os.path.abspath(os.path.dirname(__file__))
+    CACHE = os.path.join(PACKAGE, "cache")
+    FACTIONS = os.path.join(CACHE, "factions.json")
+    GALAXY = os.path.join(CACHE, "galaxy.sqlite3")
+    MARKETS = os.path.join(CACHE, "markets.sqlite3")
+    SNAPSHOTS = os.path.join(CACHE, "snapshots")
+    TIMESERIES = os.path.join(CACHE, "timeseries")
+    TOKEN = os.path.join(PACKAGE, "token.json")
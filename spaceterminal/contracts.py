@@ -1,55 +1,235 @@
-from rich.text import Text
+import copy
+from collections.abc import Iterable
+from dataclasses import dataclass
+
 from textual.widgets.tree import TreeNode
 
+from spaceterminal import space as s
+from spaceterminal.client import Client
+from spaceterminal.constants import URL
+from spaceterminal.models import Contract
+
+ACCEPT = "accept"
+DELIVER = "deliver"
+FULFILL = "fulfill"
+
+
+@dataclass(slots=True)
+class ContractAction:
+    """Accepting, delivering goods to, or fulfilling a contract.
+
+    Args:
+        kind: One of ACCEPT, DELIVER, or FULFILL.
+        contract_id: The id of the contract.
+        ship_symbol: The ship the goods are delivered from.
+        trade_symbol: The good that is delivered.
+        units: The units of the good that are delivered.
+    """
+
+    kind: str
+    contract_id: str
+    ship_symbol: str = None
+    trade_symbol: str = None
+    units: int = 0
+
+    @property
+    def url(self) -> str:
+        return f"{URL.CONTRACTS}/{self.contract_id}/{self.kind}"
+
+    def payload(self) -> dict:
+        if self.kind != DELIVER:
+            return None
+        return {
+            "shipSymbol": self.ship_symbol,
+            "tradeSymbol": self.trade_symbol,
+            "units": self.units,
+        }
+
+    def invalidates(self) -> tuple:
+        """Gets the URLs of the cached responses the action changes."""
+        if self.kind == DELIVER:
+            return URL.CONTRACTS, URL.SHIPS
+        return URL.CONTRACTS, URL.AGENT
+
+    def allowed(self, contract: Contract) -> bool:
+        """Checks that the server would take the action on a contract."""
+        if self.kind == ACCEPT:
+            return not contract.accepted
+        if not contract.accepted or contract.fulfilled:
+            return False
+        if self.kind == FULFILL:
+            return all(
+                good.units_fulfilled >= good.units_required
+                for good in contract.terms.deliver
+            )
+        return True
+
+    def apply(self, contract: dict) -> None:
+        """Changes a contract like the server will, before it has answered."""
+        if self.kind == ACCEPT:
+            contract["accepted"] = True
+        elif self.kind == FULFILL:
+            contract["fulfilled"] = True
+        else:
+            for good in contract["terms"]["deliver"]:
+                if good["tradeSymbol"] == self.trade_symbol:
+                    good["unitsFulfilled"] += self.units
+                    break
+
 
 class MyContracts:
-    def __init__(self):
-        self.id = None
+    """Holds my contracts by id, and accepts, delivers, and fulfills them in batches.
 
+    The actions of a batch change the contracts here straight away, see apply, so they
+    can be shown before the server answers. The batch is then sent, see send, and each
+    contract is replaced by the one the server answered with, or put back if an action
+    on it failed. There is no need to load every contract again.
 
-def create_contract_tree(node: TreeNode, json_data: object) -> None:
-    """Adds JSON data to a node.
+    The JSON of the contracts is kept for the tree, and each contract is decoded into
+    a Contract once it is needed, see model, and again only after it changed.
 
     Args:
-        node (TreeNode): A Tree node.
-        json_data (object): An object decoded from JSON.
+        client: The client to send the actions with.
+        max_workers: The most contracts that are sent actions at the same time. The
+            request scheduler of the client keeps them within the rate limit.
     """
 
-    from rich.highlighter import ReprHighlighter
+    def __init__(self, client: Client, max_workers: int = 4):
+        self.client = client
+        self.max_workers = max_workers
+        self.contracts: dict[str, dict] = {}
+        self.models: dict[str, Contract] = {}
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def __contains__(self, contract_id: str) -> bool:
+        return contract_id in self.contracts
+
+    def __getitem__(self, contract_id: str) -> dict:
+        return self.contracts[contract_id]
+
+    def values(self) -> list[dict]:
+        """Gets the contracts, in the order they were loaded."""
+        return list(self.contracts.values())
+
+    def model(self, contract_id: str) -> Contract:
+        """Gets a contract decoded, which is only decoded again after it changed."""
+        model = self.models.get(contract_id)
+        if model is None:
+            model = Contract.from_json(self.contracts[contract_id])
+            self.models[contract_id] = model
+        return model
+
+    def load(self, contracts: Iterable[dict]) -> None:
+        """Replaces the contracts, like after every page of contracts was loaded."""
+        self.contracts = {contract["id"]: contract for contract in contracts}
+        self.models = {}
 
-    highlighter = ReprHighlighter()
+    def apply(self, actions: list[ContractAction]) -> dict[str, dict]:
+        """Changes the contracts of a batch like the server will.
 
-    def add_node(name: str, node: TreeNode, data: object) -> None:
-        """Adds a node to the tree.
+        The contracts are copied before they are changed, so the data shown in a tree
+        isn't changed under it.
+
+        Returns:
+            The contracts before they were changed, by id, to put back on a failure.
+
+        Raises:
+            KeyError: An action is on a contract that isn't loaded.
+        """
+        previous = {}
+        for action in actions:
+            if action.contract_id not in previous:
+                contract = self.contracts[action.contract_id]
+                previous[action.contract_id] = contract
+                self.contracts[action.contract_id] = copy.deepcopy(contract)
+                self.models.pop(action.contract_id, None)
+            action.apply(self.contracts[action.contract_id])
+        return previous
+
+    def send(self, actions: list[ContractAction], previous: dict) -> list[dict]:
+        """Sends the actions of a batch, which must have been applied.
+
+        The actions on each contract are sent in order, and the contracts are sent
+        their actions at the same time. Once an action fails, the rest of the actions
+        on its contract are skipped, as they would most likely fail too.
 
         Args:
-            name (str): Name of the node.
-            node (TreeNode): Parent node.
-            data (object): Data associated with the node.
+            actions: The actions, like they were given to apply.
+            previous: The contracts before the actions, as returned by apply.
+
+        Returns:
+            The decoded JSON of the response to each action, in the order of actions,
+            or None for an action that was skipped.
+
+        Raises:
+            requests.RequestException: A request failed without a response, like when
+                the server can't be reached. The contracts are still put back.
         """
-        if isinstance(data, dict):
-            node.set_label(Text(f"{{}} {name}"))
-            for key, value in data.items():
-                new_node = node.add("")
-                add_node(key, new_node, value)
-        elif isinstance(data, list):
-            node.set_label(Text(f"[] {name}"))
-            for index, value in enumerate(data):
-                new_node = node.add("")
-                if "name" in value:
-                    add_node(str(value["name"]), new_node, value)
-                elif "symbol" in value:
-                    add_node(str(value["symbol"]), new_node, value)
-                else:
-                    add_node(str(index), new_node, value)
-        else:
-            node.allow_expand = False
-            if name:
-                label = Text.assemble(
-                    Text.from_markup(f"[b]{name}[/b]="), highlighter(repr(data))
-                )
-            else:
-                label = Text(repr(data))
-            node.set_label(label)
-
-    add_node("Contracts", node, json_data)
+        results = [None] * len(actions)
+        batch = s.run_batch(
+            actions,
+            lambda action: action.contract_id,
+            self._send_action,
+            self.max_workers,
+        )
+        try:
+            for index, result in batch:
+                results[index] = result
+        finally:
+            # The last contract the server answered with, or the one from before the
+            # batch, replaces the changed one.
+            contracts = dict(previous)
+            for action, result in zip(actions, results):
+                if result is not None and "error" not in result:
+                    contracts[action.contract_id] = result["data"]["contract"]
+            self.contracts.update(contracts)
+            for contract_id in contracts:
+                self.models.pop(contract_id, None)
+        return results
+
+    def _send_action(self, action: ContractAction) -> dict:
+        response = self.client.post(
+            action.url, json=action.payload(), invalidate=action.invalidates()
+        )
+        return response.json()
+
+    def run(self, actions: list[ContractAction]) -> list[dict]:
+        """Applies and sends a batch of actions, see apply and send."""
+        return self.send(actions, self.apply(actions))
+
+    def accept(self, contract_ids: Iterable[str]) -> list[dict]:
+        """Accepts contracts in a single batch."""
+        return self.run(
+            [ContractAction(ACCEPT, contract_id) for contract_id in contract_ids]
+        )
+
+    def deliver(self, deliveries: Iterable[tuple]) -> list[dict]:
+        """Delivers goods to contracts in a single batch.
+
+        Args:
+            deliveries: The (contract id, ship symbol, trade symbol, units) of each
+                delivery.
+        """
+        return self.run([ContractAction(DELIVER, *delivery) for delivery in deliveries])
+
+    def fulfill(self, contract_ids: Iterable[str]) -> list[dict]:
+        """Fulfills contracts in a single batch."""
+        return self.run(
+            [ContractAction(FULFILL, contract_id) for contract_id in contract_ids]
+        )
+
+
+def contract_node(node: TreeNode) -> TreeNode:
+    """Gets the node of the contract a node of the contracts tree is in.
+
+    Returns:
+        The node of the contract, or None if the node isn't in a contract.
+    """
+    while node is not None and node.parent is not None:
+        # The goods to deliver are in a list too, but don't have an id.
+        if isinstance(node.parent.data, list) and "id" in (node.data or {}):
+            return node
+        node = node.parent
+    return None
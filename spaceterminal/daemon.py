@@ -0,0 +1,422 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from spaceterminal import space as s
+from spaceterminal.agent import Agent
+from spaceterminal.client import AsyncClient, Client, Priority, priority
+from spaceterminal.constants import PATH, URL
+from spaceterminal.markets import MarketStore
+from spaceterminal.metrics import REGISTRY
+from spaceterminal.models import Ship
+from spaceterminal.recording import Recorder, ReplayAdapter
+from spaceterminal.timers import ShipEvent, ShipTimers
+from spaceterminal.timeseries import TimeSeriesStore, ship_samples
+
+# Seconds between refreshes of the fleet, and between runs of an idle behavior. The
+# ships are cached by the client for 15 seconds, so refreshing faster gains nothing.
+DEFAULT_INTERVAL = 60
+
+DEFAULT_PORT = 8765
+
+# A behavior runs one step for a ship, and returns the seconds until its next step.
+Behavior = Callable[["FleetDaemon", Ship], Awaitable[float]]
+BEHAVIORS: dict[str, Behavior] = {}
+
+BEHAVIOR_SECONDS = REGISTRY.histogram(
+    "spaceterminal_behavior_seconds",
+    "Seconds taken by one step of the behavior of a ship.",
+    ("behavior", "result"),
+)
+FLEET_SHIPS = REGISTRY.gauge(
+    "spaceterminal_fleet_ships",
+    "Ships run by the daemon, by the state of their behavior.",
+    ("state",),
+)
+FLEET_TIMERS = REGISTRY.gauge(
+    "spaceterminal_fleet_timers", "Arrival and cooldown timers waiting to fire."
+)
+REFRESH_ERRORS = REGISTRY.counter(
+    "spaceterminal_fleet_refresh_errors_total",
+    "Refreshes of the fleet that failed, which are tried again after the interval.",
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "spaceterminal_scheduler_queue_depth",
+    "Requests waiting for their turn in the rate limit.",
+)
+
+
+def behavior(name: str) -> Callable[[Behavior], Behavior]:
+    """Registers a behavior under a name, for FleetDaemon and the --behavior flag."""
+
+    def register(func: Behavior) -> Behavior:
+        BEHAVIORS[name] = func
+        return func
+
+    return register
+
+
+@behavior("idle")
+async def idle(daemon: "FleetDaemon", ship: Ship) -> float:
+    """Does nothing, the ship is only watched by the fleet refreshes."""
+    return daemon.interval
+
+
+@behavior("survey")
+async def survey(daemon: "FleetDaemon", ship: Ship) -> float:
+    """Records the prices of the market the ship is at, or waits for the ship to
+    arrive when it is in transit."""
+    if ship.nav.status == "IN_TRANSIT":
+        # The arrival timer wakes the ship up early, see FleetDaemon.ship_event.
+        return daemon.interval
+    with priority(Priority.BACKGROUND):
+        await daemon.async_client.run(
+            s.update_markets,
+            daemon.client,
+            daemon.markets,
+            [ship.nav.waypoint_symbol],
+            daemon.timeseries,
+        )
+    return daemon.interval
+
+
+@dataclass(slots=True)
+class ShipStatus:
+    """What the daemon is doing with a ship, the times are Unix timestamps."""
+
+    behavior: str
+    state: str = "starting"
+    runs: int = 0
+    last_run: float = None
+    next_run: float = None
+    error: str = None
+
+
+class FleetDaemon:
+    """Runs a behavior loop for every ship of the agent, without the TUI.
+
+    Each ship has its own asyncio task, and every task shares the client, so all of
+    their requests go through one session and one rate limiter. The fleet is refreshed
+    every interval, which starts the loops of new ships and stops the loops of ships
+    that are gone. In between, a ship is only refreshed on its own when it arrives or
+    its cooldown runs out, which also wakes up its loop.
+
+    Args:
+        client: The client to make the requests with, with an access token.
+        behavior: Name of the behavior of the ships, see BEHAVIORS.
+        interval: Seconds between refreshes of the fleet.
+        markets: The store to save market prices in.
+        timeseries: The store to record credits, ships and prices in.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        behavior: str = "survey",
+        interval: float = DEFAULT_INTERVAL,
+        markets: MarketStore = None,
+        timeseries: TimeSeriesStore = None,
+    ):
+        if behavior not in BEHAVIORS:
+            raise ValueError(f"Unknown behavior: {behavior!r}")
+        self.client = client
+        self.async_client = AsyncClient(client)
+        self.agent = Agent(client)
+        self.behavior = behavior
+        self.interval = interval
+        self.markets = MarketStore() if markets is None else markets
+        self.timeseries = TimeSeriesStore() if timeseries is None else timeseries
+        self.ships: dict[str, Ship] = {}
+        self.status: dict[str, ShipStatus] = {}
+        self.error = None
+        self.started = time.time()
+        self.refreshed = None
+        self.timers = ShipTimers()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._wake: dict[str, asyncio.Event] = {}
+        # The state is read by the state server from its own threads.
+        self._lock = threading.Lock()
+
+    async def refresh(self) -> dict:
+        """Refreshes the agent and the fleet, and records their time series.
+
+        Returns:
+            The error of the request that failed, or None.
+        """
+        response = await self.async_client.run(self.agent.get_agent_response)
+        self.agent.update_agent(response)
+        if self.agent.error is not None:
+            return self.agent.error
+        samples = {f"agent.{self.agent.symbol}.credits": self.agent.my_credits}
+
+        ships = {}
+        async for page in self.async_client.iterate(s.get_my_ships_pages(self.client)):
+            if "error" in page:
+                return page["error"]
+            samples.update(ship_samples(page["data"]))
+            for data in page["data"]:
+                ship = Ship.from_json(data)
+                ships[ship.symbol] = ship
+        await self.async_client.run(self.timeseries.record, samples)
+
+        with self._lock:
+            self.ships = ships
+            for symbol in ships:
+                self.status.setdefault(symbol, ShipStatus(self.behavior))
+            for symbol in set(self.status) - set(ships):
+                del self.status[symbol]
+            self.refreshed = time.time()
+        self.timers.update_fleet(ships.values())
+        return None
+
+    async def ship_event(self, event: ShipEvent) -> None:
+        """Refreshes a ship when it arrives or its cooldown runs out, and wakes up its
+        loop."""
+        response = await self.async_client.run(
+            s.get_my_ship, self.client, event.ship_symbol
+        )
+        if response.status_code != 200 or event.ship_symbol not in self.ships:
+            return
+        ship = Ship.from_json(response.json()["data"])
+        with self._lock:
+            self.ships[ship.symbol] = ship
+        self.timers.update_ship(ship)
+        if ship.symbol in self._wake:
+            self._wake[ship.symbol].set()
+
+    async def run(self) -> None:
+        """Refreshes the fleet every interval, and runs the loop of each ship, until
+        cancelled.
+
+        A refresh that fails, like when the server can't be reached, is recorded in
+        the error of the state and tried again after the interval, while the ships
+        keep running.
+        """
+        timers = asyncio.create_task(self.timers.run(self.ship_event))
+        try:
+            while True:
+                try:
+                    self.error = await self.refresh()
+                except (requests.RequestException, ValueError) as exception:
+                    self.error = {"message": f"{type(exception).__name__}: {exception}"}
+                if self.error is not None:
+                    REFRESH_ERRORS.inc()
+                for symbol in self.ships.keys() - self._tasks.keys():
+                    self._tasks[symbol] = asyncio.create_task(self.run_ship(symbol))
+                for symbol in self._tasks.keys() - self.ships.keys():
+                    self._tasks.pop(symbol).cancel()
+                    self._wake.pop(symbol, None)
+                await asyncio.sleep(self.interval)
+        finally:
+            tasks = [timers, *self._tasks.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._tasks.clear()
+
+    async def run_ship(self, symbol: str) -> None:
+        """Runs the behavior of a ship until it is cancelled.
+
+        A step that fails is recorded in the status of the ship, and retried after
+        the interval, so one ship can't stop the others.
+        """
+        wake = self._wake.setdefault(symbol, asyncio.Event())
+        while symbol in self.ships:
+            status = self.status[symbol]
+            with self._lock:
+                status.state = "running"
+            start = time.perf_counter()
+            try:
+                delay = await BEHAVIORS[status.behavior](self, self.ships[symbol])
+                error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                delay, error = self.interval, f"{type(exception).__name__}: {exception}"
+            BEHAVIOR_SECONDS.observe(
+                time.perf_counter() - start,
+                behavior=status.behavior,
+                result="error" if error else "ok",
+            )
+            with self._lock:
+                status.state = "error" if error else "waiting"
+                status.error = error
+                status.runs += 1
+                status.last_run = time.time()
+                status.next_run = status.last_run + delay
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), delay)
+            except TimeoutError:
+                pass
+
+    def state(self) -> dict:
+        """Gets what the daemon is doing, as JSON for the state server."""
+        with self._lock:
+            ships = [
+                {
+                    "symbol": ship.symbol,
+                    "role": ship.role,
+                    "status": ship.nav.status,
+                    "waypoint": ship.nav.waypoint_symbol,
+                    "fuel": ship.fuel.current,
+                    "fuel_capacity": ship.fuel.capacity,
+                    "cargo": ship.cargo.units,
+                    "cargo_capacity": ship.cargo.capacity,
+                    **asdict(self.status[ship.symbol]),
+                }
+                for ship in self.ships.values()
+            ]
+            return {
+                "agent": {
+                    "symbol": self.agent.symbol,
+                    "credits": self.agent.my_credits,
+                    "headquarters": self.agent.headquarters,
+                },
+                "error": self.error,
+                "started": self.started,
+                "refreshed": self.refreshed,
+                "interval": self.interval,
+                "timers": len(self.timers),
+                "scheduler": self.client.scheduler.stats(),
+                "ships": ships,
+            }
+
+    def metrics(self) -> str:
+        """Gets the metrics of the process and the fleet, in the Prometheus text
+        format."""
+        with self._lock:
+            states = [status.state for status in self.status.values()]
+        for state in ("starting", "running", "waiting", "error"):
+            FLEET_SHIPS.set(states.count(state), state=state)
+        FLEET_TIMERS.set(len(self.timers))
+        QUEUE_DEPTH.set(self.client.scheduler.stats()["queue_depth"])
+        return REGISTRY.to_prometheus()
+
+
+class StateHandler(BaseHTTPRequestHandler):
+    """Serves the state of the daemon as JSON at /state, and its metrics for
+    Prometheus at /metrics."""
+
+    server: "StateServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path in ("", "/state"):
+            body = json.dumps(self.server.daemon.state()).encode()
+            content_type = "application/json"
+        elif path == "/metrics":
+            body = self.server.daemon.metrics().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StateServer(ThreadingHTTPServer):
+    """Serves the state of a daemon, for dashboards like spaceterminal.dashboard.
+
+    It only reads the state, so it never sends requests to the API.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, daemon: FleetDaemon, host: str = "127.0.0.1", port: int = DEFAULT_PORT
+    ):
+        super().__init__((host, port), StateHandler)
+        self.daemon = daemon
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/state"
+
+    def start(self) -> str:
+        """Starts serving on a background thread, and gets the URL of the state."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def load_token() -> str:
+    """Gets the access token saved by the register screen, or None."""
+    try:
+        with open(PATH.TOKEN) as file:
+            return json.load(file)["token"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+async def serve(daemon: FleetDaemon, host: str, port: int) -> None:
+    # Every ship may be waiting on a request at once, so the default of a few
+    # threads per CPU would leave most of them waiting for a thread instead.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(64))
+    server = StateServer(daemon, host, port)
+    url = server.start()
+    print(f"Serving the daemon state at {url}, and its metrics at /metrics")
+    try:
+        await daemon.run()
+    finally:
+        server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs the fleet without the TUI.")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SPACETERMINAL_TOKEN"),
+        help="Access token, defaults to SPACETERMINAL_TOKEN or the saved token.",
+    )
+    parser.add_argument("--behavior", choices=sorted(BEHAVIORS), default="survey")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--record", help="Record every request to this log.")
+    parser.add_argument("--replay", help="Replay a recorded log instead of the API.")
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="How much faster to replay, 0 to not wait at all.",
+    )
+    args = parser.parse_args()
+
+    token = args.token or load_token()
+    if token is None:
+        parser.error("No access token, use --token or register in the TUI first.")
+    client = Client(
+        token,
+        recorder=Recorder(args.record) if args.record else None,
+        replay=ReplayAdapter(args.replay, args.replay_speed) if args.replay else None,
+    )
+    daemon = FleetDaemon(client, args.behavior, args.interval)
+    print(f"Running the fleet against {URL.BASE}")
+    try:
+        asyncio.run(serve(daemon, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
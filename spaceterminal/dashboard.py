@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import time
+
+import requests
+from textual import work
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable, Footer, Header, Markdown
+
+from spaceterminal.daemon import DEFAULT_PORT
+
+# Seconds between reads of the daemon state.
+REFRESH_INTERVAL = 2
+
+COLUMNS = (
+    ("symbol", "Ship"),
+    ("role", "Role"),
+    ("status", "Status"),
+    ("waypoint", "Waypoint"),
+    ("fuel", "Fuel"),
+    ("cargo", "Cargo"),
+    ("behavior", "Behavior"),
+    ("state", "State"),
+    ("runs", "Runs"),
+    ("next_run", "Next run"),
+    ("error", "Error"),
+)
+
+
+def ship_row(ship: dict, now: float) -> tuple:
+    """Gets the cells of a ship of the daemon state."""
+    cells = {
+        **ship,
+        "fuel": f"{ship['fuel']}/{ship['fuel_capacity']}",
+        "cargo": f"{ship['cargo']}/{ship['cargo_capacity']}",
+        "next_run": (
+            f"{max(ship['next_run'] - now, 0):.0f}s" if ship["next_run"] else ""
+        ),
+        "error": ship["error"] or "",
+    }
+    return tuple(str(cells[key]) for key, _ in COLUMNS)
+
+
+class DashboardApp(App):
+    """A read-only view of a running daemon, see spaceterminal.daemon.
+
+    It only reads the state server of the daemon, so it never uses the API budget
+    of the fleet.
+
+    Args:
+        url: The URL of the daemon state.
+    """
+
+    TITLE = "SpaceTerminal Dashboard"
+    CSS_PATH = "style.css"
+    BINDINGS = [("q", "quit", "Quit")]
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self.session = requests.Session()
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Markdown("Connecting...", id="markdown-dashboard")
+        yield DataTable(id="table-dashboard-ships", cursor_type="row")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        for key, label in COLUMNS:
+            table.add_column(label, key=key)
+        self.update_state()
+        self.set_interval(REFRESH_INTERVAL, self.update_state)
+
+    @work(exclusive=True, group="dashboard")
+    async def update_state(self) -> None:
+        markdown = self.query_one(Markdown)
+        try:
+            response = await asyncio.to_thread(self.session.get, self.url, timeout=5)
+            state = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            markdown.update(f"Unable to reach the daemon at {self.url}")
+            return
+
+        now = time.time()
+        agent = state["agent"]
+        scheduler = state["scheduler"]
+        error = state["error"]
+        await markdown.update(f"""
+Agent: {agent["symbol"]} | Credits: {agent["credits"]} | Ships: {len(state["ships"])}
+
+Requests: {scheduler["requests"]} | Rate limited: {scheduler["rate_limited"]} | \
+Queue: {scheduler["queue_depth"]} | \
+Average wait: {scheduler["wait_average"] * 1000:.0f} ms
+
+{f'Error: {error["message"]}' if error else ""}""")
+
+        table = self.query_one(DataTable)
+        ships = {ship["symbol"]: ship for ship in state["ships"]}
+        for row_key in list(table.rows):
+            if row_key.value not in ships:
+                table.remove_row(row_key)
+        for symbol, ship in ships.items():
+            row = ship_row(ship, now)
+            if symbol not in table.rows:
+                table.add_row(*row, key=symbol)
+                continue
+            # Only the cells that changed are updated, so the cursor stays put.
+            for (column, _), value in zip(COLUMNS, row):
+                if table.get_cell(symbol, column) != value:
+                    table.update_cell(symbol, column, value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Watches a running daemon.")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}/state")
+    args = parser.parse_args()
+    DashboardApp(args.url).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import json
+import os
+import time
+
+
+def read_json(path: str, max_age: float = None) -> object:
+    """Reads JSON data cached on disk.
+
+    Args:
+        path: The cache file.
+        max_age: Maximum age of the cache file in seconds. If None, it never expires.
+
+    Returns:
+        The decoded JSON data, or None if the file is missing, expired, or unreadable.
+    """
+    try:
+        if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: str, data: object) -> None:
+    """Writes JSON data to the disk cache.
+
+    The data is written to a temporary file first, so a reader never sees a partially
+    written cache file.
+
+    Args:
+        path: The cache file.
+        data: An object that can be encoded to JSON.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
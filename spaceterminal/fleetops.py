@@ -0,0 +1,164 @@
+import copy
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from spaceterminal import space as s
+from spaceterminal.client import Client
+from spaceterminal.constants import URL
+from spaceterminal.models import Ship
+
+ORBIT = "orbit"
+DOCK = "dock"
+REFUEL = "refuel"
+SELL = "sell"
+
+# The actions that can be run on the whole fleet, by their name in the UI.
+ACTIONS = {
+    ORBIT: "Orbit",
+    DOCK: "Dock",
+    REFUEL: "Refuel",
+    SELL: "Sell cargo",
+}
+
+# The nav status a ship is in after orbiting or docking.
+STATUSES = {ORBIT: "IN_ORBIT", DOCK: "DOCKED"}
+
+
+@dataclass(slots=True)
+class ShipOperation:
+    """A single request of a fleet action, like docking a ship.
+
+    Args:
+        action: One of ORBIT, DOCK, REFUEL, or SELL.
+        ship_symbol: The ship the request is for.
+        payload: The JSON body of the request, like the good to sell.
+    """
+
+    action: str
+    ship_symbol: str
+    payload: dict = None
+
+    @property
+    def url(self) -> str:
+        return f"{URL.SHIPS}/{self.ship_symbol}/{self.action}"
+
+    def invalidates(self) -> tuple:
+        """Gets the URLs of the cached responses the operation changes."""
+        if self.action in (REFUEL, SELL):
+            return URL.SHIPS, URL.AGENT
+        return (URL.SHIPS,)
+
+
+def plan(action: str, ships: Iterable[Ship]) -> list[ShipOperation]:
+    """Gets the operations that run an action on each ship, in the order they must be
+    sent.
+
+    Refueling and selling need the ship to be docked, so a ship that isn't is docked
+    first. Ships with nothing to do are left out, like one with a full tank, with an
+    empty hold, or already in orbit. Ships in transit can't orbit or dock, so they
+    are left out of those.
+
+    Raises:
+        ValueError: The action isn't one of ACTIONS.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action!r}")
+    operations = []
+    for ship in ships:
+        if action in (ORBIT, DOCK):
+            steps = []
+            if ship.nav.status not in (STATUSES[action], "IN_TRANSIT"):
+                steps.append(ShipOperation(action, ship.symbol))
+        elif action == REFUEL:
+            steps = []
+            if ship.fuel.current < ship.fuel.capacity:
+                steps.append(ShipOperation(REFUEL, ship.symbol))
+        else:
+            steps = [
+                ShipOperation(
+                    SELL, ship.symbol, {"symbol": item.symbol, "units": item.units}
+                )
+                for item in ship.cargo.inventory
+                if item.units
+            ]
+        if steps and action in (REFUEL, SELL) and ship.nav.status != "DOCKED":
+            steps.insert(0, ShipOperation(DOCK, ship.symbol))
+        operations.extend(steps)
+    return operations
+
+
+def merge_result(ship: dict, result: dict) -> dict:
+    """Gets a copy of the JSON of a ship, changed like the server answered an
+    operation on it, so the ship doesn't need to be requested again."""
+    ship = copy.copy(ship)
+    for key in ("nav", "fuel", "cargo"):
+        if key in result["data"]:
+            ship[key] = result["data"][key]
+    return ship
+
+
+def describe(operation: ShipOperation, result: dict) -> str:
+    """Gets a short description of what the server answered an operation with."""
+    if result is None:
+        return "Skipped"
+    if "error" in result:
+        return result["error"]["message"]
+    data = result["data"]
+    if "transaction" not in data:
+        return data["nav"]["status"]
+    transaction = data["transaction"]
+    sign = "+" if transaction["type"] == "SELL" else "-"
+    return (
+        f"{transaction['units']} {transaction['tradeSymbol']}, "
+        f"{sign}{transaction['totalPrice']} credits"
+    )
+
+
+class FleetOperations:
+    """Runs an action on many ships at once, like docking the whole fleet.
+
+    The operations of each ship are sent in order, as one may depend on the one before
+    it, like docking before refueling. The ships are sent their operations at the same
+    time, and the request scheduler of the client keeps them within the rate limit.
+
+    Args:
+        client: The client to send the operations with.
+        max_workers: The most ships that are sent operations at the same time.
+    """
+
+    def __init__(self, client: Client, max_workers: int = 4):
+        self.client = client
+        self.max_workers = max_workers
+
+    def run(
+        self, operations: list[ShipOperation]
+    ) -> Iterator[tuple[ShipOperation, dict]]:
+        """Sends operations, yielding each result as soon as it arrives.
+
+        Once an operation on a ship fails, the rest of the operations on that ship are
+        skipped, see space.run_batch.
+
+        Yields:
+            Each (operation, decoded JSON of its response), or None as the JSON of an
+            operation that was skipped.
+        """
+        batch = s.run_batch(
+            operations,
+            lambda operation: operation.ship_symbol,
+            self._send_operation,
+            self.max_workers,
+        )
+        for index, result in batch:
+            yield operations[index], result
+
+    def run_action(
+        self, action: str, ships: Iterable[Ship]
+    ) -> Iterator[tuple[ShipOperation, dict]]:
+        """Runs an action on each ship, see plan and run."""
+        return self.run(plan(action, ships))
+
+    def _send_operation(self, operation: ShipOperation) -> dict:
+        response = self.client.post(
+            operation.url, json=operation.payload, invalidate=operation.invalidates()
+        )
+        return response.json()
@@ -0,0 +1,126 @@
+import re
+from collections.abc import Iterable
+
+from spaceterminal.models import Ship
+
+# The key and label of each column of the ships table.
+COLUMNS = (
+    ("symbol", "Ship"),
+    ("role", "Role"),
+    ("waypoint", "Waypoint"),
+    ("status", "Status"),
+    ("fuel", "Fuel"),
+    ("cargo", "Cargo"),
+)
+
+
+def ship_cells(ship: Ship) -> tuple[str, ...]:
+    """Gets the cells of a ship in the ships table, in the order of COLUMNS."""
+    return (
+        ship.symbol,
+        ship.role,
+        ship.nav.waypoint_symbol,
+        ship.nav.status,
+        f"{ship.fuel.current}/{ship.fuel.capacity}",
+        f"{ship.cargo.units}/{ship.cargo.capacity}",
+    )
+
+
+def natural_key(text: str) -> list:
+    """Gets a sort key that puts X1-A2 before X1-A10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", text)]
+
+
+def symbol_key(symbol: str) -> tuple:
+    """Gets a sort key that puts AGENT-9 before AGENT-A and AGENT-10, as ships are
+    numbered in hex."""
+    return len(symbol), symbol
+
+
+def fraction(current: int, capacity: int) -> float:
+    return current / capacity if capacity else 1.0
+
+
+SORT_KEYS = {
+    "symbol": lambda ship: (),
+    "role": lambda ship: ship.role,
+    "waypoint": lambda ship: natural_key(ship.nav.waypoint_symbol),
+    "status": lambda ship: ship.nav.status,
+    "fuel": lambda ship: (fraction(ship.fuel.current, ship.fuel.capacity),),
+    "cargo": lambda ship: (fraction(ship.cargo.units, ship.cargo.capacity),),
+}
+
+
+class FleetView:
+    """The rows of the ships table, filtered and sorted in memory.
+
+    Changing the filter or the order never needs the API, and only the rows of the
+    ships that changed need to be redrawn when the fleet is refreshed.
+    """
+
+    def __init__(self):
+        self.ships: dict[str, Ship] = {}
+        self.cells: dict[str, tuple[str, ...]] = {}
+        self.terms: list[str] = []
+        self.sort_column = "symbol"
+        self.reverse = False
+        # The lowercase text of each row, matched against the filter.
+        self._text: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.ships)
+
+    def update(self, ships: Iterable[Ship]) -> list[str]:
+        """Adds or replaces ships.
+
+        Returns:
+            The symbols of the ships that were added, or whose cells changed.
+        """
+        changed = []
+        for ship in ships:
+            cells = ship_cells(ship)
+            self.ships[ship.symbol] = ship
+            if self.cells.get(ship.symbol) != cells:
+                self.cells[ship.symbol] = cells
+                self._text[ship.symbol] = " ".join(cells).lower()
+                changed.append(ship.symbol)
+        return changed
+
+    def keep(self, symbols: Iterable[str]) -> list[str]:
+        """Removes every ship that isn't one of symbols, like after a full refresh.
+
+        Returns:
+            The symbols of the ships that were removed.
+        """
+        removed = list(self.ships.keys() - set(symbols))
+        for symbol in removed:
+            del self.ships[symbol]
+            del self.cells[symbol]
+            del self._text[symbol]
+        return removed
+
+    def set_filter(self, text: str) -> None:
+        """Only shows the ships with every word of text in one of their cells."""
+        self.terms = text.lower().split()
+
+    def matches(self, symbol: str) -> bool:
+        text = self._text.get(symbol)
+        return text is not None and all(term in text for term in self.terms)
+
+    def sort_by(self, column: str) -> None:
+        """Sorts by a column, or reverses the order if it is already sorted by it."""
+        if column not in SORT_KEYS:
+            raise ValueError(f"Unknown column: {column!r}")
+        self.reverse = not self.reverse if column == self.sort_column else False
+        self.sort_column = column
+
+    def sort_key(self, symbol: str) -> tuple:
+        """Gets the key of a ship in the current order, with its symbol for ties."""
+        ship = self.ships[symbol]
+        return SORT_KEYS[self.sort_column](ship), symbol_key(symbol)
+
+    def visible(self) -> list[str]:
+        """Gets the symbols of the ships that match the filter, in order."""
+        symbols = [symbol for symbol in self.ships if self.matches(symbol)]
+        symbols.sort(key=self.sort_key, reverse=self.reverse)
+        return symbols
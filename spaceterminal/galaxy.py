@@ -0,0 +1,341 @@
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+from spaceterminal.constants import PATH
+from spaceterminal.models import System, Waypoint
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS systems (
+    symbol TEXT PRIMARY KEY,
+    sector_symbol TEXT NOT NULL,
+    type TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    waypoints_imported INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS systems_xy ON systems (x, y);
+CREATE TABLE IF NOT EXISTS waypoints (
+    symbol TEXT PRIMARY KEY,
+    system_symbol TEXT NOT NULL,
+    type TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    orbits TEXT,
+    faction_symbol TEXT
+);
+CREATE INDEX IF NOT EXISTS waypoints_system ON waypoints (system_symbol, type);
+CREATE INDEX IF NOT EXISTS waypoints_type ON waypoints (type);
+CREATE TABLE IF NOT EXISTS waypoint_traits (
+    trait TEXT NOT NULL,
+    waypoint_symbol TEXT NOT NULL,
+    PRIMARY KEY (trait, waypoint_symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS waypoint_traits_waypoint
+    ON waypoint_traits (waypoint_symbol);
+"""
+
+
+class GalaxyIndex:
+    """An on-disk index of the systems and waypoints of the galaxy.
+
+    Systems and waypoints only change when the server resets, so they are imported
+    once per reset date, see space.update_galaxy, and queried locally after that.
+
+    The bulk import has the systems and the position of their waypoints. The traits
+    of the waypoints in a system are only known once the system is imported with
+    import_waypoints, see space.update_system_waypoints.
+
+    Args:
+        path: The database file, or ":memory:" for an index that isn't saved.
+    """
+
+    def __init__(self, path: str = PATH.GALAXY):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The database connection, opened and set up when first used."""
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # The index only holds data from the API, so an old layout is dropped.
+                connection.executescript(
+                    "DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS systems; "
+                    "DROP TABLE IF EXISTS waypoints; "
+                    "DROP TABLE IF EXISTS waypoint_traits;"
+                )
+                connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _meta(self, key: str) -> str:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    @property
+    def reset_date(self) -> str:
+        """The reset date of the server the index was imported from, or None."""
+        return self._meta("reset_date")
+
+    def is_current(self, reset_date: str) -> bool:
+        """Checks if the index was imported since the server last reset."""
+        return reset_date is not None and self.reset_date == reset_date
+
+    def import_systems(self, systems: Iterable[dict], reset_date: str) -> int:
+        """Replaces the whole index with the systems from the API.
+
+        Args:
+            systems: Systems decoded from JSON, with the waypoints of each system.
+            reset_date: The reset date of the server the systems are from.
+
+        Returns:
+            The number of systems imported.
+        """
+        system_rows = []
+        waypoint_rows = []
+        for system in systems:
+            system_rows.append(
+                (
+                    system["symbol"],
+                    system["sectorSymbol"],
+                    system["type"],
+                    system["x"],
+                    system["y"],
+                )
+            )
+            for waypoint in system.get("waypoints", []):
+                waypoint_rows.append(
+                    (
+                        waypoint["symbol"],
+                        system["symbol"],
+                        waypoint["type"],
+                        waypoint["x"],
+                        waypoint["y"],
+                        waypoint.get("orbits"),
+                    )
+                )
+
+        with self._lock, self.connection as connection:
+            connection.execute("DELETE FROM waypoint_traits")
+            connection.execute("DELETE FROM waypoints")
+            connection.execute("DELETE FROM systems")
+            connection.executemany(
+                "INSERT OR REPLACE INTO systems (symbol, sector_symbol, type, x, y) "
+                "VALUES (?, ?, ?, ?, ?)",
+                system_rows,
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO waypoints "
+                "(symbol, system_symbol, type, x, y, orbits) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                waypoint_rows,
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("reset_date", reset_date), ("imported", str(time.time()))],
+            )
+        return len(system_rows)
+
+    def import_waypoints(self, system_symbol: str, waypoints: Iterable[dict]) -> int:
+        """Replaces the waypoints of a system with the full waypoints from the API.
+
+        Args:
+            system_symbol: Symbol of the system.
+            waypoints: Waypoints decoded from JSON, with their traits.
+
+        Returns:
+            The number of waypoints imported.
+        """
+        waypoints = [Waypoint.from_json(data, system_symbol) for data in waypoints]
+        with self._lock, self.connection as connection:
+            connection.execute(
+                "DELETE FROM waypoint_traits WHERE waypoint_symbol IN "
+                "(SELECT symbol FROM waypoints WHERE system_symbol = ?)",
+                (system_symbol,),
+            )
+            connection.execute(
+                "DELETE FROM waypoints WHERE system_symbol = ?", (system_symbol,)
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO waypoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        waypoint.symbol,
+                        system_symbol,
+                        waypoint.type,
+                        waypoint.x,
+                        waypoint.y,
+                        waypoint.orbits,
+                        waypoint.faction_symbol,
+                    )
+                    for waypoint in waypoints
+                ],
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO waypoint_traits VALUES (?, ?)",
+                [
+                    (trait, waypoint.symbol)
+                    for waypoint in waypoints
+                    for trait in waypoint.traits
+                ],
+            )
+            connection.execute(
+                "UPDATE systems SET waypoints_imported = 1 WHERE symbol = ?",
+                (system_symbol,),
+            )
+        return len(waypoints)
+
+    def has_waypoints(self, system_symbol: str) -> bool:
+        """Checks if the full waypoints of a system, with traits, were imported."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT waypoints_imported FROM systems WHERE symbol = ?",
+                (system_symbol,),
+            ).fetchone()
+        return bool(row and row[0])
+
+    def system(self, symbol: str) -> System:
+        """Gets a system, or None if it isn't in the index."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT symbol, sector_symbol, type, x, y FROM systems "
+                "WHERE symbol = ?",
+                (symbol,),
+            ).fetchone()
+        return None if row is None else System(*row)
+
+    def systems(self) -> list[System]:
+        """Gets every system in the index."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT symbol, sector_symbol, type, x, y FROM systems"
+            ).fetchall()
+        return [System(*row) for row in rows]
+
+    def systems_near(self, x: int, y: int, radius: float) -> list[System]:
+        """Gets the systems within a distance of a point, nearest first.
+
+        The index narrows the search down to a square around the point, and only the
+        systems in the square are measured.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT symbol, sector_symbol, type, x, y FROM systems "
+                "WHERE x BETWEEN ? AND ? AND y BETWEEN ? AND ?",
+                (x - radius, x + radius, y - radius, y + radius),
+            ).fetchall()
+        systems = []
+        for row in rows:
+            distance = ((row[3] - x) ** 2 + (row[4] - y) ** 2) ** 0.5
+            if distance <= radius:
+                systems.append((distance, System(*row)))
+        systems.sort(key=lambda item: item[0])
+        return [system for _, system in systems]
+
+    def positions(self, symbols: Iterable[str]) -> dict[str, tuple]:
+        """Gets where waypoints are, to measure the distance between them.
+
+        Returns:
+            The (system symbol, system x, system y, x, y) of each waypoint that is in
+            the index, by symbol.
+        """
+        symbols = list(symbols)
+        positions = {}
+        with self._lock:
+            # SQLite limits the number of parameters of a query.
+            for start in range(0, len(symbols), 500):
+                chunk = symbols[start : start + 500]
+                rows = self.connection.execute(
+                    "SELECT w.symbol, w.system_symbol, s.x, s.y, w.x, w.y "
+                    "FROM waypoints w JOIN systems s ON s.symbol = w.system_symbol "
+                    f"WHERE w.symbol IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for symbol, *position in rows:
+                    positions[symbol] = tuple(position)
+        return positions
+
+    def waypoint(self, symbol: str) -> Waypoint:
+        """Gets a waypoint, or None if it isn't in the index."""
+        waypoints = self._waypoints("w.symbol = ?", [symbol])
+        return waypoints[0] if waypoints else None
+
+    def waypoints(
+        self, system_symbol: str = None, type: str = None, trait: str = None
+    ) -> list[Waypoint]:
+        """Gets the waypoints that match every given filter.
+
+        Args:
+            system_symbol: Only waypoints in this system.
+            type: Only waypoints of this type, like ASTEROID.
+            trait: Only waypoints with this trait, like MARKETPLACE.
+        """
+        conditions = []
+        parameters = []
+        if system_symbol is not None:
+            conditions.append("w.system_symbol = ?")
+            parameters.append(system_symbol)
+        if type is not None:
+            conditions.append("w.type = ?")
+            parameters.append(type)
+        if trait is not None:
+            conditions.append(
+                "w.symbol IN (SELECT waypoint_symbol FROM waypoint_traits "
+                "WHERE trait = ?)"
+            )
+            parameters.append(trait)
+        return self._waypoints(" AND ".join(conditions) or "1", parameters)
+
+    def _waypoints(self, condition: str, parameters: list) -> list[Waypoint]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT w.symbol, w.system_symbol, w.type, w.x, w.y, w.orbits, "
+                "w.faction_symbol, group_concat(t.trait) FROM waypoints w "
+                "LEFT JOIN waypoint_traits t ON t.waypoint_symbol = w.symbol "
+                f"WHERE {condition} GROUP BY w.symbol ORDER BY w.symbol",
+                parameters,
+            ).fetchall()
+        return [
+            Waypoint(*row[:7], traits=sorted(row[7].split(",")) if row[7] else [])
+            for row in rows
+        ]
+
+    def stats(self) -> dict:
+        """Gets the number of systems and waypoints in the index."""
+        with self._lock:
+            connection = self.connection
+            systems, imported = connection.execute(
+                "SELECT count(*), coalesce(sum(waypoints_imported), 0) FROM systems"
+            ).fetchone()
+            waypoints = connection.execute("SELECT count(*) FROM waypoints").fetchone()
+        return {
+            "systems": systems,
+            "systems_with_traits": imported,
+            "waypoints": waypoints[0],
+        }
@@ -1,50 +1,371 @@
+import functools
+
+from rich.highlighter import ReprHighlighter
 from rich.text import Text
 from textual.widgets.tree import TreeNode
 
+from spaceterminal.metrics import TREE_SECONDS
+
+# The most labels of values that are kept highlighted. A fleet repeats the same few
+# keys and values, like status='DOCKED', in every ship.
+LABEL_CACHE_SIZE = 4096
+
+HIGHLIGHTER = ReprHighlighter()
+
 
-def add_json(node: TreeNode, json_data: object) -> None:
+def add_json(
+    node: TreeNode, json_data: object, name: str = "Ships", lazy: bool = False
+) -> None:
     """Adds JSON data to a node.
 
+    In lazy mode only the top level items, like each ship, are added straight away.
+    Their children are added when the node is first expanded, see load_children.
+
     Args:
         node (TreeNode): A Tree node.
         json_data (object): An object decoded from JSON.
+        name (str): Name of the node.
+        lazy (bool): Only add the children of a node when it is expanded.
+    """
+    with TREE_SECONDS.time(operation="add"):
+        add_node(name, node, json_data, lazy)
+        if lazy:
+            add_lazy_children(node)
+
+
+def add_json_items(
+    node: TreeNode, items: list, start: int = 0, lazy: bool = False
+) -> None:
+    """Adds more list items to a node that was created by add_json from a list.
+
+    This allows a paginated list to be added to the tree one page at a time.
+
+    Args:
+        node (TreeNode): The node created from the list.
+        items (list): The items to add to the node.
+        start (int): Index of the first item, used when the item has no name.
+        lazy (bool): Only add the children of a node when it is expanded.
+    """
+    with TREE_SECONDS.time(operation="add_items"):
+        if isinstance(node.data, list):
+            node.data.extend(items)
+        add_items(
+            node,
+            [
+                (item_name(index, value), value)
+                for index, value in enumerate(items, start)
+            ],
+            lazy,
+        )
+
+
+def update_json(
+    node: TreeNode, json_data: object, name: str = "Ships", lazy: bool = False
+) -> int:
+    """Updates a node created by add_json with new JSON data.
+
+    The new data is diffed against the data of the existing nodes. List items are
+    matched by their id or symbol, so only the labels and subtrees that actually
+    changed are updated, and the expanded nodes stay expanded.
+
+    Args:
+        node (TreeNode): The node created by add_json.
+        json_data (object): The new object decoded from JSON.
+        name (str): Name of the node.
+        lazy (bool): Only add the children of new nodes when they are expanded.
+
+    Returns:
+        The number of nodes that were added, removed, or relabeled.
+    """
+    with TREE_SECONDS.time(operation="update"):
+        return update_node(name, node, json_data, lazy)
+
+
+def load_children(node: TreeNode) -> None:
+    """Adds the children of a node that was added in lazy mode.
+
+    This should be called when the node is expanded. Nothing is done if the children
+    have already been added.
+
+    Args:
+        node (TreeNode): A Tree node.
+    """
+    with TREE_SECONDS.time(operation="load"):
+        add_lazy_children(node)
+
+
+def load_all(node: TreeNode) -> None:
+    """Adds the children of a lazy node at every depth, so it can be fully expanded.
+
+    Args:
+        node (TreeNode): A Tree node.
+    """
+    with TREE_SECONDS.time(operation="load_all"):
+        add_all_children(node)
+
+
+def reveal(node: TreeNode, path: tuple) -> TreeNode:
+    """Gets the node of a value below a node, and expands the nodes above it.
+
+    Only the lazy nodes on the way to the value have their children added, so the
+    rest of the tree stays as it was.
+
+    Args:
+        node (TreeNode): A node created by add_json.
+        path (tuple): The keys and list indexes from the data of node to the value.
+
+    Returns:
+        The node of the value.
+    """
+    for key in path:
+        add_lazy_children(node)
+        index = key if isinstance(node.data, list) else list(node.data).index(key)
+        node.expand()
+        node = node.children[index]
+    return node
+
+
+def add_lazy_children(node: TreeNode) -> None:
+    """Adds the children of a lazy node, unless they have already been added.
+
+    Args:
+        node (TreeNode): A Tree node.
+    """
+    if node.children or not isinstance(node.data, (dict, list)):
+        return
+    add_children(node, node.data, lazy=True)
+
+
+def add_all_children(node: TreeNode) -> None:
+    """Adds the children of a lazy node at every depth.
+
+    Args:
+        node (TreeNode): A Tree node.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        add_lazy_children(node)
+        stack.extend(node.children)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE, typed=True)
+def value_label(name: str, value: object) -> Text:
+    """Creates the highlighted label of a value, like status='DOCKED'.
+
+    The labels are cached, as highlighting is most of the cost of adding a node. The
+    cache is typed, so 1, 1.0, and True each get their own label. A label must not be
+    changed, which the tree never does, as it copies labels when they are set.
+
+    Args:
+        name (str): Name of the node.
+        value (object): A value decoded from JSON, but not a dict or list.
+    """
+    if name:
+        return Text.assemble(
+            Text.from_markup(f"[b]{name}[/b]="), HIGHLIGHTER(repr(value))
+        )
+    return Text(repr(value))
+
+
+def make_label(name: str, data: object) -> Text:
+    """Creates the label of a node.
+
+    Args:
+        name (str): Name of the node.
+        data (object): Data associated with the node.
+    """
+    if isinstance(data, dict):
+        return Text(f"{{}} {name}")
+    elif isinstance(data, list):
+        return Text(f"[] {name}")
+    return value_label(name, data)
+
+
+def add_node(name: str, node: TreeNode, data: object, lazy: bool = False) -> None:
+    """Sets the data and label of a node, and adds its children.
+
+    The data is kept on the node, so it can be loaded lazily or diffed later.
+
+    Args:
+        name (str): Name of the node.
+        node (TreeNode): The node.
+        data (object): Data associated with the node.
+        lazy (bool): Only add the children of the node when it is expanded.
+    """
+    node.data = data
+    node.set_label(make_label(name, data))
+    if not isinstance(data, (dict, list)):
+        node.allow_expand = False
+    elif not lazy:
+        add_children(node, data)
+
+
+def add_children(node: TreeNode, data: object, lazy: bool = False) -> None:
+    """Adds a node for each item in a dict or list.
+
+    Args:
+        node (TreeNode): Parent node.
+        data (object): The dict or list.
+        lazy (bool): Only add the children of a node when it is expanded.
+    """
+    add_items(node, child_items(data), lazy)
+
+
+def add_items(node: TreeNode, items: list, lazy: bool = False) -> None:
+    """Adds a node for each (name, value) in items.
+
+    The nodes are added from a stack rather than by recursion, so data of any depth
+    can be added. Each node is created with its label and data, rather than set
+    afterwards, which would process the label twice.
+
+    Args:
+        node (TreeNode): Parent node.
+        items (list): The (name, value) of each node.
+        lazy (bool): Only add the children of a node when it is expanded.
+    """
+    # The stack is reversed, so the items are added in order.
+    stack = [(node, name, value) for name, value in reversed(items)]
+    while stack:
+        parent, name, data = stack.pop()
+        container = isinstance(data, (dict, list))
+        child = parent.add(make_label(name, data), data, allow_expand=container)
+        if container and not lazy:
+            stack.extend(
+                (child, child_name, value)
+                for child_name, value in reversed(child_items(data))
+            )
+
+
+def item_name(index: int, value: object) -> str:
+    """Gets the name of a list item, which is its name or symbol when it has one."""
+    if isinstance(value, dict) and "name" in value:
+        return str(value["name"])
+    elif isinstance(value, dict) and "symbol" in value:
+        return str(value["symbol"])
+    else:
+        return str(index)
+
+
+def item_key(index: int, value: object) -> object:
+    """Gets the key that identifies a list item between refreshes.
+
+    Contracts are identified by their id, and ships by their symbol. Anything else is
+    identified by its position in the list.
+    """
+    if isinstance(value, dict):
+        for key in ("id", "symbol", "name"):
+            if key in value:
+                return key, value[key]
+    return "index", index
+
+
+def child_keys(data: object) -> list:
+    """Gets the keys of the items of a dict or list, in order.
+
+    List items can share a key, like two of the same module, so each key is paired
+    with how many times it was seen before.
     """
+    if isinstance(data, dict):
+        return list(data)
+    keys = []
+    seen = {}
+    for index, value in enumerate(data):
+        key = item_key(index, value)
+        seen[key] = seen.get(key, -1) + 1
+        keys.append((key, seen[key]))
+    return keys
+
+
+def child_items(data: object) -> list:
+    """Gets the (name, value) of the items of a dict or list, in order."""
+    if isinstance(data, dict):
+        return list(data.items())
+    return [(item_name(index, value), value) for index, value in enumerate(data)]
+
+
+def same(old: object, data: object) -> bool:
+    """Checks if data is equal to old data, and of the same type.
+
+    Data too deep to be compared at once is taken to be different, so its children
+    are compared one by one instead.
+    """
+    try:
+        return old == data and type(old) is type(data)
+    except RecursionError:
+        return False
+
 
-    from rich.highlighter import ReprHighlighter
-
-    highlighter = ReprHighlighter()
-
-    def add_node(name: str, node: TreeNode, data: object) -> None:
-        """Adds a node to the tree.
-
-        Args:
-            name (str): Name of the node.
-            node (TreeNode): Parent node.
-            data (object): Data associated with the node.
-        """
-        if isinstance(data, dict):
-            node.set_label(Text(f"{{}} {name}"))
-            for key, value in data.items():
-                new_node = node.add("")
-                add_node(key, new_node, value)
-        elif isinstance(data, list):
-            node.set_label(Text(f"[] {name}"))
-            for index, value in enumerate(data):
-                new_node = node.add("")
-                if "name" in value:
-                    add_node(str(value["name"]), new_node, value)
-                elif "symbol" in value:
-                    add_node(str(value["symbol"]), new_node, value)
-                else:
-                    add_node(str(index), new_node, value)
-        else:
+def update_node(name: str, node: TreeNode, data: object, lazy: bool = False) -> int:
+    """Updates a node, and its children, to new data.
+
+    Like add_items, the nodes are updated from a stack, so data of any depth can be
+    diffed.
+
+    Args:
+        name (str): Name of the node.
+        node (TreeNode): The node to update.
+        data (object): The new data associated with the node.
+        lazy (bool): Only add the children of new nodes when they are expanded.
+
+    Returns:
+        The number of nodes that were added, removed, or relabeled.
+    """
+    changes = 0
+    stack = [(name, node, data)]
+    while stack:
+        name, node, data = stack.pop()
+        old = node.data
+        if same(old, data):
+            node.data = data
+            continue
+
+        label = make_label(name, data)
+        if str(node.label) != label.plain or not isinstance(data, (dict, list)):
+            node.set_label(label)
+            changes += 1
+        node.data = data
+
+        if not isinstance(data, (dict, list)):
+            if node.children:
+                changes += len(node.children)
+                node.remove_children()
             node.allow_expand = False
-            if name:
-                label = Text.assemble(
-                    Text.from_markup(f"[b]{name}[/b]="), highlighter(repr(data))
-                )
+            continue
+        node.allow_expand = True
+
+        if not node.children:
+            # The children of a lazy node that was never expanded are added when it is.
+            if not lazy or node.is_expanded:
+                add_children(node, data, lazy)
+                changes += len(node.children)
+            continue
+
+        old_keys = child_keys(old) if type(old) is type(data) else []
+        new_keys = child_keys(data)
+        new_keys_set = set(new_keys)
+        kept = [key for key in old_keys if key in new_keys_set]
+        if len(old_keys) != len(node.children) or kept != new_keys[: len(kept)]:
+            # The items were reordered. The tree can only append nodes, so the
+            # children are added again.
+            changes += len(node.children)
+            node.remove_children()
+            add_children(node, data, lazy)
+            changes += len(node.children)
+            continue
+
+        children = {}
+        for key, child in zip(old_keys, list(node.children)):
+            if key in new_keys_set:
+                children[key] = child
             else:
-                label = Text(repr(data))
-            node.set_label(label)
+                child.remove()
+                changes += 1
 
-    add_node("Ships", node, json_data)
+        for key, (child_name, value) in zip(new_keys, child_items(data)):
+            if key in children:
+                stack.append((child_name, children[key], value))
+            else:
+                add_items(node, [(child_name, value)], lazy)
+                changes += 1
+    return changes
@@ -1,32 +1,84 @@
+import asyncio
+import datetime
 import json
-import os
-
-import contracts as con
-import jsonTree as jt
-import space as s
-from agent import Agent
-from client import Client
-from textual import on
+from collections import Counter
+from collections.abc import AsyncIterator
+
+import requests
+from textual import on, work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal
+from textual.geometry import Region
 from textual.screen import ModalScreen, Screen
+from textual.widget import Widget
 from textual.widgets import (
     Button,
+    DataTable,
     Footer,
     Header,
     Input,
     Label,
     Markdown,
     Placeholder,
+    ProgressBar,
+    Select,
+    Sparkline,
     Static,
     TabbedContent,
     TabPane,
     Tree,
 )
-
-CLIENT = Client()
+from textual.widgets.tree import TreeNode
+
+from spaceterminal import fleetops
+from spaceterminal import jsonTree as jt
+from spaceterminal import space as s
+from spaceterminal.agent import Agent
+from spaceterminal.client import AsyncClient, Client, Priority, priority
+from spaceterminal.constants import PATH, URL
+from spaceterminal.contracts import (
+    ACCEPT,
+    FULFILL,
+    ContractAction,
+    MyContracts,
+    contract_node,
+)
+from spaceterminal.fleetops import FleetOperations
+from spaceterminal.fleetview import COLUMNS, FleetView
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.markets import MarketStore
+from spaceterminal.metrics import (
+    CACHE_HITS,
+    LIMITER_WAIT_SECONDS,
+    RATE_LIMITED,
+    REQUESTS,
+    RETRIES,
+    TREE_SECONDS,
+    endpoint_stats,
+)
+from spaceterminal.models import ServerStatus, ShipModels
+from spaceterminal.recording import Recorder, ReplayAdapter
+from spaceterminal.search import SearchIndex
+from spaceterminal.snapshots import SnapshotStore
+from spaceterminal.timers import ARRIVAL, ShipEvent, ShipTimers
+from spaceterminal.timeseries import TimeSeriesStore, ship_samples
+from spaceterminal.trade import MarketSnapshot
+
+# Set SPACETERMINAL_RECORD to record the session, or SPACETERMINAL_REPLAY to replay
+# a recorded one, see recording.
+CLIENT = Client(recorder=Recorder.from_env(), replay=ReplayAdapter.from_env())
+ASYNC_CLIENT = AsyncClient(CLIENT)
 AGENT = Agent(CLIENT)
+CONTRACTS = MyContracts(CLIENT)
+FLEET = FleetOperations(CLIENT)
+GALAXY = GalaxyIndex()
+MARKETS = MarketStore()
+TIMESERIES = TimeSeriesStore()
+TIMERS = ShipTimers()
+SEARCH = SearchIndex()
+SNAPSHOTS = SnapshotStore()
+SHIPS = ShipModels()
 
 LOGIN_MD = """
 
@@ -35,16 +87,201 @@ LOGIN_MD = """
 A SpaceTrader API interface. Enter access token to start, or create new account.
 """
 
-REGISTER_MD = f"""
+REGISTER_MD = """
 
 Players are called agents, and each agent is identified by a unique call sign, such as ZER0_SH0T or SP4CE_TR4DER. All of your ships, contracts, credits, and other game assets will be associated with your agent identity.
 
 Your starting faction will determine which system you start in, but the default faction should be fine for now.
 
-Available recruiting factions: {s.get_factions_list()}
+Available recruiting factions: {factions}
 """
 
 
+async def update_json_tree(tree: Tree, pages: AsyncIterator, name: str) -> dict:
+    """Updates a tree with the data of each page of a paginated endpoint.
+
+    The first time, each page is added to the tree as soon as it arrives. After that,
+    all of the pages are diffed against the tree, so only what changed is updated and
+    the expanded nodes stay expanded.
+
+    Args:
+        tree: The tree to update.
+        pages: The decoded JSON of each page.
+        name: Name of the top node of the tree.
+
+    Returns:
+        The error of the page that failed, or None if every page was loaded.
+    """
+    json_node = tree.root.children[0] if tree.root.children else None
+    refresh = json_node is not None
+    items = []
+    tree.loading = not refresh
+    try:
+        async for page in pages:
+            tree.loading = False
+            if "error" in page:
+                return page["error"]
+
+            if refresh:
+                items.extend(page["data"])
+            elif json_node is None:
+                json_node = add_json_tree(tree, page["data"], name)
+            else:
+                jt.add_json_items(
+                    json_node, page["data"], len(json_node.children), lazy=True
+                )
+    finally:
+        tree.loading = False
+
+    if refresh:
+        jt.update_json(json_node, items, name, lazy=True)
+    return None
+
+
+def add_json_tree(tree: Tree, items: list, name: str) -> TreeNode:
+    """Adds the top node of a tree, with a lazy node for each item below it."""
+    tree.show_root = False
+    json_node = tree.root.add(name)
+    jt.add_json(json_node, items, name, lazy=True)
+    tree.root.expand()
+    return json_node
+
+
+def stale_note(saved: float) -> str:
+    """Gets the note shown with data from the last session, until it is updated."""
+    saved = datetime.datetime.fromtimestamp(saved)
+    return f"*From the last session, saved {saved:%Y-%m-%d %H:%M}. Updating...*"
+
+
+async def watch_ships(pages: AsyncIterator) -> AsyncIterator:
+    """Passes on the pages of ships, and once every page has arrived, records the fuel
+    and cargo of the ships that changed and sets their arrival and cooldown timers."""
+    ships = []
+    async for page in pages:
+        ships.extend(page.get("data", []))
+        yield page
+    await ASYNC_CLIENT.run(TIMESERIES.record, ship_samples(ships), changed_only=True)
+    TIMERS.update_fleet(SHIPS.decode(ship) for ship in ships)
+
+
+async def index_pages(pages: AsyncIterator, kind: str) -> AsyncIterator:
+    """Passes on the pages of ships or contracts, adding each one to the search
+    index, and once every page has arrived, drops the ones that are gone."""
+    items = []
+    complete = True
+    async for page in pages:
+        if "error" in page:
+            complete = False
+        else:
+            items.extend(page["data"])
+            SEARCH.update(kind, page["data"])
+        yield page
+    if complete:
+        SEARCH.keep(kind, items)
+
+
+async def save_pages(pages: AsyncIterator, section: str) -> AsyncIterator:
+    """Passes on the pages of ships or contracts, and once every page has arrived,
+    saves them to the snapshot of the access token, see snapshots."""
+    access_token = CLIENT.access_token
+    items = []
+    complete = True
+    async for page in pages:
+        if "error" in page:
+            complete = False
+        else:
+            items.extend(page["data"])
+        yield page
+    if complete:
+        await ASYNC_CLIENT.run(SNAPSHOTS.save, access_token, section, items)
+
+
+class SearchBar(Horizontal):
+    """Searches the ships or contracts, and moves the cursor of the tree next to it
+    to each match in turn, expanding only the nodes on the way.
+
+    Args:
+        kind: The kind of documents to search, see SearchIndex.
+        placeholder: The placeholder of the input.
+    """
+
+    def __init__(self, kind: str, placeholder: str, **kwargs):
+        super().__init__(**kwargs)
+        self.kind = kind
+        self.placeholder = placeholder
+        self.matches = []
+        self.current = -1
+
+    def compose(self) -> ComposeResult:
+        yield Input(placeholder=self.placeholder)
+        yield Label("", classes="label-search")
+
+    def json_node(self) -> TreeNode:
+        tree = self.parent.query_one(Tree)
+        return tree.root.children[0] if tree.root.children else None
+
+    @on(Input.Changed)
+    def input_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        self.search(event.value)
+
+    def search(self, query: str) -> None:
+        """Finds the matches, in the order of the tree."""
+        json_node = self.json_node()
+        positions = {}
+        if json_node is not None:
+            positions = {
+                jt.item_key(index, item): index
+                for index, item in enumerate(json_node.data)
+            }
+        # Documents that are indexed but not in the tree yet can't be jumped to.
+        self.matches = sorted(
+            (
+                (positions[match.key], match)
+                for match in SEARCH.search(query, self.kind)
+                if match.key in positions
+            ),
+            key=lambda item: (item[0], item[1].number),
+        )
+        self.current = -1
+        label = f"{len(self.matches)} matches" if query.strip() else ""
+        self.query_one(Label).update(label)
+
+    @on(Input.Submitted)
+    def next_match(self, event: Input.Submitted) -> None:
+        """Moves the cursor to the next match, after the last one back to the first."""
+        event.stop()
+        json_node = self.json_node()
+        if not self.matches or json_node is None:
+            return
+        self.current = (self.current + 1) % len(self.matches)
+        position, match = self.matches[self.current]
+        try:
+            node = jt.reveal(json_node, (position, *match.path))
+        except (IndexError, ValueError):
+            # The tree changed since the search, so search again.
+            self.search(self.query_one(Input).value)
+            return
+        path = ".".join(str(key) for key in match.path)
+        self.query_one(Label).update(
+            f"{self.current + 1} of {len(self.matches)}: {match.key[1]} {path}"
+        )
+        tree = self.parent.query_one(Tree)
+        # The lines of the expanded nodes are only known after the next refresh.
+        tree.call_after_refresh(self.move_cursor, tree, node)
+
+    def move_cursor(self, tree: Tree, node: TreeNode) -> None:
+        tree.select_node(node)
+        # The tree grows to fit its nodes, so it is the tab around it that scrolls.
+        for container in tree.ancestors:
+            if isinstance(container, Widget) and container.max_scroll_y:
+                y = tree.content_region.y + node.line - container.content_region.y
+                region = Region(0, container.scroll_y + y, 1, 1)
+                container.scroll_to_region(region, animate=False, center=True)
+                return
+        tree.scroll_to_node(node, animate=False)
+
+
 class LoginScreen(ModalScreen[str]):
     BINDINGS = [
         Binding(key="escape", action="app.pop_screen", description="Close Login")
@@ -85,7 +322,17 @@ class RegisterContainer(Container):
     register_markdown = Markdown()
 
     def on_mount(self) -> None:
-        self.register_markdown.update(REGISTER_MD)
+        self.register_markdown.update(REGISTER_MD.format(factions="Loading..."))
+        self.update_factions()
+
+    @work(exclusive=True, group="factions")
+    async def update_factions(self) -> None:
+        """Fetches the recruiting factions when the register screen is first shown."""
+        try:
+            factions = await ASYNC_CLIENT.run(s.get_factions_list)
+        except requests.exceptions.RequestException:
+            factions = "Unable to load factions."
+        self.register_markdown.update(REGISTER_MD.format(factions=factions))
 
     def compose(self) -> ComposeResult:
         yield self.register_markdown
@@ -163,22 +410,42 @@ class AgentBody(Static):
 
     agent_markdown = Markdown()
     last_updated_markdown = Markdown(classes="markdown-last-updated")
+    credits_label = Label("Credits over the last 30 days", id="label-credits")
+    credits_sparkline = Sparkline(id="sparkline-credits")
+    credits_seconds = 30 * 24 * 60 * 60
+    loaded = False
 
     def on_mount(self) -> None:
-        self.update_agent_info()
+        # There is nothing to load until the user has logged in.
+        if CLIENT.access_token is not None:
+            self.update_agent_info()
 
     def compose(self) -> ComposeResult:
         with Horizontal(classes="horizontal-last-updated"):
             yield self.last_updated_markdown
             yield Button("Update", id="button-update-agent", variant="warning")
         yield self.agent_markdown
+        yield self.credits_label
+        yield self.credits_sparkline
 
     @on(Button.Pressed, "#button-update-agent")
     def button_update_agent(self) -> None:
+        # Asking for an update should never show the cached agent.
+        CLIENT.cache.invalidate(CLIENT.access_token, URL.AGENT)
         self.update_agent_info()
 
-    def update_agent_info(self) -> None:
-        AGENT.update_agent()
+    @work(exclusive=True, group="agent")
+    async def update_agent_info(self) -> None:
+        await self.load_agent_info()
+
+    async def load_agent_info(self) -> None:
+        access_token = CLIENT.access_token
+        self.agent_markdown.loading = True
+        try:
+            response = await ASYNC_CLIENT.get(URL.AGENT)
+        finally:
+            self.agent_markdown.loading = False
+        AGENT.update_agent(response)
 
         if AGENT.error is not None:
             agent_md = f"""
@@ -187,7 +454,29 @@ Code: {AGENT.error["code"]}
 {AGENT.error["message"]}"""
             self.agent_markdown.update(agent_md)
         else:
-            agent_md = f"""
+            self.loaded = True
+            self.show_agent()
+            self.remove_class("stale")
+            agent = response.json()["data"]
+            await ASYNC_CLIENT.run(SNAPSHOTS.save, access_token, "agent", agent)
+            # The store is shared by every agent logged in with.
+            credits = f"agent.{AGENT.symbol}.credits"
+            await ASYNC_CLIENT.run(TIMESERIES.record, {credits: AGENT.my_credits})
+            self.update_credits_history()
+
+    async def restore(self, snapshot: dict) -> None:
+        """Shows the agent of the last session, unless it has been loaded since."""
+        section = snapshot.get("agent")
+        if section is None or self.loaded:
+            return
+        AGENT.update_from_json(section["data"])
+        AGENT.last_updated = datetime.datetime.fromtimestamp(section["saved"])
+        self.show_agent()
+        self.last_updated_markdown.update(stale_note(section["saved"]))
+        self.add_class("stale")
+
+    def show_agent(self) -> None:
+        agent_md = f"""
 Account ID: {AGENT.account_id}
 
 Symbol: {AGENT.symbol}
@@ -199,114 +488,475 @@ Credits: {AGENT.my_credits}
 Starting Faction: {AGENT.starting_faction}
 
 Last Updated: {AGENT.last_updated}"""
-            last_updated_md = f"""Last Updated: {AGENT.last_updated}"""
-            self.agent_markdown.update(agent_md)
-            self.last_updated_markdown.update(last_updated_md)
+        last_updated_md = f"""Last Updated: {AGENT.last_updated}"""
+        self.agent_markdown.update(agent_md)
+        self.last_updated_markdown.update(last_updated_md)
+
+    @work(exclusive=True, group="agent-history")
+    async def update_credits_history(self) -> None:
+        credits = TIMESERIES.series(f"agent.{AGENT.symbol}.credits")
+        history = await ASYNC_CLIENT.run(
+            credits.recent,
+            self.credits_seconds,
+            self.credits_sparkline.size.width or 60,
+        )
+        self.credits_sparkline.data = history
 
 
 class StatusBody(Static):
     """Body content of the status tab."""
 
     status_markdown = Markdown()
+    loaded = False
+    importing_galaxy = False
 
     def on_mount(self) -> None:
-        self.update_status()
+        # Wait for the first frame to be drawn before touching the network.
+        self.call_after_refresh(self.update_status)
 
     def compose(self) -> ComposeResult:
         yield self.status_markdown
 
-    def update_status(self) -> None:
-        response = s.get_status()
+    @work(exclusive=True, group="status")
+    async def update_status(self) -> None:
+        if not self.loaded:
+            # Show the status of the last session while the server is asked.
+            snapshot = await ASYNC_CLIENT.run(SNAPSHOTS.load, CLIENT.access_token)
+            await self.restore(snapshot)
+        await self.load_status()
+
+    async def restore(self, snapshot: dict) -> None:
+        """Shows the status of the last session, unless it has been loaded since."""
+        section = snapshot.get("status")
+        if section is None or self.loaded:
+            return
+        status = ServerStatus.from_json(section["data"])
+        self.status_markdown.add_class("online")
+        self.show_status(status, stale_note(section["saved"]))
+        self.add_class("stale")
+
+    async def load_status(self) -> None:
+        access_token = CLIENT.access_token
+        self.status_markdown.loading = True
+        try:
+            response = await ASYNC_CLIENT.run(s.get_status, CLIENT)
+            status = response.json()
+        except requests.exceptions.ConnectionError:
+            self.status_markdown.add_class("offline")
+            self.status_markdown.update("# Unable to reach the SpaceTraders API")
+            return
+        except (requests.RequestException, ValueError) as error:
+            # Like a timeout, or a response that isn't JSON.
+            self.status_markdown.add_class("offline")
+            self.status_markdown.update(f"""# Unable to load the status
+
+{type(error).__name__}: {error}""")
+            return
+        finally:
+            self.status_markdown.loading = False
         response_code = response.status_code
-        status = s.get_status().json()
 
         if response_code == 200:
+            self.loaded = True
+            self.remove_class("stale")
             self.status_markdown.add_class("online")
+            server_status = ServerStatus.from_json(status)
+            self.show_status(server_status)
+            self.update_galaxy(server_status.reset_date)
+            await ASYNC_CLIENT.run(SNAPSHOTS.save, access_token, "status", status)
+
+        else:
+            self.status_markdown.add_class("offline")
             status_md = f"""
-# Status: {status["status"]}
+# {status["error"]["message"]}
 
-Version: {status["version"]}
+{status["error"]["code"]}
+"""
+            self.status_markdown.update(status_md)
+
+    def show_status(self, status: ServerStatus, note: str = "") -> None:
+        status_md = f"""
+# Status: {status.status}
 
-Description: {status["description"]}
+{note}
+
+Version: {status.version}
+
+Description: {status.description}
 
 #### Stats
 
-Agents: {status["stats"]["agents"]}
+Agents: {status.agents}
 
-Ships: {status["stats"]["ships"]}
+Ships: {status.ships}
 
-Systems: {status["stats"]["systems"]}
+Systems: {status.systems}
 
-Waypoints: {status["stats"]["waypoints"]}
+Waypoints: {status.waypoints}
 
 #### Server Resets
 
-Reset Date: {status["resetDate"]}
+Reset Date: {status.reset_date}
 
-Next: {status["serverResets"]["next"]}
+Next: {status.next_reset}
 
-Frequency: {status["serverResets"]["frequency"]}
+Frequency: {status.reset_frequency}
 """
-            self.status_markdown.update(status_md)
-
+        self.status_markdown.update(status_md)
+
+    @work(group="galaxy")
+    async def update_galaxy(self, reset_date: str) -> None:
+        """Imports the systems of the galaxy once per server reset.
+
+        Only one import runs at a time, and the status loaded again while it runs
+        doesn't start another. The worker can't be exclusive, as cancelling it would
+        leave the import running in its thread.
+        """
+        if self.importing_galaxy:
+            return
+        self.importing_galaxy = True
+        try:
+            if await ASYNC_CLIENT.run(GALAXY.is_current, reset_date):
+                return
+            with priority(Priority.BACKGROUND):
+                error = await ASYNC_CLIENT.run(
+                    s.update_galaxy, CLIENT, GALAXY, reset_date
+                )
+        finally:
+            self.importing_galaxy = False
+        if error is not None:
+            self.notify(error["error"]["message"], title="Galaxy import failed")
         else:
-            self.status_markdown.add_class("offline")
-            status_md = f"""
-# {status["error"]["message"]}
-
-{status["error"]["code"]}
-"""
-            self.status_markdown.update(status_md)
+            systems = GALAXY.stats()["systems"]
+            self.notify(f"Imported {systems} systems", title="Galaxy")
 
 
 class ShipsBody(Static):
+    """Body content of the ships tab, as a tree of the JSON of each ship, or as a
+    table with one row per ship that can be sorted and filtered."""
+
     BINDINGS = [
         Binding(key="e", action="expand_all_tree", description="Expand all"),
         Binding(key="c", action="collapse_all_tree", description="Collapse all"),
+        Binding(key="t", action="toggle_view", description="Table/Tree"),
+        Binding(key="slash", action="search", description="Search"),
+        Binding(key="b", action="toggle_ops", description="Fleet actions"),
     ]
 
     ships_markdown = Markdown()
+    table_view = False
+    filter_delay = 0.3
 
     def action_expand_all_tree(self):
         node = self.query_one(Tree).get_node_at_line(0)
+        jt.load_all(node)
         node.expand_all()
 
     def action_collapse_all_tree(self):
         node = self.query_one(Tree).get_node_at_line(0)
         node.collapse_all()
 
+    def action_search(self) -> None:
+        search = "#input-ships-filter" if self.table_view else "#search-ships Input"
+        self.query_one(search).focus()
+
+    def action_toggle_view(self) -> None:
+        self.table_view = not self.table_view
+        self.show_view()
+        self.update_my_ships_info()
+
+    def action_toggle_ops(self) -> None:
+        ops = self.query_one("#container-ships-ops")
+        ops.display = not ops.display
+        if ops.display:
+            self.query_one("#select-ships-op").focus()
+
+    def show_view(self) -> None:
+        """Shows the tree or the table, and focuses it so its bindings show."""
+        self.query_one("#tree-ships").display = not self.table_view
+        self.query_one("#search-ships").display = not self.table_view
+        self.query_one("#container-ships-table").display = self.table_view
+        view = "#table-ships" if self.table_view else "#tree-ships"
+        self.app.set_focus(self.query_one(view))
+
+    @on(Tree.NodeExpanded)
+    def load_node_children(self, event: Tree.NodeExpanded) -> None:
+        jt.load_children(event.node)
+
     def compose(self) -> ComposeResult:
         yield self.ships_markdown
+        with Container(id="container-ships-ops"):
+            with Horizontal(id="horizontal-ships-ops"):
+                yield Select(
+                    [(label, action) for action, label in fleetops.ACTIONS.items()],
+                    prompt="Fleet action",
+                    id="select-ships-op",
+                )
+                yield Button("Run", id="button-ships-op", variant="primary")
+            yield ProgressBar(id="progress-ships-op", show_eta=False)
+            yield DataTable(id="table-ships-op", cursor_type="row")
+        yield SearchBar(
+            "ships",
+            "Search ships, like X1-DF55 or IRON_ORE, Enter for the next match",
+            id="search-ships",
+            classes="search-bar",
+        )
         yield Tree("Root", id="tree-ships")
+        with Container(id="container-ships-table"):
+            yield Input(
+                placeholder="Filter ships, like docked or X1-DF55",
+                id="input-ships-filter",
+            )
+            yield DataTable(id="table-ships", cursor_type="row")
 
-    def update_my_ships_info(self):
-        ships = s.get_my_ships(CLIENT).json()
-
-        if "error" in ships:
+    def on_mount(self) -> None:
+        self.fleet = FleetView()
+        # The JSON of each ship, by symbol, as it was last loaded or changed.
+        self.ships_json = {}
+        table = self.query_one("#table-ships", DataTable)
+        for key, label in COLUMNS:
+            table.add_column(label, key=key)
+        self.query_one("#container-ships-table").display = False
+        ops = self.query_one("#table-ships-op", DataTable)
+        for key in ("ship", "action", "status", "result"):
+            ops.add_column(key.title(), key=key)
+        self.query_one("#container-ships-ops").display = False
+        # The ships may be loaded by the tab and by the warm up at the same time.
+        self.load_lock = asyncio.Lock()
+
+    @work(exclusive=True, group="ships")
+    async def update_my_ships_info(self):
+        await self.load_my_ships_info()
+
+    async def load_my_ships_info(self) -> None:
+        """Loads the ships into the tree or the table, whichever is shown.
+
+        Only one load runs at a time, so a load waits for the one before it, and then
+        only diffs against what it added, mostly from the cache.
+        """
+        async with self.load_lock:
+            pages = watch_ships(ASYNC_CLIENT.iterate(s.get_my_ships_pages(CLIENT)))
+            pages = index_pages(self.keep_ships(pages), "ships")
+            pages = save_pages(pages, "ships")
+            if self.table_view:
+                error = await self.update_table(pages)
+            else:
+                tree = self.query_one("#tree-ships")
+                error = await update_json_tree(tree, pages, "Ships")
+
+        if error is not None:
             ships_md = f"""
-Code: {ships["error"]["code"]}
+Code: {error["code"]}
 
-{ships["error"]["message"]}
+{error["message"]}
 """
             self.ships_markdown.update(ships_md)
 
+        elif self.table_view:
+            self.remove_class("stale")
+            self.update_table_markdown()
         else:
-            tree = self.query_one("#tree-ships")
-            tree.show_root = False
-            tree.reset("#tree-ships")
-            json_node = tree.root.add("Ships")
-            ships = ships["data"]
-            jt.add_json(json_node, ships)
-            tree.root.expand()
-
+            self.remove_class("stale")
             ships_md = f"""# Available Ships"""
             self.ships_markdown.update(ships_md)
 
+    async def restore(self, snapshot: dict) -> None:
+        """Shows the ships of the last session in the tree, unless they have been
+        loaded since."""
+        section = snapshot.get("ships")
+        if section is None:
+            return
+        async with self.load_lock:
+            tree = self.query_one("#tree-ships", Tree)
+            if tree.root.children:
+                return
+            add_json_tree(tree, section["data"], "Ships")
+            SEARCH.update("ships", section["data"])
+        self.ships_markdown.update(f"""# Available Ships
+
+{stale_note(section["saved"])}""")
+        self.add_class("stale")
+
+    async def keep_ships(self, pages: AsyncIterator) -> AsyncIterator:
+        """Passes on the pages of ships, keeping the JSON of each ship."""
+        async for page in pages:
+            for ship in page.get("data", []):
+                self.ships_json[ship["symbol"]] = ship
+            yield page
+
+    async def update_table(self, pages: AsyncIterator) -> dict:
+        """Adds the rows of each page of ships to the table as soon as it arrives.
+
+        Once every page has arrived, the rows of the ships that are gone are removed
+        and the table is sorted again.
+
+        Returns:
+            The error of the page that failed, or None if every page was loaded.
+        """
+        table = self.query_one("#table-ships", DataTable)
+        symbols = []
+        table.loading = not self.fleet.ships
+        try:
+            async for page in pages:
+                table.loading = False
+                if "error" in page:
+                    return page["error"]
+                ships = [SHIPS.decode(data) for data in page["data"]]
+                symbols.extend(ship.symbol for ship in ships)
+                self.sync_table(self.fleet.update(ships))
+                self.update_table_markdown()
+        finally:
+            table.loading = False
+        self.sync_table(self.fleet.keep(symbols))
+        self.sort_table()
+        return None
+
+    def sync_table(self, symbols: list[str]) -> None:
+        """Adds, updates, or removes the rows of ships, so only the cells that changed
+        are redrawn and the cursor stays put."""
+        table = self.query_one("#table-ships", DataTable)
+        for symbol in symbols:
+            shown = symbol in table.rows
+            if not self.fleet.matches(symbol):
+                if shown:
+                    table.remove_row(symbol)
+            elif not shown:
+                table.add_row(*self.fleet.cells[symbol], key=symbol)
+            else:
+                for (column, _), value in zip(COLUMNS, self.fleet.cells[symbol]):
+                    if table.get_cell(symbol, column) != value:
+                        table.update_cell(symbol, column, value)
+
+    def sort_table(self) -> None:
+        table = self.query_one("#table-ships", DataTable)
+        # Every row has a symbol, which the fleet view maps to the key of its ship.
+        table.sort("symbol", key=self.fleet.sort_key, reverse=self.fleet.reverse)
+        self.update_table_markdown()
+
+    def update_table_markdown(self) -> None:
+        table = self.query_one("#table-ships", DataTable)
+        column = dict(COLUMNS)[self.fleet.sort_column]
+        order = "descending" if self.fleet.reverse else "ascending"
+        self.ships_markdown.update(f"""# Available Ships
+
+Showing {table.row_count} of {len(self.fleet)} ships, sorted by {column} {order}.""")
+
+    @on(Input.Changed, "#input-ships-filter")
+    def input_filter_changed(self, event: Input.Changed) -> None:
+        self.filter_table(event.value)
+
+    @work(exclusive=True, group="ships-filter")
+    async def filter_table(self, text: str) -> None:
+        """Shows only the ships that match text, without requesting them again.
+
+        Each new row has to be measured by the table, so the rows are only added
+        again once typing pauses, instead of on every key.
+        """
+        await asyncio.sleep(self.filter_delay)
+        self.fleet.set_filter(text)
+        table = self.query_one("#table-ships", DataTable)
+        selected = None
+        if table.row_count:
+            selected = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        table.clear()
+        for symbol in self.fleet.visible():
+            table.add_row(*self.fleet.cells[symbol], key=symbol)
+        if selected in table.rows:
+            table.move_cursor(row=table.get_row_index(selected))
+        self.update_table_markdown()
+
+    @on(DataTable.HeaderSelected, "#table-ships")
+    def sort_table_by(self, event: DataTable.HeaderSelected) -> None:
+        self.fleet.sort_by(event.column_key.value)
+        self.sort_table()
+
+    def update_ship(self, ship: dict) -> None:
+        """Replaces a single ship in the tree and the table, so only its nodes and
+        cells are updated."""
+        self.ships_json[ship["symbol"]] = ship
+        if ship["symbol"] in self.fleet.ships:
+            self.sync_table(self.fleet.update([SHIPS.decode(ship)]))
+        tree = self.query_one("#tree-ships", Tree)
+        if not tree.root.children:
+            return
+        json_node = tree.root.children[0]
+        ships = [
+            ship if item["symbol"] == ship["symbol"] else item
+            for item in json_node.data
+        ]
+        jt.update_json(json_node, ships, "Ships", lazy=True)
+
+    @on(Button.Pressed, "#button-ships-op")
+    def button_ships_op(self) -> None:
+        action = self.query_one("#select-ships-op", Select).value
+        if action is Select.BLANK:
+            self.notify("Choose a fleet action first.", severity="warning")
+            return
+        self.run_fleet_action(action)
+
+    @work(exclusive=True, group="ships-ops")
+    async def run_fleet_action(self, action: str) -> None:
+        """Runs an action on the ships shown in the table, or on every ship.
+
+        The ships are sent their requests at the same time, and each result is shown
+        as soon as it arrives. The ship is changed like the server answered, so the
+        fleet doesn't need to be loaded again.
+        """
+        symbols = self.fleet.visible() if self.table_view else list(self.ships_json)
+        ships = [
+            SHIPS.decode(self.ships_json[symbol])
+            for symbol in symbols
+            if symbol in self.ships_json
+        ]
+        operations = fleetops.plan(action, ships)
+        table = self.query_one("#table-ships-op", DataTable)
+        progress = self.query_one("#progress-ships-op", ProgressBar)
+        table.clear()
+        if not operations:
+            self.notify("No ship needs that.", title=fleetops.ACTIONS[action])
+            return
+
+        steps = Counter(operation.ship_symbol for operation in operations)
+        done = Counter()
+        for symbol, count in steps.items():
+            table.add_row(symbol, action, f"0/{count}", "", key=symbol)
+        progress.update(total=len(operations), progress=0)
+
+        failed = []
+        async for operation, result in ASYNC_CLIENT.iterate(FLEET.run(operations)):
+            progress.advance(1)
+            symbol = operation.ship_symbol
+            if result is None:
+                # The error of the operation before it is already shown.
+                continue
+            if "error" in result:
+                failed.append(symbol)
+                status = "failed"
+            else:
+                done[symbol] += 1
+                status = f"{done[symbol]}/{steps[symbol]}"
+                self.update_ship(fleetops.merge_result(self.ships_json[symbol], result))
+                if "agent" in result["data"]:
+                    AGENT.update_from_json(result["data"]["agent"])
+            table.update_cell(symbol, "action", operation.action)
+            table.update_cell(symbol, "status", status)
+            table.update_cell(symbol, "result", fleetops.describe(operation, result))
+
+        title = fleetops.ACTIONS[action]
+        if failed:
+            self.notify(
+                f"Failed for {', '.join(failed)}", title=title, severity="error"
+            )
+        else:
+            self.notify(f"Done for {len(steps)} ships", title=title)
+
 
 class ContractsBody(Static):
     BINDINGS = [
         Binding(key="e", action="expand_all_tree", description="Expand all"),
         Binding(key="c", action="collapse_all_tree", description="Collapse all"),
+        Binding(key="slash", action="search", description="Search"),
+        Binding(key="m", action="mark_contract", description="Mark"),
     ]
 
     contracts_markdown = Markdown()
@@ -318,22 +968,62 @@ class ContractsBody(Static):
 
     def action_expand_all_tree(self):
         node = self.query_one(Tree).get_node_at_line(0)
+        jt.load_all(node)
         node.expand_all()
 
     def action_collapse_all_tree(self):
         node = self.query_one(Tree).get_node_at_line(0)
         node.collapse_all()
 
+    def action_search(self) -> None:
+        self.query_one("#search-contracts Input").focus()
+
+    def action_mark_contract(self) -> None:
+        """Marks or unmarks the contract under the cursor, to act on with the others
+        that are marked."""
+        node = contract_node(self.query_one("#tree-contracts", Tree).cursor_node)
+        if node is None:
+            return
+        contract_id = node.data["id"]
+        if contract_id in self.contracts_marked:
+            self.contracts_marked.remove(contract_id)
+        else:
+            self.contracts_marked.append(contract_id)
+        self.update_selected_markdown()
+
     @on(Tree.NodeSelected)
     def get_node_selected(self, event: Tree.NodeSelected) -> None:
         """Gets the contract id of selected node in the contracts tree."""
-        node_label = str(event.node.label)
-        if "id" in node_label:
-            self.contract_selected_id = node_label.removeprefix("id='").removesuffix(
-                "'"
-            )
+        node = contract_node(event.node)
+        if node is not None:
+            self.contract_selected_id = node.data["id"]
+            self.update_selected_markdown()
+
+    def update_selected_markdown(self) -> None:
+        if self.contracts_marked:
+            md = f"""Contracts marked: {", ".join(self.contracts_marked)}"""
+        elif self.contract_selected_id in CONTRACTS:
+            contract = CONTRACTS.model(self.contract_selected_id)
+            terms = contract.terms
+            md = f"""Contract selected: {contract.id}
+
+{terms.on_accepted:,} credits on accepting, {terms.on_fulfilled:,} on fulfilling, \
+due {terms.deadline:%Y-%m-%d %H:%M}"""
+        else:
             md = f"""Contract selected: {self.contract_selected_id}"""
-            self.contract_selected_markdown.update(md)
+        self.contract_selected_markdown.update(md)
+
+    def selected_contracts(self) -> list[str]:
+        """Gets the marked contracts, or else the selected one."""
+        if self.contracts_marked:
+            return list(self.contracts_marked)
+        if self.contract_selected_id is not None:
+            return [self.contract_selected_id]
+        return []
+
+    @on(Tree.NodeExpanded)
+    def load_node_children(self, event: Tree.NodeExpanded) -> None:
+        jt.load_children(event.node)
 
     def compose(self) -> ComposeResult:
         yield self.contracts_markdown
@@ -342,31 +1032,344 @@ class ContractsBody(Static):
             yield Button(
                 "Accept Contract", id="button-accept-contract", variant="success"
             )
+            yield Button(
+                "Fulfill Contract", id="button-fulfill-contract", variant="primary"
+            )
+        yield SearchBar(
+            "contracts",
+            "Search contracts, like a trade good, waypoint, or deadline",
+            id="search-contracts",
+            classes="search-bar",
+        )
         yield Tree("Root", id="tree-contracts")
 
-    def update_my_contracts_info(self):
-        contracts = s.get_my_contracts(CLIENT).json()
+    def on_mount(self) -> None:
+        # The contracts to accept or fulfill together, in the order they were marked.
+        self.contracts_marked = []
+        # The contracts may be loaded by the tab and by the warm up at the same time.
+        self.load_lock = asyncio.Lock()
+
+    @work(exclusive=True, group="contracts")
+    async def update_my_contracts_info(self):
+        await self.load_my_contracts_info()
+
+    async def load_my_contracts_info(self) -> None:
+        """Loads the contracts into the tree, after any load that is already running."""
+        async with self.load_lock:
+            tree = self.query_one("#tree-contracts")
+            pages = index_pages(
+                ASYNC_CLIENT.iterate(s.get_my_contracts_pages(CLIENT)), "contracts"
+            )
+            pages = save_pages(pages, "contracts")
+            error = await update_json_tree(tree, pages, "Contracts")
+            if error is None:
+                CONTRACTS.load(tree.root.children[0].data)
 
-        if "error" in contracts:
+        if error is not None:
             contracts_md = f"""
-Code: {contracts["error"]["code"]}
+Code: {error["code"]}
 
-{contracts["error"]["message"]}
+{error["message"]}
 """
             self.contracts_markdown.update(contracts_md)
 
         else:
-            tree = self.query_one("#tree-contracts")
-            tree.show_root = False
-            tree.reset("#tree-contracts")
-            json_node = tree.root.add("Contracts")
-            contracts = contracts["data"]
-            con.create_contract_tree(json_node, contracts)
-            tree.root.expand()
-
+            self.remove_class("stale")
             contracts_md = f"""# Available Contracts"""
             self.contracts_markdown.update(contracts_md)
 
+    async def restore(self, snapshot: dict) -> None:
+        """Shows the contracts of the last session, unless they have been loaded
+        since."""
+        section = snapshot.get("contracts")
+        if section is None:
+            return
+        async with self.load_lock:
+            tree = self.query_one("#tree-contracts", Tree)
+            if tree.root.children:
+                return
+            add_json_tree(tree, section["data"], "Contracts")
+            CONTRACTS.load(section["data"])
+            SEARCH.update("contracts", section["data"])
+        self.contracts_markdown.update(f"""# Available Contracts
+
+{stale_note(section["saved"])}""")
+        self.add_class("stale")
+
+    @on(Button.Pressed, "#button-accept-contract")
+    def button_accept_contract(self) -> None:
+        self.run_contract_batch(ACCEPT, self.selected_contracts())
+
+    @on(Button.Pressed, "#button-fulfill-contract")
+    def button_fulfill_contract(self) -> None:
+        self.run_contract_batch(FULFILL, self.selected_contracts())
+
+    @work(exclusive=True, group="contracts-batch")
+    async def run_contract_batch(self, kind: str, contract_ids: list[str]) -> None:
+        """Accepts or fulfills contracts in a single batch.
+
+        The contracts are shown as accepted or fulfilled straight away, and then as
+        the server answered, without loading every contract again.
+        """
+        contract_ids = [
+            contract_id for contract_id in contract_ids if contract_id in CONTRACTS
+        ]
+        if not contract_ids:
+            self.notify("Select or mark a contract first.", severity="warning")
+            return
+        actions = [ContractAction(kind, contract_id) for contract_id in contract_ids]
+        # The server would refuse the actions on the other contracts.
+        skipped = [
+            action.contract_id
+            for action in actions
+            if not action.allowed(CONTRACTS.model(action.contract_id))
+        ]
+        if skipped:
+            self.notify(
+                f"Can't {kind} {', '.join(skipped)}",
+                title="Contracts",
+                severity="warning",
+            )
+            actions = [
+                action for action in actions if action.contract_id not in skipped
+            ]
+            contract_ids = [action.contract_id for action in actions]
+            if not actions:
+                return
+        async with self.load_lock:
+            previous = CONTRACTS.apply(actions)
+            self.show_contracts()
+            try:
+                results = await ASYNC_CLIENT.run(CONTRACTS.send, actions, previous)
+            except requests.RequestException as error:
+                # The contracts the server didn't answer for were put back by send.
+                self.show_contracts()
+                self.notify(
+                    f"{type(error).__name__}: {error}",
+                    title=f"Could not {kind}",
+                    severity="error",
+                )
+                return
+            self.show_contracts()
+
+        errors = []
+        for contract_id, result in zip(contract_ids, results):
+            if result is None:
+                continue
+            if "error" in result:
+                errors.append(f"{contract_id}: {result['error']['message']}")
+            elif "agent" in result["data"]:
+                AGENT.update_from_json(result["data"]["agent"])
+        if errors:
+            self.notify("\n".join(errors), title=f"Could not {kind}", severity="error")
+        else:
+            self.notify(
+                f"{kind.title()}ed {', '.join(contract_ids)}", title="Contracts"
+            )
+        self.contracts_marked.clear()
+        self.update_selected_markdown()
+
+    def show_contracts(self) -> None:
+        """Updates the tree and the search index to the contracts of CONTRACTS."""
+        tree = self.query_one("#tree-contracts", Tree)
+        if tree.root.children:
+            jt.update_json(
+                tree.root.children[0], CONTRACTS.values(), "Contracts", lazy=True
+            )
+        SEARCH.update("contracts", CONTRACTS.values())
+
+
+class TradeBody(Static):
+    """Body content of the trade tab, which ranks trade routes for a ship."""
+
+    trade_markdown = Markdown()
+
+    def compose(self) -> ComposeResult:
+        yield self.trade_markdown
+        yield Select([], prompt="Select a ship", id="select-trade-ship")
+        yield DataTable(id="table-trade-routes", cursor_type="row")
+
+    def on_mount(self) -> None:
+        # The ships by symbol, for the ship selected to rank the routes for.
+        self.ships = {}
+        table = self.query_one(DataTable)
+        table.add_columns(
+            "Buy at",
+            "Sell at",
+            "Good",
+            "Buy",
+            "Sell",
+            "Units",
+            "Profit",
+            "Fuel",
+            "Seconds",
+            "Profit/s",
+        )
+
+    @work(exclusive=True, group="trade")
+    async def update_trade_info(self) -> None:
+        """Ranks the routes from the stored prices, then updates the prices of the
+        markets the ships are at and ranks them again."""
+        self.trade_markdown.loading = True
+        try:
+            ships = {}
+            pages = watch_ships(ASYNC_CLIENT.iterate(s.get_my_ships_pages(CLIENT)))
+            async for page in pages:
+                if "error" in page:
+                    self.trade_markdown.update(f"""
+Code: {page["error"]["code"]}
+
+{page["error"]["message"]}
+""")
+                    return
+                for data in page["data"]:
+                    ship = SHIPS.decode(data)
+                    ships[ship.symbol] = ship
+        finally:
+            self.trade_markdown.loading = False
+
+        self.ships = ships
+        select = self.query_one(Select)
+        selected = select.value
+        select.set_options((symbol, symbol) for symbol in ships)
+        if selected in ships:
+            select.value = selected
+        else:
+            # Default to the ship that can carry the most.
+            haulers = sorted(ships.values(), key=lambda ship: -ship.cargo.capacity)
+            if haulers:
+                select.value = haulers[0].symbol
+        self.rank_routes()
+
+        # Markets only show their prices to ships at their waypoint.
+        waypoints = [
+            ship.nav.waypoint_symbol
+            for ship in ships.values()
+            if ship.nav.status != "IN_TRANSIT"
+        ]
+        if await ASYNC_CLIENT.run(
+            s.update_markets, CLIENT, MARKETS, waypoints, TIMESERIES
+        ):
+            self.rank_routes()
+
+    @on(Select.Changed, "#select-trade-ship")
+    def ship_selected(self) -> None:
+        self.rank_routes()
+
+    @work(exclusive=True, group="trade-rank")
+    async def rank_routes(self) -> None:
+        ship = self.ships.get(self.query_one(Select).value)
+        if ship is None:
+            return
+
+        def rank() -> tuple[dict, list]:
+            snapshot = MarketSnapshot.from_store(MARKETS, GALAXY)
+            waypoint = ship.nav.waypoint_symbol
+            routes = snapshot.rank_routes(
+                ship.cargo.capacity,
+                ship.fuel.capacity,
+                ship.speed,
+                origin=GALAXY.positions([waypoint]).get(waypoint),
+            )
+            return MARKETS.stats(), routes
+
+        stats, routes = await ASYNC_CLIENT.run(rank)
+        table = self.query_one(DataTable)
+        table.clear()
+        for route in routes:
+            table.add_row(
+                route.source,
+                route.destination,
+                route.good,
+                route.purchase_price,
+                route.sell_price,
+                route.units,
+                route.profit,
+                route.fuel,
+                route.seconds,
+                f"{route.profit_per_second:.1f}",
+            )
+        found = "" if routes else " No profitable routes were found."
+        self.trade_markdown.update(f"""# Trade Routes
+
+Routes for {ship.symbol} from the prices of {stats["markets"]} markets.{found}""")
+
+
+class MetricsBody(Static):
+    """Body content of the metrics tab, with the latency of each endpoint, the time
+    spent waiting on the rate limit, and the time spent building trees."""
+
+    metrics_markdown = Markdown()
+    refresh_seconds = 2
+
+    def compose(self) -> ComposeResult:
+        yield self.metrics_markdown
+        yield DataTable(id="table-metrics", cursor_type="row")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        table.add_columns(
+            "Method",
+            "Endpoint",
+            "Requests",
+            "429",
+            "Errors",
+            "Mean ms",
+            "p50 ms",
+            "p95 ms",
+            "Max ms",
+        )
+        # Only refreshed while the tab is shown, see SpaceApp.tab_activated.
+        self.refresh_timer = self.set_interval(
+            self.refresh_seconds, self.update_metrics, pause=True
+        )
+
+    def update_metrics(self) -> None:
+        table = self.query_one(DataTable)
+        table.clear()
+        for row in endpoint_stats():
+            table.add_row(
+                row["method"],
+                row["endpoint"],
+                row["requests"],
+                row["rate_limited"],
+                row["errors"],
+                f"{row['mean'] * 1000:.0f}",
+                f"{row['p50'] * 1000:.0f}",
+                f"{row['p95'] * 1000:.0f}",
+                f"{row['max'] * 1000:.0f}",
+            )
+
+        waits = []
+        for (level,), series in sorted(LIMITER_WAIT_SECONDS.series().items()):
+            p95 = LIMITER_WAIT_SECONDS.quantile(0.95, series)
+            waits.append(
+                f"| {level} | {series.count} | {series.sum / series.count * 1000:.0f}"
+                f" | {p95 * 1000:.0f} | {series.max * 1000:.0f} |"
+            )
+        trees = []
+        for (operation,), series in sorted(TREE_SECONDS.series().items()):
+            p95 = TREE_SECONDS.quantile(0.95, series)
+            trees.append(
+                f"| {operation} | {series.count} | {series.sum * 1000:.1f}"
+                f" | {p95 * 1000:.1f} | {series.max * 1000:.1f} |"
+            )
+        waits = "\n".join(waits)
+        trees = "\n".join(trees)
+        self.metrics_markdown.update(f"""# Metrics
+
+Requests: {REQUESTS.total():.0f}, answered from the cache: {CACHE_HITS.total():.0f}, \
+rate limited: {RATE_LIMITED.total():.0f}, retried: {RETRIES.total():.0f}
+
+| Rate limit wait | Requests | Mean ms | p95 ms | Max ms |
+| --- | --- | --- | --- | --- |
+{waits}
+
+| Tree | Builds | Total ms | p95 ms | Max ms |
+| --- | --- | --- | --- | --- |
+{trees}
+""")
+
 
 class AppFooter(Footer):
     ctrl_to_caret = False
@@ -403,11 +1406,38 @@ class SpaceApp(App):
                     yield ShipsBody()
                 with TabPane("Contracts", id="tab-contracts"):
                     yield ContractsBody()
+                with TabPane("Trade", id="tab-trade"):
+                    yield TradeBody()
+                with TabPane("Metrics", id="tab-metrics"):
+                    yield MetricsBody()
             yield AppFooter()
 
     def on_mount(self) -> None:
-        self.push_screen(self.MainScreen())
+        self.main_screen = self.MainScreen()
+        self.push_screen(self.main_screen)
         self.push_screen(LoginScreen())
+        self.run_timers()
+
+    @work(group="timers")
+    async def run_timers(self) -> None:
+        """Refreshes each ship when it arrives or its cooldown runs out, instead of
+        polling the whole fleet."""
+        await TIMERS.run(self.ship_event)
+
+    async def ship_event(self, event: ShipEvent) -> None:
+        response = await ASYNC_CLIENT.run(s.get_my_ship, CLIENT, event.ship_symbol)
+        if response.status_code != 200:
+            return
+        data = response.json()["data"]
+        ship = SHIPS.decode(data)
+        TIMERS.update_ship(ship)
+        # The main screen is queried, as a modal like login may be shown over it.
+        for body in self.main_screen.query(ShipsBody):
+            body.update_ship(data)
+        if event.kind == ARRIVAL:
+            self.notify(f"Arrived at {ship.nav.waypoint_symbol}", title=ship.symbol)
+        else:
+            self.notify("Reactor cooldown is over", title=ship.symbol)
 
     def action_login(self) -> None:
         """Action to display the login modal."""
@@ -418,7 +1448,53 @@ class SpaceApp(App):
         input_widget = self.query_one("#input-access-token", Input)
         CLIENT.access_token = input_widget.value
         self.pop_screen()
-        self.query_one(AgentBody).update_agent_info()
+        self.warm_up()
+
+    @work(exclusive=True, group="warm-up")
+    async def warm_up(self) -> None:
+        """Loads the agent, ships, contracts, and status all at once after logging in.
+
+        The requests have background priority, so they wait for any the user makes,
+        and they fill the cache. The trees of the tabs that aren't shown are built as
+        well, so switching to them only diffs against the cached pages.
+
+        The agent, ships, contracts, and status of the last session with the access
+        token are shown first, marked as stale, with a single disk read. The loads
+        then bring them up to date.
+
+        This runs on the app rather than on each tab, so switching tabs doesn't cancel
+        it.
+        """
+        snapshot = await ASYNC_CLIENT.run(SNAPSHOTS.load, CLIENT.access_token)
+        for body in (AgentBody, ShipsBody, ContractsBody, StatusBody):
+            await self.query_one(body).restore(snapshot)
+        with priority(Priority.BACKGROUND):
+            results = await asyncio.gather(
+                self.query_one(AgentBody).load_agent_info(),
+                self.query_one(ShipsBody).load_my_ships_info(),
+                self.query_one(ContractsBody).load_my_contracts_info(),
+                self.query_one(StatusBody).load_status(),
+                return_exceptions=True,
+            )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            if not isinstance(error, (requests.RequestException, ValueError)):
+                raise error
+        # The last session stays shown, marked as stale.
+        if any(isinstance(e, requests.exceptions.ConnectionError) for e in errors):
+            self.notify(
+                "Unable to reach the SpaceTraders API",
+                title="Offline",
+                severity="error",
+            )
+        for error in errors:
+            # Like a timeout, or a response that isn't JSON.
+            if not isinstance(error, requests.exceptions.ConnectionError):
+                self.notify(
+                    f"{type(error).__name__}: {error}",
+                    title="Unable to load",
+                    severity="error",
+                )
 
     @on(Button.Pressed, "#button-create-account")
     def button_create_account(self) -> None:
@@ -426,10 +1502,22 @@ class SpaceApp(App):
         self.push_screen(RegisterScreen())
 
     @on(Button.Pressed, "#button-register-account")
-    async def button_register_account(self) -> None:
+    def button_register_account(self) -> None:
         input_symbol = self.query_one("#input-register-symbol", Input).value
         input_faction = self.query_one("#input-register-faction", Input).value
-        AGENT.register_agent(input_symbol, input_faction)
+        self.register_account(input_symbol, input_faction)
+
+    @work(exclusive=True, group="register")
+    async def register_account(self, symbol: str, faction: str) -> None:
+        container = self.query_one(RegisterContainer)
+        container.loading = True
+        try:
+            response = await ASYNC_CLIENT.post(
+                URL.REGISTER, json=AGENT.register_payload(symbol, faction)
+            )
+        finally:
+            container.loading = False
+        AGENT.update_registered_agent(response)
 
         if AGENT.error is not None:
             self.query_one(RegisterContainer).update_register_markdown()
@@ -441,9 +1529,7 @@ class SpaceApp(App):
     # TODO This may be able to move to the RegisterResultsContainer Class.
     @on(Button.Pressed, "#button-save-access-token")
     def button_save_access_token(self) -> None:
-        save_file = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "token.json")
-        )
+        save_file = PATH.TOKEN
         token = {
             "token": CLIENT.access_token,
         }
@@ -456,14 +1542,37 @@ class SpaceApp(App):
     @on(Button.Pressed, "#button-close-register-success")
     def button_close_register_success(self) -> None:
         self.pop_screen()
-        self.query_one(AgentBody).update_agent_info()
+        self.warm_up()
+
+    @on(TabbedContent.TabActivated)
+    def tab_activated(self, event: TabbedContent.TabActivated) -> None:
+        """Cancels the fetches of the tabs that are no longer shown.
+
+        Batches of actions keep running, as stopping one part way would leave some
+        ships or contracts with only some of their actions done. So does the galaxy
+        import, as its thread would keep running anyway.
+        """
+        bodies = (StatusBody, AgentBody, ShipsBody, ContractsBody, TradeBody)
+        for worker in list(self.workers):
+            if worker.group in ("ships-ops", "contracts-batch", "galaxy"):
+                continue
+            node = worker.node
+            if isinstance(node, bodies) and event.pane not in node.ancestors:
+                worker.cancel()
+        for widget in self.query(MetricsBody):
+            if event.pane in widget.ancestors:
+                widget.update_metrics()
+                widget.refresh_timer.resume()
+            else:
+                widget.refresh_timer.pause()
 
     # TODO Possibly replace this with just an update button.
     @on(TabbedContent.TabActivated, pane="#ships")
     def tab_ships_activated(self) -> None:
-        self.query_one(ShipsBody).update_my_ships_info()
-        # This will focus on the tree immediately, so the bindings show in the footer.
-        self.set_focus(self.query_one("#tree-ships"))
+        body = self.query_one(ShipsBody)
+        body.update_my_ships_info()
+        # This will focus on the view immediately, so the bindings show in the footer.
+        body.show_view()
 
     # TODO Possibly replace this with just an update button.
     @on(TabbedContent.TabActivated, pane="#tab-contracts")
@@ -472,6 +1581,10 @@ class SpaceApp(App):
         # This will focus on the tree immediately, so the bindings show in the footer.
         self.set_focus(self.query_one("#tree-contracts"))
 
+    @on(TabbedContent.TabActivated, pane="#tab-trade")
+    def tab_trade_activated(self) -> None:
+        self.query_one(TradeBody).update_trade_info()
+
 
 if __name__ == "__main__":
     # TODO It may be worth moving this to top as a global. Then it could be called
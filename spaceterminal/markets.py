@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+from spaceterminal.constants import PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS market_goods (
+    waypoint_symbol TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    type TEXT,
+    purchase_price INTEGER NOT NULL,
+    sell_price INTEGER NOT NULL,
+    supply TEXT,
+    trade_volume INTEGER,
+    updated REAL NOT NULL,
+    PRIMARY KEY (waypoint_symbol, symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS market_goods_symbol ON market_goods (symbol);
+"""
+
+
+class MarketStore:
+    """An on-disk store of the latest prices seen at each market.
+
+    The prices of a market are only sent while a ship is at its waypoint, so the
+    store keeps the last prices of every market a ship has visited, with when they
+    were seen.
+
+    Args:
+        path: The database file, or ":memory:" for a store that isn't saved.
+    """
+
+    def __init__(self, path: str = PATH.MARKETS):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The database connection, opened and set up when first used."""
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def store(self, market: dict, updated: float = None) -> int:
+        """Replaces the prices of a market.
+
+        Args:
+            market: The market decoded from JSON. Nothing is stored if it has no
+                trade goods, because no ship was at the market.
+            updated: When the prices were seen, defaults to now.
+
+        Returns:
+            The number of goods stored.
+        """
+        goods = market.get("tradeGoods")
+        if not goods:
+            return 0
+        updated = time.time() if updated is None else updated
+        with self._lock, self.connection as connection:
+            connection.execute(
+                "DELETE FROM market_goods WHERE waypoint_symbol = ?",
+                (market["symbol"],),
+            )
+            connection.executemany(
+                "INSERT INTO market_goods VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        market["symbol"],
+                        good["symbol"],
+                        good.get("type"),
+                        good["purchasePrice"],
+                        good["sellPrice"],
+                        good.get("supply"),
+                        good.get("tradeVolume"),
+                        updated,
+                    )
+                    for good in goods
+                ],
+            )
+        return len(goods)
+
+    def prices(self, max_age: float = None) -> list[tuple]:
+        """Gets the prices of every good at every market.
+
+        Args:
+            max_age: Only prices seen within this many seconds. If None, every price.
+
+        Returns:
+            A list of (waypoint symbol, good symbol, purchase price, sell price,
+            trade volume, updated).
+        """
+        query = (
+            "SELECT waypoint_symbol, symbol, purchase_price, sell_price, "
+            "trade_volume, updated FROM market_goods"
+        )
+        parameters = ()
+        if max_age is not None:
+            query += " WHERE updated >= ?"
+            parameters = (time.time() - max_age,)
+        with self._lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def goods(self, waypoint_symbol: str) -> list[dict]:
+        """Gets the last prices seen at a market."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT symbol, type, purchase_price, sell_price, supply, "
+                "trade_volume, updated FROM market_goods WHERE waypoint_symbol = ? "
+                "ORDER BY symbol",
+                (waypoint_symbol,),
+            ).fetchall()
+        keys = (
+            "symbol",
+            "type",
+            "purchasePrice",
+            "sellPrice",
+            "supply",
+            "tradeVolume",
+            "updated",
+        )
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> dict:
+        """Gets the number of markets and prices in the store."""
+        with self._lock:
+            markets, prices = self.connection.execute(
+                "SELECT count(DISTINCT waypoint_symbol), count(*) FROM market_goods"
+            ).fetchone()
+        return {"markets": markets, "prices": prices}
@@ -0,0 +1,370 @@
+import bisect
+import contextlib
+import threading
+import time
+import urllib.parse
+
+from spaceterminal.constants import URL
+
+# Prometheus style histogram buckets, as upper bounds in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TREE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# The path segment after one of these is an id, and is replaced by a placeholder, so
+# each endpoint is one series whichever ship or system it was called for.
+PLACEHOLDERS = {
+    "agents": "{agentSymbol}",
+    "contracts": "{contractId}",
+    "factions": "{factionSymbol}",
+    "ships": "{shipSymbol}",
+    "systems": "{systemSymbol}",
+    "waypoints": "{waypointSymbol}",
+}
+
+
+def endpoint(url: str) -> str:
+    """Gets the endpoint of a URL, like /my/ships/{shipSymbol}/orbit.
+
+    The query and the path of the base URL are left out.
+    """
+    path = urllib.parse.urlsplit(url).path
+    path = path.removeprefix(urllib.parse.urlsplit(URL.BASE).path) or "/"
+    parts = path.split("/")
+    return "/".join(
+        (
+            PLACEHOLDERS[parts[index - 1]]
+            if index and parts[index - 1] in PLACEHOLDERS and part
+            else part
+        )
+        for index, part in enumerate(parts)
+    )
+
+
+class Metric:
+    """A metric with a series for each combination of label values.
+
+    Args:
+        name: The name of the metric, as exported to Prometheus.
+        help: What the metric measures.
+        labels: The names of the labels of each series.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def series(self) -> dict:
+        """Gets a copy of every series, by the tuple of its label values."""
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._series.items()}
+
+    def _copy(self, value):
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Gets the (name suffix, labels, value) of each Prometheus sample."""
+        return [
+            ("", dict(zip(self.labels, key)), value)
+            for key, value in sorted(self.series().items())
+        ]
+
+
+class Counter(Metric):
+    """A count that only goes up, like the number of requests sent."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """Gets the sum over every series."""
+        with self._lock:
+            return sum(self._series.values())
+
+
+class Gauge(Metric):
+    """A value that can go up and down, like the depth of a queue."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class HistogramSeries:
+    """The observations of one series of a histogram, counted into buckets."""
+
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self, buckets: int):
+        # The last count is of the observations above every bucket.
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def copy(self) -> "HistogramSeries":
+        series = HistogramSeries(0)
+        series.counts = list(self.counts)
+        series.sum = self.sum
+        series.count = self.count
+        series.max = self.max
+        return series
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, like the latency of each request.
+
+    Observing is a bisect and a few additions, so it can be used on hot paths.
+
+    Args:
+        name: The name of the metric, as exported to Prometheus.
+        help: What the metric measures.
+        labels: The names of the labels of each series.
+        buckets: The upper bounds of the buckets, in increasing order.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+            series.max = max(series.max, value)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observes the seconds taken by the code within the context."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy(self, value: HistogramSeries) -> HistogramSeries:
+        return value.copy()
+
+    def get(self, **labels) -> HistogramSeries:
+        """Gets a copy of a series, or None if nothing was observed for it."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return None if series is None else series.copy()
+
+    def quantile(self, q: float, series: HistogramSeries) -> float:
+        """Estimates a quantile of a series, like Prometheus histogram_quantile.
+
+        The value is interpolated within the bucket the quantile falls in, and is at
+        most the largest observation.
+
+        Args:
+            q: The quantile, from 0 to 1.
+            series: The series, from get or series.
+
+        Returns:
+            The estimated value, or 0 if nothing was observed.
+        """
+        if series is None or series.count == 0:
+            return 0.0
+        rank = q * series.count
+        seen = 0
+        for index, count in enumerate(series.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else series.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(value, series.max)
+            seen += count
+        return series.max
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        for key, series in sorted(self.series().items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": repr(bound)}, cumulative))
+            samples.append(("_bucket", {**labels, "le": "+Inf"}, series.count))
+            samples.append(("_sum", labels, series.sum))
+            samples.append(("_count", labels, series.count))
+        return samples
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_metric(metric: Metric) -> str:
+    """Formats a metric in the Prometheus text format."""
+    lines = [f"# HELP {metric.name} {escape(metric.help)}"]
+    lines.append(f"# TYPE {metric.name} {metric.kind}")
+    for suffix, labels, value in metric.samples():
+        text = ",".join(f'{name}="{escape(label)}"' for name, label in labels.items())
+        labels = f"{{{text}}}" if text else ""
+        lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+    return "\n".join(lines)
+
+
+class Registry:
+    """Holds the metrics of the process, see REGISTRY."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def clear(self) -> None:
+        """Drops every observation, but keeps the metrics."""
+        for metric in self.metrics.values():
+            metric.clear()
+
+    def to_prometheus(self) -> str:
+        """Gets every metric in the Prometheus text exposition format."""
+        return "".join(f"{format_metric(m)}\n" for m in self.metrics.values())
+
+
+# A single registry for the process, like the scheduler, so every client and tree
+# is measured together.
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "spaceterminal_request_seconds",
+    "Seconds from sending a request to its response, without the rate limit wait.",
+    ("method", "endpoint"),
+)
+REQUESTS = REGISTRY.counter(
+    "spaceterminal_requests_total",
+    "Responses received, including the retried ones.",
+    ("method", "endpoint", "status"),
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "spaceterminal_request_errors_total",
+    "Requests that failed without a response, like a connection error.",
+    ("method", "endpoint"),
+)
+LIMITER_WAIT_SECONDS = REGISTRY.histogram(
+    "spaceterminal_limiter_wait_seconds",
+    "Seconds a request waited for its turn in the rate limit.",
+    ("priority",),
+    WAIT_BUCKETS,
+)
+RATE_LIMITED = REGISTRY.counter(
+    "spaceterminal_rate_limited_total",
+    "Responses with a 429 status, when the rate limit was exceeded.",
+)
+RETRIES = REGISTRY.counter("spaceterminal_retries_total", "Requests that were retried.")
+CACHE_HITS = REGISTRY.counter(
+    "spaceterminal_cache_hits_total",
+    "GET requests answered from the cache, without sending a request.",
+)
+TREE_SECONDS = REGISTRY.histogram(
+    "spaceterminal_tree_build_seconds",
+    "Seconds taken to add, load, or update the nodes of a JSON tree.",
+    ("operation",),
+    TREE_BUCKETS,
+)
+
+
+def endpoint_stats() -> list[dict]:
+    """Gets the requests, failures, and latency of each endpoint, by most requests.
+
+    Returns:
+        A dict for each endpoint, with the times in seconds.
+    """
+    failures = REQUEST_ERRORS.series()
+    stats = {}
+    for (method, path, status), count in REQUESTS.series().items():
+        entry = stats.setdefault(
+            (method, path),
+            {
+                "requests": 0,
+                "rate_limited": 0,
+                "errors": failures.get((method, path), 0),
+            },
+        )
+        entry["requests"] += count
+        if status == "429":
+            entry["rate_limited"] += count
+        elif int(status) >= 400:
+            entry["errors"] += count
+    for key, errors in failures.items():
+        stats.setdefault(key, {"requests": 0, "rate_limited": 0, "errors": errors})
+
+    latencies = REQUEST_SECONDS.series()
+    rows = []
+    for (method, path), entry in stats.items():
+        series = latencies.get((method, path))
+        count = series.count if series is not None else 0
+        rows.append(
+            {
+                "method": method,
+                "endpoint": path,
+                **entry,
+                "mean": series.sum / count if count else 0.0,
+                "p50": REQUEST_SECONDS.quantile(0.5, series),
+                "p95": REQUEST_SECONDS.quantile(0.95, series),
+                "max": series.max if count else 0.0,
+            }
+        )
+    rows.sort(key=lambda row: (-row["requests"], row["endpoint"], row["method"]))
+    return rows
@@ -0,0 +1,740 @@
+import argparse
+import copy
+import datetime
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from spaceterminal import synthetic
+from spaceterminal.models import parse_time
+
+BASE_PATH = "/v2"
+DEFAULT_PAGE_LIMIT = 10
+MAX_PAGE_LIMIT = 20
+FACTIONS = ["COSMIC", "VOID", "GALACTIC", "QUANTUM", "DOMINION"]
+
+
+class RateLimit:
+    """A token bucket, like the one the SpaceTraders API limits requests with."""
+
+    def __init__(self, per_second: float, burst: int):
+        self.per_second = per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token from the bucket.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed * self.per_second)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.per_second
+
+    def headers(self, retry_after: float = 0) -> dict:
+        """Gets the rate limit headers the API sends with each response."""
+        with self.lock:
+            remaining = int(self.tokens)
+        reset = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            seconds=(self.burst - remaining) / self.per_second
+        )
+        headers = {
+            "x-ratelimit-type": "IP-based limits",
+            "x-ratelimit-limit": str(self.burst),
+            "x-ratelimit-remaining": str(remaining),
+            "x-ratelimit-reset": reset.isoformat(timespec="milliseconds"),
+            "x-ratelimit-limit-burst": str(self.burst),
+            "x-ratelimit-limit-per-second": str(self.per_second),
+        }
+        if retry_after:
+            headers["Retry-After"] = f"{retry_after:.3f}"
+        return headers
+
+
+class GameState:
+    """The agent, ships, and contracts served by the mock server."""
+
+    def __init__(
+        self,
+        ships: int = 10,
+        contracts: int = 3,
+        agent: str = "AGENT",
+        systems: int = 50,
+    ):
+        self.lock = threading.Lock()
+        self.agent = {
+            "accountId": "mock-account",
+            "symbol": agent,
+            "headquarters": "X1-S1-W1",
+            "credits": 100000,
+            "startingFaction": "COSMIC",
+            "shipCount": ships,
+        }
+        self.ships = {
+            ship["symbol"]: ship for ship in synthetic.make_fleet(ships, agent)
+        }
+        self.start_routes()
+        self.contracts = {
+            contract["id"]: contract for contract in synthetic.make_contracts(contracts)
+        }
+        self.systems = {
+            system["symbol"]: system for system in synthetic.make_galaxy(systems)
+        }
+        self.tokens = {"mock-token": agent}
+
+    def start_routes(self) -> None:
+        """Moves the routes of the ships to now, so the ships in transit arrive over
+        the next few minutes."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for ship in self.ships.values():
+            route = ship["nav"]["route"]
+            departure = parse_time(route["departureTime"])
+            route["arrival"] = synthetic.format_time(
+                now + (parse_time(route["arrival"]) - departure)
+            )
+            route["departureTime"] = synthetic.format_time(now)
+
+    def settle_ships(self) -> None:
+        """Puts the ships that have arrived in orbit of their destination.
+
+        This should be called with the lock held.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for ship in self.ships.values():
+            nav = ship["nav"]
+            if (
+                nav["status"] == "IN_TRANSIT"
+                and parse_time(nav["route"]["arrival"]) <= now
+            ):
+                nav["status"] = "IN_ORBIT"
+                nav["waypointSymbol"] = nav["route"]["destination"]["symbol"]
+
+    def system_summaries(self) -> list:
+        """Gets the systems like the systems endpoint has them, without traits."""
+        return [
+            {
+                **system,
+                "waypoints": [
+                    {
+                        key: waypoint[key]
+                        for key in ("symbol", "type", "x", "y", "orbitals")
+                    }
+                    for waypoint in system["waypoints"]
+                ],
+            }
+            for system in self.systems.values()
+        ]
+
+    def register(self, symbol: str, faction: str) -> dict:
+        """Registers a new agent, replacing the current one."""
+        with self.lock:
+            token = f"mock-token-{len(self.tokens)}"
+            self.tokens[token] = symbol
+            self.agent = {**self.agent, "symbol": symbol, "startingFaction": faction}
+            return {
+                "agent": self.agent,
+                "contract": next(iter(self.contracts.values()), None),
+                "faction": {"symbol": faction},
+                "ship": next(iter(self.ships.values()), None),
+                "token": token,
+            }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Handles the requests of the mock server, see MockServer."""
+
+    protocol_version = "HTTP/1.1"
+    # The headers and body are written separately, which Nagle's algorithm would
+    # delay until the client acknowledges the headers.
+    disable_nagle_algorithm = True
+    server: "MockHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def handle_request(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        mock = self.server.mock
+        mock.count_request()
+        if mock.latency:
+            time.sleep(mock.latency)
+
+        if mock.rate_limit is not None:
+            retry_after = mock.rate_limit.acquire()
+            if retry_after:
+                mock.count_rate_limited()
+                self.send_error_json(
+                    429,
+                    "You have reached your API limit.",
+                    headers=mock.rate_limit.headers(retry_after),
+                    data={
+                        "retryAfter": retry_after,
+                        "limitBurst": mock.rate_limit.burst,
+                        "limitPerSecond": mock.rate_limit.per_second,
+                    },
+                )
+                return
+
+        url = urlparse(self.path)
+        path = url.path.removeprefix(BASE_PATH).rstrip("/")
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            self.send_error_json(400, "Request body is not valid JSON.")
+            return
+
+        for route_method, pattern, handler, auth in mock.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method != method or match is None:
+                continue
+            if auth and not self.authorized():
+                self.send_error_json(401, "Missing or invalid bearer token.", code=4100)
+                return
+            status, data = handler(query, payload, **match.groupdict())
+            self.send_json(status, data)
+            return
+        self.send_error_json(404, f"Cannot {method} {url.path}", code=404)
+
+    def authorized(self) -> bool:
+        header = self.headers.get("Authorization", "")
+        return header.removeprefix("Bearer ") in self.server.mock.state.tokens
+
+    def send_json(self, status: int, data: dict, headers: dict = None) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        rate_limit = self.server.mock.rate_limit
+        headers = headers or (rate_limit.headers() if rate_limit else {})
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(
+        self,
+        status: int,
+        message: str,
+        code: int = None,
+        headers: dict = None,
+        data: dict = None,
+    ) -> None:
+        error = {"message": message, "code": code or status}
+        if data is not None:
+            error["data"] = data
+        self.send_json(status, {"error": error}, headers)
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mock: "MockServer"):
+        super().__init__(address, MockHandler)
+        self.mock = mock
+
+
+class MockServer:
+    """A local stand-in for the SpaceTraders API, for offline testing and benchmarks.
+
+    It serves the endpoints in constants.URL from a synthetic fleet, with the same
+    pagination as the API. It can add latency to every request, and limit the rate of
+    requests, answering 429 with Retry-After like the API.
+
+    The token "mock-token" is accepted, as well as any token from registering.
+
+    Args:
+        ships: Number of ships in the synthetic fleet.
+        contracts: Number of contracts.
+        systems: Number of systems in the galaxy.
+        latency: Seconds added to every request.
+        per_second: Requests allowed per second, or None to not limit requests.
+        burst: Requests allowed in a burst.
+        host: Host to listen on.
+        port: Port to listen on, 0 picks a free port.
+    """
+
+    def __init__(
+        self,
+        ships: int = 10,
+        contracts: int = 3,
+        systems: int = 50,
+        latency: float = 0.0,
+        per_second: float = None,
+        burst: int = 30,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.state = GameState(ships, contracts, systems=systems)
+        self.latency = latency
+        self.rate_limit = None if per_second is None else RateLimit(per_second, burst)
+        self.requests = 0
+        self.rate_limited = 0
+        self._counter_lock = threading.Lock()
+        self.routes = []
+        self.add_routes()
+        self.httpd = MockHTTPServer((host, port), self)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def route(self, method: str, pattern: str, handler, auth: bool = True) -> None:
+        """Adds an endpoint, the pattern is a regex of the path after the base URL."""
+        self.routes.append((method, pattern, handler, auth))
+
+    def add_routes(self) -> None:
+        self.route("GET", "", self.get_status, auth=False)
+        self.route("POST", "/register", self.post_register, auth=False)
+        self.route("GET", "/factions", self.get_factions, auth=False)
+        self.route("GET", "/my/agent", self.get_agent)
+        self.route("GET", "/my/ships", self.get_ships)
+        self.route("GET", "/my/ships/(?P<symbol>[^/]+)", self.get_ship)
+        for action in ("orbit", "dock", "refuel", "sell"):
+            self.route(
+                "POST",
+                f"/my/ships/(?P<symbol>[^/]+)/{action}",
+                getattr(self, f"post_{action}_ship"),
+            )
+        self.route("GET", "/my/contracts", self.get_contracts)
+        self.route("GET", "/my/contracts/(?P<contract_id>[^/]+)", self.get_contract)
+        for action in ("accept", "deliver", "fulfill"):
+            self.route(
+                "POST",
+                f"/my/contracts/(?P<contract_id>[^/]+)/{action}",
+                getattr(self, f"post_{action}_contract"),
+            )
+        self.route("GET", "/systems", self.get_systems, auth=False)
+        self.route("GET", r"/systems\.json", self.get_systems_json, auth=False)
+        self.route(
+            "GET",
+            "/systems/(?P<system_symbol>[^/]+)/waypoints",
+            self.get_waypoints,
+            auth=False,
+        )
+        self.route(
+            "GET",
+            "/systems/(?P<system_symbol>[^/]+)/waypoints/(?P<waypoint_symbol>[^/]+)"
+            "/market",
+            self.get_market,
+        )
+
+    def count_request(self) -> None:
+        with self._counter_lock:
+            self.requests += 1
+
+    def count_rate_limited(self) -> None:
+        with self._counter_lock:
+            self.rate_limited += 1
+
+    @staticmethod
+    def paginate(items: list, query: dict) -> tuple[int, dict]:
+        """Gets a page of the items, with the meta the API includes."""
+        try:
+            page = int(query.get("page", 1))
+            limit = int(query.get("limit", DEFAULT_PAGE_LIMIT))
+        except ValueError:
+            page, limit = 0, 0
+        if page < 1 or not 1 <= limit <= MAX_PAGE_LIMIT:
+            return 400, {
+                "error": {
+                    "message": "Invalid pagination parameters.",
+                    "code": 400,
+                }
+            }
+        start = (page - 1) * limit
+        return 200, {
+            "data": items[start : start + limit],
+            "meta": {"total": len(items), "page": page, "limit": limit},
+        }
+
+    def get_status(self, query: dict, payload: dict) -> tuple[int, dict]:
+        with self.state.lock:
+            ships = len(self.state.ships)
+            systems = len(self.state.systems)
+            waypoints = sum(
+                len(system["waypoints"]) for system in self.state.systems.values()
+            )
+        return 200, {
+            "status": "SpaceTraders mock server is online",
+            "version": "v2.2.0",
+            "resetDate": "2024-01-01",
+            "description": "A local stand-in for the SpaceTraders API.",
+            "stats": {
+                "agents": 1,
+                "ships": ships,
+                "systems": systems,
+                "waypoints": waypoints,
+            },
+            "leaderboards": {"mostCredits": [], "mostSubmittedCharts": []},
+            "serverResets": {
+                "next": "2024-01-15T00:00:00.000Z",
+                "frequency": "fortnightly",
+            },
+            "announcements": [],
+            "links": [],
+        }
+
+    def post_register(self, query: dict, payload: dict) -> tuple[int, dict]:
+        symbol = payload.get("symbol", "")
+        faction = payload.get("faction", "")
+        if not 3 <= len(symbol) <= 14 or faction not in FACTIONS:
+            return 422, {
+                "error": {
+                    "message": "Request could not be processed due to an invalid "
+                    "payload.",
+                    "code": 422,
+                    "data": {"symbol": ["Agent symbol must be 3 to 14 characters."]},
+                }
+            }
+        return 201, {"data": self.state.register(symbol, faction)}
+
+    def get_factions(self, query: dict, payload: dict) -> tuple[int, dict]:
+        factions = [
+            {"symbol": symbol, "name": symbol.title(), "isRecruiting": True}
+            for symbol in FACTIONS
+        ]
+        return self.paginate(factions, query)
+
+    def get_agent(self, query: dict, payload: dict) -> tuple[int, dict]:
+        with self.state.lock:
+            return 200, {"data": dict(self.state.agent)}
+
+    def get_ships(self, query: dict, payload: dict) -> tuple[int, dict]:
+        with self.state.lock:
+            self.state.settle_ships()
+            return copy.deepcopy(self.paginate(list(self.state.ships.values()), query))
+
+    def get_ship(self, query: dict, payload: dict, symbol: str) -> tuple[int, dict]:
+        with self.state.lock:
+            if symbol not in self.state.ships:
+                return 404, {"error": {"message": "Ship not found.", "code": 3000}}
+            self.state.settle_ships()
+            return 200, {"data": copy.deepcopy(self.state.ships[symbol])}
+
+    def ship_error(self, symbol: str, status: str = None) -> tuple[int, dict]:
+        """Gets the error for a ship that isn't found, or isn't in a status.
+
+        This should be called with the lock held.
+        """
+        ship = self.state.ships.get(symbol)
+        if ship is None:
+            return 404, {"error": {"message": "Ship not found.", "code": 3000}}
+        self.state.settle_ships()
+        if ship["nav"]["status"] == "IN_TRANSIT":
+            return 400, {"error": {"message": "Ship is in transit.", "code": 4214}}
+        if status is not None and ship["nav"]["status"] != status:
+            return 400, {"error": {"message": "Ship is not docked.", "code": 4244}}
+        return None
+
+    def post_orbit_ship(
+        self, query: dict, payload: dict, symbol: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            error = self.ship_error(symbol)
+            if error is not None:
+                return error
+            nav = self.state.ships[symbol]["nav"]
+            nav["status"] = "IN_ORBIT"
+            return 200, {"data": {"nav": copy.deepcopy(nav)}}
+
+    def post_dock_ship(
+        self, query: dict, payload: dict, symbol: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            error = self.ship_error(symbol)
+            if error is not None:
+                return error
+            nav = self.state.ships[symbol]["nav"]
+            nav["status"] = "DOCKED"
+            return 200, {"data": {"nav": copy.deepcopy(nav)}}
+
+    def post_refuel_ship(
+        self, query: dict, payload: dict, symbol: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            error = self.ship_error(symbol, "DOCKED")
+            if error is not None:
+                return error
+            ship = self.state.ships[symbol]
+            fuel = ship["fuel"]
+            units = fuel["capacity"] - fuel["current"]
+            # Fuel is sold by the 100 units, like a unit of cargo.
+            price = math.ceil(units / 100) * synthetic.base_price("FUEL")
+            fuel["current"] = fuel["capacity"]
+            self.state.agent["credits"] -= price
+            transaction = {
+                "shipSymbol": symbol,
+                "waypointSymbol": ship["nav"]["waypointSymbol"],
+                "tradeSymbol": "FUEL",
+                "type": "PURCHASE",
+                "units": units,
+                "totalPrice": price,
+            }
+            return 200, {
+                "data": {
+                    "agent": dict(self.state.agent),
+                    "fuel": dict(fuel),
+                    "transaction": transaction,
+                }
+            }
+
+    def post_sell_ship(
+        self, query: dict, payload: dict, symbol: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            error = self.ship_error(symbol, "DOCKED")
+            if error is not None:
+                return error
+            ship = self.state.ships[symbol]
+            cargo = ship["cargo"]
+            good = payload.get("symbol")
+            units = payload.get("units", 0)
+            item = next(
+                (item for item in cargo["inventory"] if item["symbol"] == good), None
+            )
+            if units <= 0 or item is None or item["units"] < units:
+                return 400, {
+                    "error": {
+                        "message": "The ship doesn't have the units.",
+                        "code": 4219,
+                    }
+                }
+
+            item["units"] -= units
+            if not item["units"]:
+                cargo["inventory"].remove(item)
+            cargo["units"] -= units
+            price = synthetic.base_price(good) * units
+            self.state.agent["credits"] += price
+            transaction = {
+                "shipSymbol": symbol,
+                "waypointSymbol": ship["nav"]["waypointSymbol"],
+                "tradeSymbol": good,
+                "type": "SELL",
+                "units": units,
+                "totalPrice": price,
+            }
+            return 200, {
+                "data": {
+                    "agent": dict(self.state.agent),
+                    "cargo": copy.deepcopy(cargo),
+                    "transaction": transaction,
+                }
+            }
+
+    def get_contracts(self, query: dict, payload: dict) -> tuple[int, dict]:
+        with self.state.lock:
+            return copy.deepcopy(
+                self.paginate(list(self.state.contracts.values()), query)
+            )
+
+    def get_contract(
+        self, query: dict, payload: dict, contract_id: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            if contract_id not in self.state.contracts:
+                return 404, {"error": {"message": "Contract not found.", "code": 404}}
+            return 200, {"data": copy.deepcopy(self.state.contracts[contract_id])}
+
+    @staticmethod
+    def contract_error(message: str, code: int) -> tuple[int, dict]:
+        return 400, {"error": {"message": message, "code": code}}
+
+    def post_accept_contract(
+        self, query: dict, payload: dict, contract_id: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            contract = self.state.contracts.get(contract_id)
+            if contract is None:
+                return 404, {"error": {"message": "Contract not found.", "code": 404}}
+            if contract["accepted"]:
+                return self.contract_error("Contract has already been accepted.", 4501)
+            contract["accepted"] = True
+            self.state.agent["credits"] += contract["terms"]["payment"]["onAccepted"]
+            return 200, {
+                "data": {
+                    "agent": dict(self.state.agent),
+                    "contract": copy.deepcopy(contract),
+                }
+            }
+
+    def post_deliver_contract(
+        self, query: dict, payload: dict, contract_id: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            contract = self.state.contracts.get(contract_id)
+            if contract is None:
+                return 404, {"error": {"message": "Contract not found.", "code": 404}}
+            if not contract["accepted"]:
+                return self.contract_error("Contract has not been accepted.", 4505)
+            ship = self.state.ships.get(payload.get("shipSymbol"))
+            if ship is None:
+                return 404, {"error": {"message": "Ship not found.", "code": 3000}}
+            good = next(
+                (
+                    good
+                    for good in contract["terms"]["deliver"]
+                    if good["tradeSymbol"] == payload.get("tradeSymbol")
+                ),
+                None,
+            )
+            if good is None:
+                return self.contract_error("The contract doesn't need that good.", 4508)
+            units = payload.get("units", 0)
+            if good["unitsFulfilled"] + units > good["unitsRequired"]:
+                return self.contract_error("Too many units for the contract.", 4509)
+            cargo = ship["cargo"]
+            item = next(
+                (
+                    item
+                    for item in cargo["inventory"]
+                    if item["symbol"] == good["tradeSymbol"]
+                ),
+                None,
+            )
+            if units <= 0 or item is None or item["units"] < units:
+                return self.contract_error("The ship doesn't have the units.", 4219)
+
+            item["units"] -= units
+            if not item["units"]:
+                cargo["inventory"].remove(item)
+            cargo["units"] -= units
+            good["unitsFulfilled"] += units
+            return 200, {"data": copy.deepcopy({"contract": contract, "cargo": cargo})}
+
+    def post_fulfill_contract(
+        self, query: dict, payload: dict, contract_id: str
+    ) -> tuple[int, dict]:
+        with self.state.lock:
+            contract = self.state.contracts.get(contract_id)
+            if contract is None:
+                return 404, {"error": {"message": "Contract not found.", "code": 404}}
+            if not contract["accepted"]:
+                return self.contract_error("Contract has not been accepted.", 4505)
+            if contract["fulfilled"]:
+                return self.contract_error("Contract has already been fulfilled.", 4504)
+            if any(
+                good["unitsFulfilled"] < good["unitsRequired"]
+                for good in contract["terms"]["deliver"]
+            ):
+                return self.contract_error(
+                    "The goods have not all been delivered.", 4502
+                )
+            contract["fulfilled"] = True
+            self.state.agent["credits"] += contract["terms"]["payment"]["onFulfilled"]
+            return 200, {
+                "data": {
+                    "agent": dict(self.state.agent),
+                    "contract": copy.deepcopy(contract),
+                }
+            }
+
+    def get_systems(self, query: dict, payload: dict) -> tuple[int, dict]:
+        return self.paginate(self.state.system_summaries(), query)
+
+    def get_systems_json(self, query: dict, payload: dict) -> tuple[int, list]:
+        return 200, self.state.system_summaries()
+
+    def get_waypoints(
+        self, query: dict, payload: dict, system_symbol: str
+    ) -> tuple[int, dict]:
+        if system_symbol not in self.state.systems:
+            return 404, {"error": {"message": "System not found.", "code": 404}}
+        waypoints = [
+            waypoint
+            for waypoint in self.state.systems[system_symbol]["waypoints"]
+            if query.get("type") in (None, waypoint["type"])
+            and query.get("traits")
+            in (None, *(trait["symbol"] for trait in waypoint["traits"]))
+        ]
+        return self.paginate(waypoints, query)
+
+    def get_market(
+        self, query: dict, payload: dict, system_symbol: str, waypoint_symbol: str
+    ) -> tuple[int, dict]:
+        waypoints = self.state.systems.get(system_symbol, {}).get("waypoints", [])
+        for waypoint in waypoints:
+            if waypoint["symbol"] != waypoint_symbol:
+                continue
+            if "MARKETPLACE" not in [trait["symbol"] for trait in waypoint["traits"]]:
+                break
+            return 200, {"data": synthetic.make_market(waypoint_symbol)}
+        return 404, {"error": {"message": "Market not found.", "code": 4603}}
+
+    def start(self) -> str:
+        """Starts serving on a background thread.
+
+        Returns:
+            The base URL of the server.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local SpaceTraders mock server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ships", type=int, default=100)
+    parser.add_argument("--contracts", type=int, default=5)
+    parser.add_argument("--systems", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--per-second", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=30)
+    args = parser.parse_args()
+
+    server = MockServer(
+        ships=args.ships,
+        contracts=args.contracts,
+        systems=args.systems,
+        latency=args.latency,
+        per_second=args.per_second,
+        burst=args.burst,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Serving at {server.base_url} with token mock-token")
+    print(f"Run the app with SPACETERMINAL_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
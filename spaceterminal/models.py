@@ -0,0 +1,315 @@
+import datetime
+from dataclasses import dataclass, field
+
+
+def parse_time(value: str) -> datetime.datetime:
+    """Parses a timestamp from the API, or gets None if there isn't one."""
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@dataclass(slots=True)
+class RouteWaypoint:
+    """The origin or destination of a ship route."""
+
+    symbol: str
+    type: str
+    system_symbol: str
+    x: int
+    y: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "RouteWaypoint":
+        return cls(
+            symbol=data["symbol"],
+            type=data["type"],
+            system_symbol=data["systemSymbol"],
+            x=data["x"],
+            y=data["y"],
+        )
+
+
+@dataclass(slots=True)
+class ShipRoute:
+    """The route of a ship, the arrival is in the past once it has arrived."""
+
+    origin: RouteWaypoint
+    destination: RouteWaypoint
+    departure_time: datetime.datetime
+    arrival: datetime.datetime
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipRoute":
+        return cls(
+            origin=RouteWaypoint.from_json(data["origin"]),
+            destination=RouteWaypoint.from_json(data["destination"]),
+            departure_time=parse_time(data["departureTime"]),
+            arrival=parse_time(data["arrival"]),
+        )
+
+
+@dataclass(slots=True)
+class ShipNav:
+    """Where a ship is, and where it is going."""
+
+    system_symbol: str
+    waypoint_symbol: str
+    route: ShipRoute
+    status: str
+    flight_mode: str
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipNav":
+        return cls(
+            system_symbol=data["systemSymbol"],
+            waypoint_symbol=data["waypointSymbol"],
+            route=ShipRoute.from_json(data["route"]),
+            status=data["status"],
+            flight_mode=data["flightMode"],
+        )
+
+
+@dataclass(slots=True)
+class ShipFuel:
+    current: int
+    capacity: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipFuel":
+        return cls(current=data["current"], capacity=data["capacity"])
+
+
+@dataclass(slots=True)
+class CargoItem:
+    symbol: str
+    name: str
+    units: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CargoItem":
+        return cls(symbol=data["symbol"], name=data["name"], units=data["units"])
+
+
+@dataclass(slots=True)
+class ShipCargo:
+    capacity: int
+    units: int
+    inventory: list[CargoItem] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipCargo":
+        return cls(
+            capacity=data["capacity"],
+            units=data["units"],
+            inventory=[CargoItem.from_json(item) for item in data["inventory"]],
+        )
+
+
+@dataclass(slots=True)
+class ShipCooldown:
+    """The reactor cooldown of a ship, the expiration is None when there isn't one."""
+
+    ship_symbol: str
+    total_seconds: int
+    remaining_seconds: int
+    expiration: datetime.datetime = None
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipCooldown":
+        return cls(
+            ship_symbol=data["shipSymbol"],
+            total_seconds=data["totalSeconds"],
+            remaining_seconds=data["remainingSeconds"],
+            expiration=parse_time(data.get("expiration")),
+        )
+
+
+@dataclass(slots=True)
+class Ship:
+    """The parts of a ship that are used by SpaceTerminal."""
+
+    symbol: str
+    role: str
+    faction_symbol: str
+    nav: ShipNav
+    fuel: ShipFuel
+    cargo: ShipCargo
+    cooldown: ShipCooldown
+    speed: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Ship":
+        registration = data["registration"]
+        return cls(
+            symbol=data["symbol"],
+            role=registration["role"],
+            faction_symbol=registration["factionSymbol"],
+            nav=ShipNav.from_json(data["nav"]),
+            fuel=ShipFuel.from_json(data["fuel"]),
+            cargo=ShipCargo.from_json(data["cargo"]),
+            cooldown=ShipCooldown.from_json(data["cooldown"]),
+            speed=data["engine"]["speed"],
+        )
+
+
+class ShipModels:
+    """Decodes the JSON of each ship once, and shares the Ship with every view.
+
+    A ship is only decoded again when its JSON is another object, like when it was
+    loaded again or changed by an action, so the tree, the table, the timers, and the
+    trade tab all get the same Ship for a response.
+    """
+
+    def __init__(self):
+        self._ships: dict[str, tuple[dict, Ship]] = {}
+
+    def decode(self, data: dict) -> Ship:
+        """Gets the Ship of the JSON of a ship, decoding it if it is new."""
+        entry = self._ships.get(data["symbol"])
+        if entry is None or entry[0] is not data:
+            entry = (data, Ship.from_json(data))
+            self._ships[data["symbol"]] = entry
+        return entry[1]
+
+
+@dataclass(slots=True)
+class ContractDeliverGood:
+    trade_symbol: str
+    destination_symbol: str
+    units_required: int
+    units_fulfilled: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ContractDeliverGood":
+        return cls(
+            trade_symbol=data["tradeSymbol"],
+            destination_symbol=data["destinationSymbol"],
+            units_required=data["unitsRequired"],
+            units_fulfilled=data["unitsFulfilled"],
+        )
+
+
+@dataclass(slots=True)
+class ContractTerms:
+    deadline: datetime.datetime
+    on_accepted: int
+    on_fulfilled: int
+    deliver: list[ContractDeliverGood] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ContractTerms":
+        return cls(
+            deadline=parse_time(data["deadline"]),
+            on_accepted=data["payment"]["onAccepted"],
+            on_fulfilled=data["payment"]["onFulfilled"],
+            deliver=[
+                ContractDeliverGood.from_json(good) for good in data.get("deliver", [])
+            ],
+        )
+
+
+@dataclass(slots=True)
+class Contract:
+    id: str
+    faction_symbol: str
+    type: str
+    terms: ContractTerms
+    accepted: bool
+    fulfilled: bool
+    deadline_to_accept: datetime.datetime
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Contract":
+        return cls(
+            id=data["id"],
+            faction_symbol=data["factionSymbol"],
+            type=data["type"],
+            terms=ContractTerms.from_json(data["terms"]),
+            accepted=data["accepted"],
+            fulfilled=data["fulfilled"],
+            deadline_to_accept=parse_time(
+                data.get("deadlineToAccept", data.get("expiration"))
+            ),
+        )
+
+
+@dataclass(slots=True)
+class ServerStatus:
+    """The status of the game server, from the root endpoint."""
+
+    status: str
+    version: str
+    reset_date: str
+    description: str
+    agents: int
+    ships: int
+    systems: int
+    waypoints: int
+    next_reset: str
+    reset_frequency: str
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ServerStatus":
+        stats = data["stats"]
+        return cls(
+            status=data["status"],
+            version=data["version"],
+            reset_date=data["resetDate"],
+            description=data["description"],
+            agents=stats["agents"],
+            ships=stats["ships"],
+            systems=stats["systems"],
+            waypoints=stats["waypoints"],
+            next_reset=data["serverResets"]["next"],
+            reset_frequency=data["serverResets"]["frequency"],
+        )
+
+
+@dataclass(slots=True)
+class System:
+    """A star system, which is static until the server resets."""
+
+    symbol: str
+    sector_symbol: str
+    type: str
+    x: int
+    y: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "System":
+        return cls(
+            symbol=data["symbol"],
+            sector_symbol=data["sectorSymbol"],
+            type=data["type"],
+            x=data["x"],
+            y=data["y"],
+        )
+
+
+@dataclass(slots=True)
+class Waypoint:
+    """A waypoint in a system, the traits are empty until the system is imported."""
+
+    symbol: str
+    system_symbol: str
+    type: str
+    x: int
+    y: int
+    orbits: str = None
+    faction_symbol: str = None
+    traits: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: dict, system_symbol: str = None) -> "Waypoint":
+        faction = data.get("faction")
+        return cls(
+            symbol=data["symbol"],
+            system_symbol=data.get("systemSymbol", system_symbol),
+            type=data["type"],
+            x=data["x"],
+            y=data["y"],
+            orbits=data.get("orbits"),
+            faction_symbol=faction["symbol"] if faction else None,
+            traits=[trait["symbol"] for trait in data.get("traits", [])],
+        )
@@ -0,0 +1,338 @@
+import heapq
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.models import Ship
+
+# Time multiplier and fuel used per unit of distance of each flight mode. Drifting
+# always uses 1 fuel, however far the ship goes.
+FLIGHT_MODES = {
+    "BURN": (12.5, 2),
+    "CRUISE": (25, 1),
+    "STEALTH": (30, 1),
+    "DRIFT": (250, 0),
+}
+DEFAULT_MODES = ("BURN", "CRUISE", "DRIFT")
+
+# The longest leg considered by ships that don't use fuel, like probes.
+DEFAULT_MAX_LEG = 500
+
+
+def leg_fuel(distance: float, mode: str) -> int:
+    """Gets the fuel used to travel a distance in a flight mode."""
+    per_unit = FLIGHT_MODES[mode][1]
+    if not per_unit:
+        return 1
+    return max(1, round(distance)) * per_unit
+
+
+def leg_seconds(distance: float, mode: str, speed: int) -> int:
+    """Gets the seconds it takes to travel a distance in a flight mode."""
+    multiplier = FLIGHT_MODES[mode][0]
+    return round(max(1, round(distance)) * multiplier / speed + 15)
+
+
+class SpatialGrid:
+    """Finds the points near a position, by sorting the points into square cells.
+
+    Args:
+        cell_size: Width of each cell. Searches are fastest when it is close to the
+            usual search radius.
+    """
+
+    def __init__(self, cell_size: float = 100):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.points = {}
+
+    def cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, symbol: str, x: float, y: float) -> None:
+        self.points[symbol] = (x, y)
+        self.cells[self.cell(x, y)].append(symbol)
+
+    def within(self, x: float, y: float, radius: float) -> list[tuple[str, float]]:
+        """Gets the (symbol, distance) of the points within a distance of a position."""
+        min_x, min_y = self.cell(x - radius, y - radius)
+        max_x, max_y = self.cell(x + radius, y + radius)
+        found = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for symbol in self.cells.get((cell_x, cell_y), ()):
+                    point_x, point_y = self.points[symbol]
+                    distance = math.hypot(point_x - x, point_y - y)
+                    if distance <= radius:
+                        found.append((symbol, distance))
+        return found
+
+
+@dataclass(slots=True)
+class RouteLeg:
+    """A single flight of a route, the arrival is in seconds since the route started."""
+
+    origin: str
+    destination: str
+    mode: str
+    distance: float
+    fuel: int
+    seconds: int
+    arrival: int
+    refuel: bool = False
+
+
+@dataclass(slots=True)
+class Route:
+    legs: list[RouteLeg] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> int:
+        """The seconds until the ship arrives at the destination."""
+        return self.legs[-1].arrival if self.legs else 0
+
+    @property
+    def fuel(self) -> int:
+        return sum(leg.fuel for leg in self.legs)
+
+    @property
+    def refuels(self) -> list[str]:
+        """The stops the ship refuels at."""
+        return [leg.destination for leg in self.legs if leg.refuel]
+
+
+class RoutePlanner:
+    """Plans the fastest route between points, within the fuel capacity of a ship.
+
+    The points are either the systems of the galaxy or the waypoints of a system, see
+    from_galaxy. A ship can refuel to its capacity at the refuel points.
+
+    Args:
+        points: The (x, y) position of each point, by symbol.
+        refuel: The symbols of the points a ship can refuel at.
+        cell_size: Width of the cells of the spatial index.
+    """
+
+    def __init__(
+        self, points: dict[str, tuple], refuel: set = (), cell_size: float = 200
+    ):
+        self.refuel = set(refuel)
+        self.grid = SpatialGrid(cell_size)
+        for symbol, (x, y) in points.items():
+            self.grid.insert(symbol, x, y)
+        self._neighbors = {}
+
+    @classmethod
+    def from_galaxy(
+        cls,
+        index: GalaxyIndex,
+        system_symbol: str = None,
+        refuel_trait: str = "MARKETPLACE",
+    ) -> "RoutePlanner":
+        """Creates a planner from the galaxy index.
+
+        Args:
+            index: The galaxy index.
+            system_symbol: Plan between the waypoints of this system. If None, plan
+                between the systems of the galaxy.
+            refuel_trait: The trait of the waypoints that sell fuel. Between systems,
+                a ship can refuel in any system with such a waypoint.
+        """
+        if system_symbol is not None:
+            waypoints = index.waypoints(system_symbol)
+            return cls(
+                {waypoint.symbol: (waypoint.x, waypoint.y) for waypoint in waypoints},
+                {w.symbol for w in waypoints if refuel_trait in w.traits},
+                cell_size=20,
+            )
+        points = {system.symbol: (system.x, system.y) for system in index.systems()}
+        refuel = {w.system_symbol for w in index.waypoints(trait=refuel_trait)}
+        return cls(points, refuel)
+
+    def neighbors(self, symbol: str, radius: float) -> list[tuple[str, float]]:
+        key = symbol, radius
+        if key not in self._neighbors:
+            x, y = self.grid.points[symbol]
+            self._neighbors[key] = [
+                neighbor
+                for neighbor in self.grid.within(x, y, radius)
+                if neighbor[0] != symbol
+            ]
+        return self._neighbors[key]
+
+    def plan(
+        self,
+        start: str,
+        goal: str,
+        speed: int,
+        fuel: int,
+        fuel_capacity: int,
+        modes: tuple = DEFAULT_MODES,
+        max_leg: float = None,
+    ) -> Route:
+        """Finds the fastest route from start to goal.
+
+        This is an A* search over the points. A ship with fuel only stops where it
+        can refuel, so it leaves every stop with a full tank, and flies each leg in
+        the fastest mode it can afford. It drifts when it can't afford anything
+        else, and then it may stop anywhere. Each point can be reached with
+        different amounts of fuel left, and a way of reaching a point is only kept
+        if no other way is both faster and has more fuel left.
+
+        Args:
+            start: Symbol of the point the ship is at.
+            goal: Symbol of the destination.
+            speed: Speed of the ship's engine.
+            fuel: Fuel the ship has.
+            fuel_capacity: Fuel the ship can hold, 0 if it doesn't use fuel.
+            modes: The flight modes the ship may use.
+            max_leg: The longest distance flown without a stop. Defaults to the fuel
+                capacity.
+
+        Returns:
+            The route, or None if the goal can't be reached.
+        """
+        if start not in self.grid.points or goal not in self.grid.points:
+            return None
+        if start == goal:
+            return Route()
+        uses_fuel = fuel_capacity > 0
+        if max_leg is None:
+            max_leg = fuel_capacity if uses_fuel else DEFAULT_MAX_LEG
+        if not uses_fuel:
+            fuel = 0
+
+        goal_x, goal_y = self.grid.points[goal]
+        # The time and fuel per unit of distance of each mode, fastest first.
+        powered = sorted(
+            (FLIGHT_MODES[mode][0] / speed, FLIGHT_MODES[mode][1], mode)
+            for mode in modes
+            if FLIGHT_MODES[mode][1]
+        )
+        drift = "DRIFT" in modes
+        fastest = min(FLIGHT_MODES[mode][0] for mode in modes) / speed
+        drift_time = FLIGHT_MODES["DRIFT"][0] / speed
+
+        def estimate(symbol: str) -> float:
+            x, y = self.grid.points[symbol]
+            return math.hypot(goal_x - x, goal_y - y) * fastest
+
+        labels = defaultdict(list)
+        labels[start].append((0, fuel))
+        # Each entry is (estimate, seconds, -fuel, counter, symbol, parent leg).
+        queue = [(estimate(start), 0, -fuel, 0, start, None)]
+        counter = 1
+        while queue:
+            _, seconds, fuel_left, _, symbol, leg = heapq.heappop(queue)
+            fuel_left = -fuel_left
+            if symbol == goal:
+                return self._route(leg)
+            if (seconds, fuel_left) not in labels[symbol]:
+                # A better way of reaching the point was found after this one.
+                continue
+
+            legs = []
+            for neighbor, distance in self.neighbors(symbol, max_leg):
+                if uses_fuel and neighbor not in self.refuel and neighbor != goal:
+                    continue
+                units = max(1, round(distance))
+                for time_per_unit, fuel_per_unit, mode in powered:
+                    cost = units * fuel_per_unit if uses_fuel else 0
+                    if cost <= fuel_left:
+                        duration = round(units * time_per_unit + 15)
+                        legs.append((neighbor, distance, mode, cost, duration))
+                        break
+            if not legs and drift and fuel_left >= 1:
+                # The ship can't afford to fly anywhere it can refuel.
+                legs = [
+                    (neighbor, distance, "DRIFT", 1, round(units * drift_time + 15))
+                    for neighbor, distance in self.neighbors(symbol, max_leg)
+                    for units in (max(1, round(distance)),)
+                ]
+
+            for neighbor, distance, mode, cost, duration in legs:
+                refuel = uses_fuel and neighbor in self.refuel and neighbor != goal
+                arrival = seconds + duration
+                left = fuel_capacity if refuel else fuel_left - cost
+                if not self._add_label(labels[neighbor], arrival, left):
+                    continue
+                next_leg = (
+                    leg,
+                    symbol,
+                    neighbor,
+                    mode,
+                    distance,
+                    cost,
+                    duration,
+                    refuel,
+                )
+                heapq.heappush(
+                    queue,
+                    (
+                        arrival + estimate(neighbor),
+                        arrival,
+                        -left,
+                        counter,
+                        neighbor,
+                        next_leg,
+                    ),
+                )
+                counter += 1
+        return None
+
+    @staticmethod
+    def _add_label(labels: list, seconds: int, fuel: int) -> bool:
+        """Adds a way of reaching a point, unless another way is better.
+
+        The ways this one is better than are removed.
+        """
+        for other_seconds, other_fuel in labels:
+            if other_seconds <= seconds and other_fuel >= fuel:
+                return False
+        labels[:] = [
+            (other_seconds, other_fuel)
+            for other_seconds, other_fuel in labels
+            if not (seconds <= other_seconds and fuel >= other_fuel)
+        ]
+        labels.append((seconds, fuel))
+        return True
+
+    @staticmethod
+    def _route(leg: tuple) -> Route:
+        legs = []
+        while leg is not None:
+            leg, *values = leg
+            legs.append(values)
+        route = Route()
+        arrival = 0
+        for origin, destination, mode, distance, fuel, seconds, refuel in reversed(
+            legs
+        ):
+            arrival += seconds
+            route.legs.append(
+                RouteLeg(
+                    origin, destination, mode, distance, fuel, seconds, arrival, refuel
+                )
+            )
+        return route
+
+    def plan_ship(self, ship: Ship, goal: str, **kwargs) -> Route:
+        """Finds the fastest route for a ship, from where it is now.
+
+        Args:
+            ship: The ship.
+            goal: Symbol of the destination.
+            **kwargs: Passed to plan, like the flight modes to use.
+        """
+        start = ship.nav.waypoint_symbol
+        if start not in self.grid.points:
+            start = ship.nav.system_symbol
+        return self.plan(
+            start,
+            goal,
+            ship.speed,
+            ship.fuel.current,
+            ship.fuel.capacity,
+            **kwargs,
+        )
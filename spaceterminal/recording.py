@@ -0,0 +1,253 @@
+import datetime
+import email.utils
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from spaceterminal.constants import URL
+
+# The rate limit headers a replay speeds up, with Retry-After.
+PER_SECOND_HEADER = "x-ratelimit-limit-per-second"
+BURST_HEADER = "x-ratelimit-limit-burst"
+
+# The response headers worth replaying, the rest are left out of the log. Request
+# headers, like the auth header, are never recorded.
+HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Retry-After",
+    "x-ratelimit-type",
+    "x-ratelimit-limit-per-second",
+    "x-ratelimit-limit-burst",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+)
+
+# The access token of a newly registered agent is replaced with this in the log, so
+# a log can be shared without leaking the token.
+REDACTED = "REDACTED"
+
+
+def relative_url(url: str) -> str:
+    """Gets a URL relative to the base URL, so a log can be replayed on any server."""
+    return url.removeprefix(URL.BASE)
+
+
+def redact(text: str) -> str:
+    """Replaces the access token in the body of a response, like POST /register's."""
+    # Most bodies are pages of ships, which are only decoded if they may have one.
+    if '"token"' not in text:
+        return text
+    try:
+        body = json.loads(text)
+        body["data"]["token"] = REDACTED
+    except (ValueError, KeyError, TypeError):
+        return text
+    return json.dumps(body)
+
+
+def retry_after_value(value: str) -> float:
+    """Gets the seconds of a Retry-After header, which may be in seconds or an HTTP
+    date, or None if it is neither."""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((date - now).total_seconds(), 0.0)
+
+
+def request_body(request: requests.PreparedRequest) -> str:
+    if request.body is None:
+        return None
+    if isinstance(request.body, bytes):
+        return request.body.decode()
+    return request.body
+
+
+class Recorder:
+    """Appends every request and response of a client to a log, see Client.
+
+    Each line of the log is one request as compact JSON:
+
+    - t: Seconds since the recording started, when the response arrived.
+    - ms: Milliseconds the request took.
+    - m, u, b: The method, the URL relative to the base URL, and the body.
+    - s, h, r: The status, the headers in HEADERS, and the body of the response,
+      with the access token replaced, see redact.
+
+    The file is only ever appended to, and each line is written whole, so a log that
+    is cut short by a crash is still readable up to the last request.
+
+    Args:
+        path: The log file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.monotonic()
+        self.count = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_env(cls) -> "Recorder":
+        """Creates a recorder to the SPACETERMINAL_RECORD file, or None if unset."""
+        path = os.environ.get("SPACETERMINAL_RECORD")
+        return None if not path else cls(path)
+
+    def record(self, response: requests.Response, *args, **kwargs) -> None:
+        """Appends a response to the log, as a response hook of a session."""
+        request = response.request
+        entry = {
+            "t": round(time.monotonic() - self.started, 3),
+            "ms": round(response.elapsed.total_seconds() * 1000, 1),
+            "m": request.method,
+            "u": relative_url(request.url),
+            "b": request_body(request),
+            "s": response.status_code,
+            "h": {
+                header: response.headers[header]
+                for header in HEADERS
+                if header in response.headers
+            },
+            "r": redact(response.text),
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(f"{line}\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_log(path: str) -> list[dict]:
+    """Reads the requests of a log, skipping a last line that was cut short."""
+    entries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+    return entries
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves the responses of a log instead of sending requests, see Client.
+
+    Each request gets the next recorded response of the same method, URL and body,
+    in the order they were recorded. Once those run out, the last one is served
+    again, so polling an endpoint more often than it was recorded still works.
+    Requests that were never recorded get a 404.
+
+    The rate limit in the replayed headers is sped up like the responses, so the
+    scheduler of the client doesn't hold the replay back to the recorded rate.
+
+    Args:
+        path: The log file, written by Recorder.
+        speed: How much faster than recorded the responses are served. 1 keeps the
+            recorded time of each request, and 0 serves them without waiting.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.entries = read_log(path)
+        self.served = 0
+        self.missed = 0
+        self._responses = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        for entry in self.entries:
+            self._responses[entry["m"], entry["u"], entry["b"]].append(entry)
+
+    @classmethod
+    def from_env(cls) -> "ReplayAdapter":
+        """Creates an adapter replaying the SPACETERMINAL_REPLAY file, at the
+        SPACETERMINAL_REPLAY_SPEED, or None if it isn't set."""
+        path = os.environ.get("SPACETERMINAL_REPLAY")
+        if not path:
+            return None
+        return cls(path, float(os.environ.get("SPACETERMINAL_REPLAY_SPEED", 1)))
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        key = request.method, relative_url(request.url), request_body(request)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                entry = self._last[key] = queue.popleft()
+            else:
+                entry = self._last.get(key)
+            if entry is None:
+                self.missed += 1
+            else:
+                self.served += 1
+        if entry is None:
+            entry = {
+                "ms": 0,
+                "s": 404,
+                "h": {"Content-Type": "application/json"},
+                "r": json.dumps(
+                    {"error": {"message": "Not in the replayed log.", "code": 404}}
+                ),
+            }
+        if self.speed > 0:
+            time.sleep(entry["ms"] / 1000 / self.speed)
+
+        response = requests.Response()
+        response.status_code = entry["s"]
+        response.headers = self.scale_headers(entry["h"])
+        response._content = entry["r"].encode()
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(milliseconds=entry["ms"])
+        response.connection = self
+        return response
+
+    def scale_headers(self, headers: dict) -> CaseInsensitiveDict:
+        """Speeds up the rate limit of recorded headers like the replay."""
+        headers = CaseInsensitiveDict(headers)
+        if self.speed == 1:
+            return headers
+        if self.speed > 0:
+            if PER_SECOND_HEADER in headers:
+                per_second = float(headers[PER_SECOND_HEADER]) * self.speed
+                headers[PER_SECOND_HEADER] = str(per_second)
+            retry_after = retry_after_value(headers.get("Retry-After", ""))
+            if retry_after is not None:
+                headers["Retry-After"] = f"{retry_after / self.speed:.3f}"
+        else:
+            headers.pop(PER_SECOND_HEADER, None)
+            headers.pop(BURST_HEADER, None)
+            if "Retry-After" in headers:
+                headers["Retry-After"] = "0"
+        return headers
+
+    def close(self) -> None:
+        pass
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Replayed requests never open connections, see PooledAdapter."""
+        return 0, 0
@@ -0,0 +1,170 @@
+import bisect
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from spaceterminal.jsonTree import item_key
+
+# The words of a value, so X1-DF55-A1 can be found by DF55 as well as by X1-DF55.
+WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(slots=True, frozen=True)
+class SearchMatch:
+    """A value that matched a search.
+
+    Args:
+        kind: The kind of document, like ships or contracts.
+        key: The key of the document, see jsonTree.item_key.
+        path: The keys and indexes of the value within the document.
+        number: The position of the value within the document, in order.
+    """
+
+    kind: str
+    key: tuple
+    path: tuple
+    number: int
+
+
+def tokens(value: object) -> set[str]:
+    """Gets the tokens of a value: the whole value, and each of its words."""
+    text = str(value).lower()
+    return {text, *WORD.findall(text)}
+
+
+def leaves(data: object, path: tuple = ()) -> Iterator[tuple[tuple, object]]:
+    """Yields the (path, value) of every value in a JSON document, in order.
+
+    True, false, and null are left out, as they would match half of every document.
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from leaves(value, (*path, key))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield from leaves(value, (*path, index))
+    elif data is not None and not isinstance(data, bool):
+        yield path, data
+
+
+class SearchIndex:
+    """An inverted index of the values in the JSON of ships and contracts.
+
+    Each token maps to the values it was found in, as (document, value number). The
+    tokens are also kept sorted, so a search term matches every token it is a prefix
+    of. Documents are only indexed again when their JSON changed, so refreshing the
+    fleet costs little when few ships changed.
+    """
+
+    def __init__(self):
+        self._documents: dict[tuple, object] = {}
+        self._paths: dict[tuple, list[tuple]] = {}
+        self._postings: dict[str, set[tuple]] = {}
+        self._tokens: list[str] = []
+        # Searches run on the UI thread, while documents may be added from workers.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def update(self, kind: str, items: Iterable[dict]) -> int:
+        """Adds or replaces documents, like a page of ships.
+
+        Returns:
+            The number of documents that were indexed, as they were new or changed.
+        """
+        indexed = 0
+        with self._lock:
+            for index, item in enumerate(items):
+                document = (kind, item_key(index, item))
+                if self._documents.get(document) == item:
+                    continue
+                self._remove(document)
+                self._add(document, item)
+                indexed += 1
+        return indexed
+
+    def keep(self, kind: str, items: Iterable[dict]) -> int:
+        """Removes the documents of a kind that aren't one of items, like after a
+        full refresh.
+
+        Returns:
+            The number of documents that were removed.
+        """
+        with self._lock:
+            kept = {(kind, item_key(index, item)) for index, item in enumerate(items)}
+            removed = [
+                document
+                for document in self._documents
+                if document[0] == kind and document not in kept
+            ]
+            for document in removed:
+                self._remove(document)
+        return len(removed)
+
+    def _add(self, document: tuple, item: dict) -> None:
+        paths = []
+        for number, (path, value) in enumerate(leaves(item)):
+            paths.append(path)
+            for token in tokens(value):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._tokens, token)
+                postings.add((document, number))
+        self._documents[document] = item
+        self._paths[document] = paths
+
+    def _remove(self, document: tuple) -> None:
+        item = self._documents.pop(document, None)
+        if item is None:
+            return
+        del self._paths[document]
+        for number, (_, value) in enumerate(leaves(item)):
+            for token in tokens(value):
+                postings = self._postings[token]
+                postings.discard((document, number))
+                if not postings:
+                    del self._postings[token]
+                    del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def _lookup(self, term: str) -> set[tuple]:
+        """Gets the values with a token that starts with term."""
+        found = set()
+        # The tokens are walked from the first match by index, as slicing would copy
+        # the rest of the tokens on every lookup.
+        index = bisect.bisect_left(self._tokens, term)
+        while index < len(self._tokens) and self._tokens[index].startswith(term):
+            found |= self._postings[self._tokens[index]]
+            index += 1
+        return found
+
+    def search(self, query: str, kind: str = None) -> list[SearchMatch]:
+        """Finds the values that match the words of a query.
+
+        A document matches when each word is the start of one of its tokens, and
+        every value that matched one of the words is returned.
+
+        Args:
+            query: The words to search for, in any case.
+            kind: Only search the documents of this kind.
+
+        Returns:
+            The values that matched, by document, then in order within it.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return []
+        with self._lock:
+            found = [self._lookup(term) for term in terms]
+            documents = None
+            for values in found:
+                matched = {document for document, _ in values}
+                documents = matched if documents is None else documents & matched
+            values = set().union(*found)
+            return [
+                SearchMatch(*document, self._paths[document][number], number)
+                for document, number in sorted(values)
+                if document in documents and (kind is None or document[0] == kind)
+            ]
@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from spaceterminal.constants import PATH, URL
+
+# Snapshots written by another version are ignored, as their data may not be shaped
+# like this version expects.
+SNAPSHOT_VERSION = 1
+
+# Compresses a fleet to about a twentieth of its size, while keeping writes quick.
+COMPRESS_LEVEL = 6
+
+# Seconds a file may go unwritten while its data is unchanged, before it is written
+# again just to bring the saved times up to date.
+TOUCH_INTERVAL = 5 * 60
+
+
+class SnapshotStore:
+    """The last agent, ships, contracts, and status seen with each access token.
+
+    Each access token has a single compressed file, so the app can show everything
+    from the last session with one disk read, while the requests to bring it up to
+    date are still running. The files are named by a hash of the base URL and the
+    access token, so the token itself is never written to the cache.
+
+    Each section of a snapshot, like "ships", is kept as {"saved": time, "data": JSON},
+    so how old it is can be shown.
+
+    Args:
+        directory: The directory of the snapshot files.
+    """
+
+    def __init__(self, directory: str = PATH.SNAPSHOTS):
+        self.directory = directory
+        self._snapshots: dict[str, dict] = {}
+        # When each file was last written by this store, by path.
+        self._written: dict[str, float] = {}
+        # Sections are saved from worker threads.
+        self._lock = threading.Lock()
+
+    def path(self, access_token: str) -> str:
+        """Gets the snapshot file of an access token, or of no token for the status."""
+        key = f"{URL.BASE}\n{access_token or ''}".encode()
+        return os.path.join(
+            self.directory, f"{hashlib.sha256(key).hexdigest()}.json.gz"
+        )
+
+    def load(self, access_token: str) -> dict[str, dict]:
+        """Gets the sections of the snapshot of an access token.
+
+        Returns:
+            The sections by name, which is empty if there is no snapshot, or it is
+            unreadable or from another version.
+        """
+        with self._lock:
+            return dict(self._read(access_token))
+
+    def save(self, access_token: str, section: str, data: object) -> bool:
+        """Replaces a section of the snapshot of an access token.
+
+        The saved time of the section is always updated. The file is only written
+        when the data changed, or once the file is TOUCH_INTERVAL old, so a refresh
+        from the cache doesn't write it again and again.
+
+        Returns:
+            True if the snapshot was written.
+        """
+        now = time.time()
+        with self._lock:
+            snapshot = self._read(access_token)
+            current = snapshot.get(section)
+            unchanged = current is not None and current["data"] == data
+            if unchanged:
+                data = current["data"]
+            snapshot[section] = {"saved": now, "data": data}
+            written = self._written.get(self.path(access_token), 0)
+            if unchanged and now - written < TOUCH_INTERVAL:
+                return False
+            self._write(access_token, snapshot)
+        return True
+
+    def _read(self, access_token: str) -> dict:
+        path = self.path(access_token)
+        snapshot = self._snapshots.get(path)
+        if snapshot is None:
+            try:
+                with open(path, "rb") as file:
+                    contents = json.loads(gzip.decompress(file.read()))
+                if contents["version"] == SNAPSHOT_VERSION:
+                    snapshot = contents["sections"]
+            except (OSError, EOFError, ValueError, KeyError, TypeError):
+                pass
+            snapshot = self._snapshots[path] = snapshot or {}
+        return snapshot
+
+    def _write(self, access_token: str, snapshot: dict) -> None:
+        """Writes a snapshot, so a reader never sees a partially written file."""
+        path = self.path(access_token)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        contents = {"version": SNAPSHOT_VERSION, "sections": snapshot}
+        # Encoded and compressed in one go, which is much quicker than streaming.
+        data = json.dumps(contents, separators=(",", ":")).encode()
+        with open(temp_path, "wb") as file:
+            file.write(gzip.compress(data, COMPRESS_LEVEL))
+        os.replace(temp_path, path)
+        self._written[path] = time.time()
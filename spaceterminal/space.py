@@ -1,21 +1,48 @@
+import contextvars
+import math
+import queue
+from collections.abc import Callable, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-api_url = "https://api.spacetraders.io/v2/"
-factions_url = f"{api_url}factions/"
-my_ships_url = f"{api_url}my/ships/"
-my_contracts_url = f"{api_url}my/contracts/"
+from spaceterminal import diskcache
+from spaceterminal.constants import PATH, URL
+from spaceterminal.timeseries import market_samples
+
+# The recruiting factions rarely change, so they are only fetched once a day.
+FACTIONS_MAX_AGE = 24 * 60 * 60
 
+# The largest page size the API allows for paginated endpoints.
+PAGE_LIMIT = 20
 
-def get_status():
-    return requests.get(api_url)
+
+def get_status(client=None):
+    """Gets response of the server status, cached by the client if one is given."""
+    if client is not None:
+        return client.get(URL.STATUS)
+    return requests.get(URL.STATUS)
 
 
 def get_factions():
-    return requests.get(factions_url)
+    return requests.get(URL.FACTIONS, params={"limit": PAGE_LIMIT})
+
 
+def get_factions_list(
+    cache_file: str = PATH.FACTIONS, max_age: float = FACTIONS_MAX_AGE
+) -> list:
+    """Gets a list of the faction names that are recruiting.
+
+    The list is cached on disk, and only fetched again once the cache expires.
+
+    Args:
+        cache_file: The file the list is cached in.
+        max_age: Maximum age of the cached list in seconds.
+    """
+    factions = diskcache.read_json(cache_file, max_age)
+    if factions is not None:
+        return factions
 
-def get_factions_list() -> list:
-    """Gets a list of the faction names that are recruiting."""
     factions = []
     response = get_factions().json()
 
@@ -23,14 +50,263 @@ def get_factions_list() -> list:
         if faction["isRecruiting"]:
             factions.append(faction["symbol"])
 
+    diskcache.write_json(cache_file, factions)
     return factions
 
 
-def get_my_ships(client):
-    """Gets response of agent ships."""
-    return client.session.get(my_ships_url)
+def get_page(client, url: str, page: int = 1, limit: int = PAGE_LIMIT):
+    """Gets response of a single page of a paginated endpoint."""
+    return client.get(url, params={"page": page, "limit": limit})
+
+
+def get_pages(
+    client, url: str, limit: int = PAGE_LIMIT, max_workers: int = 4
+) -> Iterator[dict]:
+    """Yields the decoded JSON of every page of a paginated endpoint, in order.
+
+    The first page is fetched on its own to read the total from its meta. The rest of
+    the pages are then fetched concurrently, and the request scheduler of the client
+    keeps them within the rate limit. Each page is yielded as soon as it and the pages
+    before it have arrived, so the caller can render page 1 while later pages are in
+    flight.
+
+    If a page has an error, it is yielded and no further pages are fetched.
+
+    Args:
+        client: The client to make the requests with.
+        url: The endpoint to fetch.
+        limit: The number of items per page.
+        max_workers: The maximum number of pages fetched at the same time.
+    """
+    first = get_page(client, url, 1, limit).json()
+    yield first
+    if "error" in first:
+        return
+
+    meta = first["meta"]
+    pages = math.ceil(meta["total"] / meta["limit"])
+    if pages <= 1:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        # Each page gets a copy of the context, so it keeps the request priority.
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run,
+                get_page,
+                client,
+                url,
+                page,
+                meta["limit"],
+            )
+            for page in range(2, pages + 1)
+        ]
+        for future in futures:
+            page = future.result().json()
+            yield page
+            if "error" in page:
+                return
+    finally:
+        # Stop fetching the remaining pages if the caller stops iterating early.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(
+    items: list,
+    key: Callable[[object], Hashable],
+    send: Callable[[object], dict],
+    max_workers: int = 4,
+) -> Iterator[tuple[int, dict]]:
+    """Sends a batch of requests, like an action for each ship, yielding each result
+    as soon as it arrives.
+
+    The items with the same key, like the same ship, are sent one after the other in
+    order, while items with different keys are sent at the same time. The request
+    scheduler of the client keeps them within the rate limit. Once an item gets an
+    error, the rest of the items with its key are skipped, as they most likely
+    depended on it.
+
+    Args:
+        items: The items to send.
+        key: Gets the key of an item.
+        send: Sends an item, and gets the decoded JSON of its response.
+        max_workers: The most keys that are sent items at the same time.
+
+    Yields:
+        The (index of the item, decoded JSON) of each item, in the order they
+        arrive, with None as the JSON of a skipped item.
+    """
+    groups = {}
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append((index, item))
+    results = queue.Queue()
+
+    def send_group(group: list) -> None:
+        failed = False
+        try:
+            for index, item in group:
+                result = None if failed else send(item)
+                failed = failed or result is None or "error" in result
+                results.put((index, result))
+        except Exception as error:
+            results.put((None, error))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        # Each group gets a copy of the context, so it keeps the request priority.
+        for group in groups.values():
+            executor.submit(contextvars.copy_context().run, send_group, group)
+        for _ in items:
+            index, result = results.get()
+            if index is None:
+                raise result
+            yield index, result
+    finally:
+        # Stop sending the remaining items if the caller stops iterating early.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_my_ships(client, page: int = 1, limit: int = PAGE_LIMIT):
+    """Gets response of a page of agent ships."""
+    return get_page(client, URL.SHIPS, page, limit)
+
+
+def get_my_ships_pages(client) -> Iterator[dict]:
+    """Yields every page of agent ships."""
+    return get_pages(client, URL.SHIPS)
+
+
+def get_my_ship(client, ship_symbol: str):
+    """Gets response of a single ship, fresh from the server.
+
+    This refreshes one ship when it changes, like when it arrives, without fetching
+    the whole fleet. The cached pages of ships are dropped too, since they have the
+    old ship.
+    """
+    client.cache.invalidate(client.access_token, URL.SHIPS)
+    return client.get(f"{URL.SHIPS}/{ship_symbol}")
+
+
+def get_my_contracts(client, page: int = 1, limit: int = PAGE_LIMIT):
+    """Gets response of a page of my contracts."""
+    return get_page(client, URL.CONTRACTS, page, limit)
+
+
+def get_my_contracts_pages(client) -> Iterator[dict]:
+    """Yields every page of my contracts."""
+    return get_pages(client, URL.CONTRACTS)
+
+
+def get_systems_json(client):
+    """Gets response of every system in the galaxy, in a single request.
+
+    The response is large and only needed once per server reset, so it is not kept
+    in the response cache of the client.
+    """
+    return client.session.get(URL.SYSTEMS_JSON)
+
+
+def get_systems_pages(client) -> Iterator[dict]:
+    """Yields every page of systems."""
+    return get_pages(client, URL.SYSTEMS)
+
+
+def get_waypoints_pages(client, system_symbol: str) -> Iterator[dict]:
+    """Yields every page of waypoints in a system."""
+    return get_pages(client, f"{URL.SYSTEMS}/{system_symbol}/waypoints")
+
+
+def update_galaxy(client, index, reset_date: str) -> dict:
+    """Imports the systems of the galaxy, if the index is from before the last reset.
+
+    The systems are fetched in bulk from systems.json. If that fails, they are fetched
+    one page at a time instead.
+
+    Args:
+        client: The client to make the requests with.
+        index (GalaxyIndex): The index to import the systems into.
+        reset_date: The reset date from the server status.
+
+    Returns:
+        The error of the failed request, or None if the index is up to date.
+    """
+    if index.is_current(reset_date):
+        return None
+
+    response = get_systems_json(client)
+    if response.status_code == 200:
+        index.import_systems(response.json(), reset_date)
+        return None
+
+    systems = []
+    for page in get_systems_pages(client):
+        if "error" in page:
+            return page
+        systems.extend(page["data"])
+    index.import_systems(systems, reset_date)
+    return None
+
+
+def update_system_waypoints(client, index, system_symbol: str) -> dict:
+    """Imports the waypoints of a system with their traits, if not already imported.
+
+    Args:
+        client: The client to make the requests with.
+        index (GalaxyIndex): The index to import the waypoints into.
+        system_symbol: Symbol of the system.
+
+    Returns:
+        The error of the failed request, or None if the waypoints are imported.
+    """
+    if index.has_waypoints(system_symbol):
+        return None
+
+    waypoints = []
+    for page in get_waypoints_pages(client, system_symbol):
+        if "error" in page:
+            return page
+        waypoints.extend(page["data"])
+    index.import_waypoints(system_symbol, waypoints)
+    return None
+
+
+def waypoint_system(waypoint_symbol: str) -> str:
+    """Gets the symbol of the system a waypoint is in, like X1-S1 from X1-S1-W1."""
+    return waypoint_symbol.rsplit("-", 1)[0]
+
+
+def get_market(client, waypoint_symbol: str):
+    """Gets response of the market at a waypoint."""
+    system_symbol = waypoint_system(waypoint_symbol)
+    return client.get(
+        f"{URL.SYSTEMS}/{system_symbol}/waypoints/{waypoint_symbol}/market"
+    )
+
+
+def update_markets(client, store, waypoint_symbols, timeseries=None) -> int:
+    """Stores the prices of the markets at the waypoints.
+
+    The prices are only sent while a ship is at the waypoint, so these should be the
+    waypoints of the ships. Waypoints without a market are skipped.
 
+    Args:
+        client: The client to make the requests with.
+        store (MarketStore): The store to save the prices in.
+        waypoint_symbols: Symbols of the waypoints.
+        timeseries (TimeSeriesStore): Also record the prices in this store.
 
-def get_my_contracts(client):
-    """Gets response of my contracts."""
-    return client.session.get(my_contracts_url)
+    Returns:
+        The number of markets that had prices.
+    """
+    updated = 0
+    for waypoint_symbol in set(waypoint_symbols):
+        response = get_market(client, waypoint_symbol)
+        if response.status_code != 200:
+            continue
+        market = response.json()["data"]
+        if store.store(market):
+            updated += 1
+            if timeseries is not None:
+                timeseries.record(market_samples(market))
+    return updated
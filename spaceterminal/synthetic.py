@@ -0,0 +1,281 @@
+import datetime
+import random
+
+ROLES = ["COMMAND", "EXCAVATOR", "HAULER", "SATELLITE", "TRANSPORT", "SURVEYOR"]
+STATUSES = ["DOCKED", "IN_ORBIT", "IN_TRANSIT"]
+GOODS = ["IRON_ORE", "COPPER_ORE", "ALUMINUM_ORE", "QUARTZ_SAND", "ICE_WATER", "FUEL"]
+WAYPOINT_TYPES = ["PLANET", "MOON", "ASTEROID", "GAS_GIANT", "ORBITAL_STATION"]
+SYSTEM_TYPES = ["RED_STAR", "ORANGE_STAR", "BLUE_STAR", "WHITE_DWARF", "NEUTRON_STAR"]
+TRADE_GOODS = GOODS + [
+    "PRECIOUS_STONES",
+    "SILICON_CRYSTALS",
+    "AMMONIA_ICE",
+    "LIQUID_HYDROGEN",
+    "IRON",
+    "COPPER",
+    "ALUMINUM",
+    "PLASTICS",
+    "FABRICS",
+    "FOOD",
+    "MEDICINE",
+    "ELECTRONICS",
+    "MACHINERY",
+    "EQUIPMENT",
+]
+SUPPLIES = ["SCARCE", "LIMITED", "MODERATE", "HIGH", "ABUNDANT"]
+TRAITS = ["MARKETPLACE", "SHIPYARD", "COMMON_METAL_DEPOSITS", "ICE_CRYSTALS", "BARREN"]
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def timestamp(seconds: float) -> str:
+    """Gets an API formatted timestamp, the given number of seconds after START."""
+    return format_time(START + datetime.timedelta(seconds=seconds))
+
+
+def format_time(moment: datetime.datetime) -> str:
+    """Formats a UTC time like the API does."""
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def make_waypoint(system: str, index: int, rng: random.Random) -> dict:
+    """Creates a route waypoint."""
+    return {
+        "symbol": f"{system}-W{index}",
+        "type": rng.choice(WAYPOINT_TYPES),
+        "systemSymbol": system,
+        "x": rng.randint(-100, 100),
+        "y": rng.randint(-100, 100),
+    }
+
+
+def make_ship(index: int, agent: str = "AGENT", seed: int = 0) -> dict:
+    """Creates a ship.
+
+    Args:
+        index: Number of the ship, used in its symbol.
+        agent: Symbol of the agent that owns the ship.
+        seed: Seed for the random values, the same seed gives the same ship.
+    """
+    rng = random.Random(f"{seed}-{index}")
+    system = f"X1-S{rng.randint(1, 50)}"
+    fuel_capacity = rng.choice([0, 100, 400, 1200])
+    cargo_capacity = rng.choice([0, 15, 30, 60, 120])
+    units = rng.randint(0, cargo_capacity)
+    inventory = []
+    if units:
+        good = rng.choice(GOODS)
+        inventory.append(
+            {
+                "symbol": good,
+                "name": good.replace("_", " ").title(),
+                "description": f"A unit of {good.lower()}.",
+                "units": units,
+            }
+        )
+
+    return {
+        "symbol": f"{agent}-{index + 1:X}",
+        "registration": {
+            "name": f"{agent}-{index + 1:X}",
+            "factionSymbol": "COSMIC",
+            "role": rng.choice(ROLES),
+        },
+        "nav": {
+            "systemSymbol": system,
+            "waypointSymbol": f"{system}-W{rng.randint(1, 20)}",
+            "route": {
+                "destination": make_waypoint(system, rng.randint(1, 20), rng),
+                "origin": make_waypoint(system, rng.randint(1, 20), rng),
+                "departureTime": timestamp(index),
+                "arrival": timestamp(index + rng.randint(0, 600)),
+            },
+            "status": rng.choice(STATUSES),
+            "flightMode": "CRUISE",
+        },
+        "crew": {
+            "current": 0,
+            "required": 0,
+            "capacity": 0,
+            "rotation": "STRICT",
+            "morale": 100,
+            "wages": 0,
+        },
+        "frame": {
+            "symbol": "FRAME_PROBE",
+            "name": "Probe",
+            "description": "A small, unmanned spacecraft.",
+            "condition": 1,
+            "integrity": 1,
+            "moduleSlots": 0,
+            "mountingPoints": 0,
+            "fuelCapacity": fuel_capacity,
+            "requirements": {"power": 1, "crew": 0},
+        },
+        "reactor": {
+            "symbol": "REACTOR_SOLAR_I",
+            "name": "Solar Reactor I",
+            "description": "A basic solar power reactor.",
+            "condition": 1,
+            "integrity": 1,
+            "powerOutput": 3,
+            "requirements": {"crew": 0},
+        },
+        "engine": {
+            "symbol": "ENGINE_IMPULSE_DRIVE_I",
+            "name": "Impulse Drive I",
+            "description": "A basic low-energy propulsion system.",
+            "condition": 1,
+            "integrity": 1,
+            "speed": rng.choice([2, 10, 30]),
+            "requirements": {"power": 1, "crew": 0},
+        },
+        "cooldown": {
+            "shipSymbol": f"{agent}-{index + 1:X}",
+            "totalSeconds": 0,
+            "remainingSeconds": 0,
+        },
+        "modules": [],
+        "mounts": [],
+        "cargo": {"capacity": cargo_capacity, "units": units, "inventory": inventory},
+        "fuel": {
+            "current": rng.randint(0, fuel_capacity),
+            "capacity": fuel_capacity,
+            "consumed": {"amount": 0, "timestamp": timestamp(index)},
+        },
+    }
+
+
+def make_contract(index: int, seed: int = 0) -> dict:
+    """Creates a procurement contract.
+
+    Args:
+        index: Number of the contract, used in its id.
+        seed: Seed for the random values, the same seed gives the same contract.
+    """
+    rng = random.Random(f"contract-{seed}-{index}")
+    system = f"X1-S{rng.randint(1, 50)}"
+    return {
+        "id": f"contract-{index:08d}",
+        "factionSymbol": "COSMIC",
+        "type": "PROCUREMENT",
+        "terms": {
+            "deadline": timestamp(7 * 24 * 60 * 60 + index),
+            "payment": {
+                "onAccepted": rng.randint(1, 50) * 1000,
+                "onFulfilled": rng.randint(10, 200) * 1000,
+            },
+            "deliver": [
+                {
+                    "tradeSymbol": rng.choice(GOODS),
+                    "destinationSymbol": f"{system}-W{rng.randint(1, 20)}",
+                    "unitsRequired": rng.randint(10, 100),
+                    "unitsFulfilled": 0,
+                }
+            ],
+        },
+        "accepted": False,
+        "fulfilled": False,
+        "expiration": timestamp(24 * 60 * 60 + index),
+        "deadlineToAccept": timestamp(24 * 60 * 60 + index),
+    }
+
+
+def make_system_waypoint(system: str, index: int, rng: random.Random) -> dict:
+    """Creates a waypoint of a system, with its traits."""
+    return {
+        "symbol": f"{system}-W{index}",
+        "type": rng.choice(WAYPOINT_TYPES),
+        "systemSymbol": system,
+        "x": rng.randint(-100, 100),
+        "y": rng.randint(-100, 100),
+        "orbitals": [],
+        "traits": [
+            {"symbol": trait, "name": trait.replace("_", " ").title()}
+            for trait in rng.sample(TRAITS, rng.randint(0, 2))
+        ],
+        "faction": {"symbol": "COSMIC"},
+        "isUnderConstruction": False,
+    }
+
+
+def make_system(index: int, waypoints: int = 20, seed: int = 0) -> dict:
+    """Creates a system, with the full waypoints like the waypoints endpoint has them.
+
+    Args:
+        index: Number of the system, used in its symbol.
+        waypoints: Number of waypoints in the system.
+        seed: Seed for the random values, the same seed gives the same system.
+    """
+    rng = random.Random(f"system-{seed}-{index}")
+    symbol = f"X1-S{index + 1}"
+    return {
+        "symbol": symbol,
+        "sectorSymbol": "X1",
+        "type": rng.choice(SYSTEM_TYPES),
+        "x": rng.randint(-5000, 5000),
+        "y": rng.randint(-5000, 5000),
+        "waypoints": [
+            make_system_waypoint(symbol, waypoint + 1, rng)
+            for waypoint in range(waypoints)
+        ],
+        "factions": [],
+    }
+
+
+def base_price(good: str, seed: int = 0) -> int:
+    """Gets the price a good is traded around in every market."""
+    if good == "FUEL":
+        return 72
+    return random.Random(f"price-{seed}-{good}").randint(20, 5000)
+
+
+def make_market(waypoint: str, seed: int = 0) -> dict:
+    """Creates a market, with the trade goods a ship at the waypoint would see.
+
+    Each good has a base price that is the same in every market, so the prices of
+    the same good can be compared between markets.
+
+    Args:
+        waypoint: Symbol of the waypoint of the market.
+        seed: Seed for the random values, the same seed gives the same market.
+    """
+    rng = random.Random(f"market-{seed}-{waypoint}")
+    trade_goods = []
+    groups = {"EXPORT": [], "IMPORT": [], "EXCHANGE": []}
+    for good in rng.sample(TRADE_GOODS, rng.randint(3, 8)):
+        purchase_price = round(base_price(good, seed) * rng.uniform(0.6, 1.4))
+        kind = rng.choice(list(groups))
+        groups[kind].append({"symbol": good, "name": good.replace("_", " ").title()})
+        trade_goods.append(
+            {
+                "symbol": good,
+                "type": kind,
+                "tradeVolume": rng.choice([10, 20, 60, 100]),
+                "supply": rng.choice(SUPPLIES),
+                "purchasePrice": purchase_price,
+                "sellPrice": round(purchase_price * rng.uniform(0.85, 0.98)),
+            }
+        )
+    return {
+        "symbol": waypoint,
+        "exports": groups["EXPORT"],
+        "imports": groups["IMPORT"],
+        "exchange": groups["EXCHANGE"],
+        "transactions": [],
+        "tradeGoods": trade_goods,
+    }
+
+
+def make_fleet(count: int, agent: str = "AGENT", seed: int = 0) -> list:
+    """Creates a list of ships."""
+    return [make_ship(index, agent, seed) for index in range(count)]
+
+
+def make_contracts(count: int, seed: int = 0) -> list:
+    """Creates a list of contracts."""
+    return [make_contract(index, seed) for index in range(count)]
+
+
+def make_galaxy(count: int, waypoints: int = 20, seed: int = 0) -> list:
+    """Creates a list of systems."""
+    return [make_system(index, waypoints, seed) for index in range(count)]
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+from spaceterminal.models import Ship
+
+ARRIVAL = "arrival"
+COOLDOWN = "cooldown"
+
+# Seconds to wait after a timer runs out before firing, so the server has surely
+# changed the ship by the time it is refreshed.
+GRACE = 1.0
+
+
+@dataclass(slots=True)
+class ShipEvent:
+    """A ship arrived, or its reactor cooldown ran out, at a Unix timestamp."""
+
+    ship_symbol: str
+    kind: str
+    time: float
+
+
+class ShipTimers:
+    """Fires an event when a ship arrives or its cooldown runs out, without polling.
+
+    The timers are kept in a heap ordered by when they run out, so run only wakes up
+    for the next one. Rescheduling or cancelling a timer doesn't search the heap, the
+    old entry is skipped when it comes up.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._pending: dict[tuple[str, str], float] = {}
+        self._counter = itertools.count()
+        # Set when a timer is added, to wake up run. It is made by run, so it belongs
+        # to the event loop that runs it.
+        self._changed = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, ship_symbol: str, kind: str, when: float) -> None:
+        """Sets the timer of a kind for a ship, replacing the one it had."""
+        key = ship_symbol, kind
+        if self._pending.get(key) == when:
+            return
+        self._pending[key] = when
+        heapq.heappush(self._heap, (when, next(self._counter), key))
+        if self._changed is not None:
+            self._changed.set()
+
+    def cancel(self, ship_symbol: str, kind: str = None) -> None:
+        """Cancels the timers of a ship, or only the timer of one kind."""
+        for timer_kind in (ARRIVAL, COOLDOWN) if kind is None else (kind,):
+            self._pending.pop((ship_symbol, timer_kind), None)
+
+    def update_ship(self, ship: Ship) -> None:
+        """Sets the timers of a ship from its nav and cooldown."""
+        now = time.time()
+        arrival = ship.nav.route.arrival
+        if ship.nav.status == "IN_TRANSIT" and arrival.timestamp() > now:
+            self.schedule(ship.symbol, ARRIVAL, arrival.timestamp() + GRACE)
+        else:
+            self.cancel(ship.symbol, ARRIVAL)
+        expiration = ship.cooldown.expiration
+        if expiration is not None and expiration.timestamp() > now:
+            self.schedule(ship.symbol, COOLDOWN, expiration.timestamp() + GRACE)
+        else:
+            self.cancel(ship.symbol, COOLDOWN)
+
+    def update_fleet(self, ships: Iterable[Ship]) -> None:
+        """Sets the timers of every ship, and drops those of ships that are gone."""
+        symbols = set()
+        for ship in ships:
+            symbols.add(ship.symbol)
+            self.update_ship(ship)
+        for ship_symbol, _ in list(self._pending):
+            if ship_symbol not in symbols:
+                self.cancel(ship_symbol)
+
+    def next_time(self) -> float:
+        """Gets when the next timer runs out, or None if there are no timers."""
+        while self._heap:
+            when, _, key = self._heap[0]
+            if self._pending.get(key) == when:
+                return when
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float = None) -> list[ShipEvent]:
+        """Removes the timers that have run out, and gets their events."""
+        now = time.time() if now is None else now
+        events = []
+        while (when := self.next_time()) is not None and when <= now:
+            _, _, key = heapq.heappop(self._heap)
+            del self._pending[key]
+            events.append(ShipEvent(*key, when))
+        return events
+
+    async def run(self, callback: Callable[[ShipEvent], Awaitable]) -> None:
+        """Calls back with each event as its timer runs out, until cancelled.
+
+        Each callback runs as a task of its own, so a slow one doesn't hold back the
+        timers after it. A callback that fails only loses its event, the next refresh
+        of the fleet catches the ship up. The callbacks still running are cancelled
+        with run.
+        """
+        self._changed = asyncio.Event()
+        running = set()
+
+        def done(task: asyncio.Task) -> None:
+            running.discard(task)
+            if not task.cancelled():
+                # Retrieved, so a failure isn't logged as never retrieved.
+                task.exception()
+
+        try:
+            while True:
+                self._changed.clear()
+                when = self.next_time()
+                delay = None if when is None else max(when - time.time(), 0)
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except TimeoutError:
+                    pass
+                for event in self.pop_due():
+                    task = asyncio.create_task(callback(event))
+                    running.add(task)
+                    task.add_done_callback(done)
+        finally:
+            for task in running:
+                task.cancel()
@@ -0,0 +1,284 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from spaceterminal.constants import PATH
+
+SAMPLE = np.dtype([("time", "<f8"), ("value", "<f8")])
+ROLLUP = np.dtype(
+    [("time", "<f8"), ("mean", "<f8"), ("min", "<f8"), ("max", "<f8"), ("count", "<u4")]
+)
+
+DAY = 24 * 60 * 60
+# Samples are kept as they are for this long, then averaged into rollups.
+RAW_RETENTION = 90 * DAY
+ROLLUP_INTERVAL = 60 * 60
+ROLLUP_RETENTION = 2 * 365 * DAY
+# How far past the raw retention the oldest sample may get before compacting, so
+# the files aren't rewritten on every append.
+COMPACT_SLACK = DAY
+
+NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def read_records(path: str, dtype: np.dtype) -> np.ndarray:
+    """Maps the records of a file into memory, without reading them.
+
+    Returns:
+        A read only array of the records, which is empty if there is no file.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    count = size // dtype.itemsize
+    if not count:
+        return np.empty(0, dtype)
+    return np.memmap(path, dtype, mode="r", shape=(count,))
+
+
+def write_records(path: str, records: np.ndarray) -> None:
+    """Replaces the records of a file, so a reader never sees a partial file."""
+    temp_path = f"{path}.tmp"
+    records.tofile(temp_path)
+    os.replace(temp_path, path)
+
+
+def time_range(records: np.ndarray, start: float = None, end: float = None) -> slice:
+    """Gets the slice of records from start to end, by binary search on their time."""
+    times = records["time"]
+    first = 0 if start is None else int(np.searchsorted(times, start, "left"))
+    last = len(records) if end is None else int(np.searchsorted(times, end, "right"))
+    return slice(first, last)
+
+
+class Series:
+    """An append-only series of (time, value) samples, stored in files.
+
+    The newest samples are kept as they are, in the .raw file. Once they are older
+    than raw_retention, they are averaged into one rollup per rollup_interval, in the
+    .rollup file, which are dropped once they are older than rollup_retention.
+
+    Both files are only memory mapped, so a query only reads the part of the file
+    with the samples it needs, however long the series is.
+
+    Args:
+        path: The path of the files, without their extension.
+        raw_retention: Seconds the samples are kept as they are.
+        rollup_interval: Seconds of samples averaged into each rollup.
+        rollup_retention: Seconds the rollups are kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        raw_retention: float = RAW_RETENTION,
+        rollup_interval: float = ROLLUP_INTERVAL,
+        rollup_retention: float = ROLLUP_RETENTION,
+    ):
+        self.raw_path = f"{path}.raw"
+        self.rollup_path = f"{path}.rollup"
+        self.raw_retention = raw_retention
+        self.rollup_interval = rollup_interval
+        self.rollup_retention = rollup_retention
+        self._first_time = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(read_records(self.raw_path, SAMPLE)) + len(
+            read_records(self.rollup_path, ROLLUP)
+        )
+
+    def append(self, value: float, timestamp: float = None) -> None:
+        """Adds a sample, which should be newer than every other sample."""
+        timestamp = time.time() if timestamp is None else timestamp
+        record = np.array([(timestamp, value)], SAMPLE)
+        with self._lock:
+            with open(self.raw_path, "ab") as file:
+                file.write(record.tobytes())
+            if self._first_time is None:
+                self._first_time = float(read_records(self.raw_path, SAMPLE)[0]["time"])
+            due = self._first_time < timestamp - self.raw_retention - COMPACT_SLACK
+        if due:
+            self.compact(timestamp)
+
+    def last(self) -> tuple[float, float]:
+        """Gets the (time, value) of the newest sample, or None if there isn't one."""
+        samples = read_records(self.raw_path, SAMPLE)
+        if len(samples):
+            return float(samples[-1]["time"]), float(samples[-1]["value"])
+        rollups = read_records(self.rollup_path, ROLLUP)
+        if len(rollups):
+            return float(rollups[-1]["time"]), float(rollups[-1]["mean"])
+        return None
+
+    def read(self, start: float = None, end: float = None) -> np.ndarray:
+        """Gets the samples from start to end.
+
+        Where the samples have been rolled up, the mean of each rollup is used.
+
+        Returns:
+            An array of SAMPLE records, oldest first.
+        """
+        rollups = read_records(self.rollup_path, ROLLUP)
+        rollups = rollups[time_range(rollups, start, end)]
+        samples = read_records(self.raw_path, SAMPLE)
+        samples = samples[time_range(samples, start, end)]
+        combined = np.empty(len(rollups) + len(samples), SAMPLE)
+        combined["time"][: len(rollups)] = rollups["time"]
+        combined["value"][: len(rollups)] = rollups["mean"]
+        combined[len(rollups) :] = samples
+        return combined
+
+    def downsample(self, start: float, end: float, buckets: int) -> np.ndarray:
+        """Gets the mean of the samples in each of a number of equal time buckets.
+
+        This is what charts of the series should use, since a chart can't show more
+        points than it is wide.
+
+        Returns:
+            The mean of each bucket, NaN where a bucket has no samples.
+        """
+        samples = self.read(start, end)
+        index = ((samples["time"] - start) / (end - start) * buckets).astype(np.int64)
+        index = np.clip(index, 0, buckets - 1)
+        sums = np.bincount(index, samples["value"], minlength=buckets)
+        counts = np.bincount(index, minlength=buckets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def recent(self, seconds: float, buckets: int) -> list[float]:
+        """Gets the downsampled values of the last seconds, leaving out empty buckets.
+
+        This is the shape a Sparkline widget takes.
+        """
+        now = time.time()
+        values = self.downsample(now - seconds, now, buckets)
+        return values[~np.isnan(values)].tolist()
+
+    def compact(self, now: float = None) -> None:
+        """Rolls up the samples past the raw retention, and drops the old rollups."""
+        now = time.time() if now is None else now
+        with self._lock:
+            samples = read_records(self.raw_path, SAMPLE)
+            # The cut is on a rollup boundary, so a rollup is never split.
+            cutoff = now - self.raw_retention
+            cutoff -= cutoff % self.rollup_interval
+            cut = int(np.searchsorted(samples["time"], cutoff, "left"))
+
+            rollups = read_records(self.rollup_path, ROLLUP)
+            expired = cut > 0
+            if expired:
+                rollups = np.concatenate([rollups, self._rollup(samples[:cut])])
+            keep = int(np.searchsorted(rollups["time"], now - self.rollup_retention))
+            if expired or keep:
+                write_records(self.rollup_path, np.array(rollups[keep:]))
+            if expired:
+                rest = np.array(samples[cut:])
+                del samples
+                write_records(self.raw_path, rest)
+            self._first_time = None
+
+    def _rollup(self, samples: np.ndarray) -> np.ndarray:
+        buckets = samples["time"] - samples["time"] % self.rollup_interval
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        values = samples["value"]
+        counts = np.diff(np.r_[starts, len(samples)])
+        rollups = np.empty(len(starts), ROLLUP)
+        rollups["time"] = buckets[starts]
+        rollups["mean"] = np.add.reduceat(values, starts) / counts
+        rollups["min"] = np.minimum.reduceat(values, starts)
+        rollups["max"] = np.maximum.reduceat(values, starts)
+        rollups["count"] = counts
+        return rollups
+
+
+class TimeSeriesStore:
+    """A directory of named series, like credits or the fuel of each ship.
+
+    Args:
+        directory: The directory the series are stored in.
+        **policy: The retention policy of every series, see Series.
+    """
+
+    def __init__(self, directory: str = PATH.TIMESERIES, **policy):
+        self.directory = directory
+        self.policy = policy
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, name: str) -> Series:
+        """Gets a series by name, which is made of letters, digits, _, . and -."""
+        if not NAME.fullmatch(name):
+            raise ValueError(f"Invalid series name: {name!r}")
+        with self._lock:
+            if name not in self._series:
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, name)
+                self._series[name] = Series(path, **self.policy)
+            return self._series[name]
+
+    def names(self) -> list[str]:
+        """Gets the names of every series in the directory."""
+        try:
+            files = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(
+            {os.path.splitext(file)[0] for file in files if not file.endswith(".tmp")}
+        )
+
+    def record(
+        self, values: dict, timestamp: float = None, changed_only: bool = False
+    ) -> None:
+        """Adds a sample with the same time to each series.
+
+        Args:
+            values: The value of each series, by name.
+            timestamp: The time of the samples, defaults to now.
+            changed_only: Leaves out the values that are the same as the newest
+                sample of their series, like when a cached response is seen again.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, value in values.items():
+            series = self.series(name)
+            if changed_only:
+                last = series.last()
+                if last is not None and last[1] == value:
+                    continue
+            series.append(value, timestamp)
+
+    def compact(self, now: float = None) -> None:
+        """Applies the retention policy to every series."""
+        for name in self.names():
+            self.series(name).compact(now)
+
+
+def ship_samples(ships: list[dict]) -> dict:
+    """Gets the fuel and cargo of each ship, as samples to record.
+
+    Args:
+        ships: Ships decoded from JSON.
+    """
+    samples = {}
+    for ship in ships:
+        samples[f"ship.{ship['symbol']}.fuel"] = ship["fuel"]["current"]
+        samples[f"ship.{ship['symbol']}.cargo"] = ship["cargo"]["units"]
+    return samples
+
+
+def market_samples(market: dict) -> dict:
+    """Gets the prices of each good of a market, as samples to record.
+
+    Args:
+        market: A market decoded from JSON, with trade goods.
+    """
+    samples = {}
+    for good in market.get("tradeGoods", []):
+        name = f"market.{market['symbol']}.{good['symbol']}"
+        samples[f"{name}.purchase"] = good["purchasePrice"]
+        samples[f"{name}.sell"] = good["sellPrice"]
+    return samples
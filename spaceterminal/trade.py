@@ -0,0 +1,351 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.markets import MarketStore
+from spaceterminal.navigation import FLIGHT_MODES
+
+# Credits paid for each unit of fuel, when the markets don't sell fuel.
+DEFAULT_FUEL_PRICE = 72
+
+# The number of source markets scored at once by MarketSnapshot.rank_routes.
+BLOCK_SIZE = 512
+
+
+@dataclass(slots=True)
+class TradeRoute:
+    """Buying a full hold of a good at one market, and selling it at another."""
+
+    source: str
+    destination: str
+    good: str
+    purchase_price: int
+    sell_price: int
+    units: int
+    profit: int
+    fuel: int
+    seconds: int
+
+    @property
+    def profit_per_second(self) -> float:
+        return self.profit / self.seconds
+
+
+class MarketSnapshot:
+    """The prices of every market as arrays, so routes can be scored all at once.
+
+    Args:
+        markets: Symbols of the markets.
+        goods: Symbols of the goods.
+        purchase: The price of buying each good at each market, as a (market, good)
+            array. NaN where the market doesn't sell the good.
+        sell: The price of selling each good at each market, like purchase.
+        positions: The (system x, system y, x, y) of each market, as a (market, 4)
+            array.
+        systems: The system of each market, as an array of integers.
+        system_ids: The integer of each system symbol.
+    """
+
+    def __init__(
+        self,
+        markets: list[str],
+        goods: list[str],
+        purchase: np.ndarray,
+        sell: np.ndarray,
+        positions: np.ndarray,
+        systems: np.ndarray,
+        system_ids: dict[str, int] = None,
+    ):
+        self.markets = markets
+        self.goods = goods
+        self.purchase = purchase
+        self.sell = sell
+        self.positions = positions
+        self.systems = systems
+        self.system_ids = system_ids or {}
+        self.market_index = {market: index for index, market in enumerate(markets)}
+        # The prices of each good are kept as rows, so the markets of a good are read
+        # in one go. Buying where the market doesn't sell, or selling where it doesn't
+        # buy, makes a margin of -inf, which is never the best good.
+        self._purchase_by_good = np.ascontiguousarray(
+            np.where(np.isnan(purchase), np.inf, purchase).T
+        )
+        self._sell_by_good = np.ascontiguousarray(
+            np.where(np.isnan(sell), -np.inf, sell).T
+        )
+        # The markets of each system are kept together, see _same_system.
+        self._by_system = np.argsort(systems, kind="stable")
+        self._sorted_systems = systems[self._by_system]
+        # The best margin of each source, to any market.
+        self._best_margins = np.max(
+            self._sell_by_good.max(axis=1, initial=-np.inf)[:, np.newaxis]
+            - self._purchase_by_good,
+            axis=0,
+            initial=-np.inf,
+        )
+
+    @classmethod
+    def from_store(
+        cls, store: MarketStore, galaxy: GalaxyIndex, max_age: float = None
+    ) -> "MarketSnapshot":
+        """Creates a snapshot of the prices in the store.
+
+        Markets whose waypoint isn't in the galaxy index are left out, since the
+        distance to them isn't known.
+
+        Args:
+            store: The market store.
+            galaxy: The galaxy index, for the position of each market.
+            max_age: Only prices seen within this many seconds.
+        """
+        prices = store.prices(max_age)
+        positions = galaxy.positions({row[0] for row in prices})
+        markets = sorted(positions)
+        market_index = {market: index for index, market in enumerate(markets)}
+        goods = sorted({row[1] for row in prices})
+        good_index = {good: index for index, good in enumerate(goods)}
+
+        purchase = np.full((len(markets), len(goods)), np.nan, dtype=np.float32)
+        sell = np.full((len(markets), len(goods)), np.nan, dtype=np.float32)
+        for waypoint, good, purchase_price, sell_price, _, _ in prices:
+            if waypoint in market_index:
+                market, good = market_index[waypoint], good_index[good]
+                purchase[market, good] = purchase_price
+                sell[market, good] = sell_price
+
+        system_ids = {}
+        systems = np.array(
+            [
+                system_ids.setdefault(positions[market][0], len(system_ids))
+                for market in markets
+            ],
+            dtype=np.int32,
+        )
+        coordinates = np.array(
+            [positions[market][1:] for market in markets], dtype=np.float32
+        ).reshape(len(markets), 4)
+        return cls(markets, goods, purchase, sell, coordinates, systems, system_ids)
+
+    def distances(self, sources: np.ndarray) -> np.ndarray:
+        """Gets the distance from each source to every market.
+
+        Args:
+            sources: Indexes of the source markets.
+
+        Returns:
+            A (source, market) array of distances.
+        """
+        return self._distances(self.positions[sources], self.systems[sources])
+
+    def distances_from(self, position: tuple) -> np.ndarray:
+        """Gets the distance from a waypoint to every market.
+
+        Args:
+            position: The (system symbol, system x, system y, x, y) of the waypoint,
+                see GalaxyIndex.positions.
+        """
+        system = np.array([self.system_ids.get(position[0], -1)])
+        return self._distances(np.array([position[1:]], np.float32), system)[0]
+
+    def _distances(self, sources: np.ndarray, systems: np.ndarray) -> np.ndarray:
+        # Markets in different systems are measured between their systems. The few
+        # markets in the same system are then measured between their waypoints.
+        distances = np.hypot(
+            sources[:, 0, np.newaxis] - self.positions[:, 0],
+            sources[:, 1, np.newaxis] - self.positions[:, 1],
+        )
+        rows, columns = self._same_system(systems)
+        distances[rows, columns] = np.hypot(
+            sources[rows, 2] - self.positions[columns, 2],
+            sources[rows, 3] - self.positions[columns, 3],
+        )
+        return distances
+
+    def _same_system(self, systems: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the (row, market) pairs of the markets in each of the systems."""
+        starts = np.searchsorted(self._sorted_systems, systems, "left")
+        counts = np.searchsorted(self._sorted_systems, systems, "right") - starts
+        rows = np.repeat(np.arange(len(systems)), counts)
+        # The position of each pair within its system, then within all the markets.
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return rows, self._by_system[offsets + np.repeat(starts, counts)]
+
+    def margins(self, sources: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """Gets the profit per unit of the best good to trade between pairs of markets.
+
+        Args:
+            sources: Indexes of the source markets.
+            destinations: Indexes of the destination markets, one for each source.
+
+        Returns:
+            The profit per unit of each pair, -inf where no good can be traded.
+        """
+        margins = np.full(len(sources), -np.inf, np.float32)
+        for purchase, sell in zip(self._purchase_by_good, self._sell_by_good):
+            np.maximum(margins, sell[destinations] - purchase[sources], out=margins)
+        return margins
+
+    def best_good(self, source: int, destination: int) -> int:
+        """Gets the index of the most profitable good to trade between two markets."""
+        return int(np.nanargmax(self.sell[destination] - self.purchase[source]))
+
+    def rank_routes(
+        self,
+        cargo_capacity: int,
+        fuel_capacity: int,
+        speed: int,
+        origin: tuple = None,
+        fuel_price: float = None,
+        limit: int = 20,
+    ) -> list[TradeRoute]:
+        """Ranks the trade routes for a ship by profit per second.
+
+        Each route is a cruise from the ship to the source, if the ship is at a
+        market, and a cruise from the source to the destination. The cargo has to be
+        carried on a single tank of fuel, while the ship may refuel on its way to
+        the source. All of the fuel is paid for out of the profit.
+
+        The routes within each system are scored first, as they are the quickest.
+        The routes between systems are then scored in blocks of BLOCK_SIZE sources,
+        to limit the memory used. No route earns more per unit than the best margin of
+        its source, so the pairs too far apart to beat the best routes so far are left
+        out before their margins are worked out.
+
+        Args:
+            cargo_capacity: Units of cargo the ship can hold.
+            fuel_capacity: Fuel the ship can hold, 0 if it doesn't use fuel.
+            speed: Speed of the ship's engine.
+            origin: The position of the ship, see GalaxyIndex.positions. If None,
+                the ship is assumed to be at the source.
+            fuel_price: Credits per unit of fuel. Defaults to the average price of
+                FUEL in the markets.
+            limit: The number of routes to return.
+        """
+        if not self.markets or cargo_capacity <= 0 or limit <= 0:
+            return []
+        if fuel_price is None:
+            fuel_price = self.fuel_price()
+        if fuel_capacity <= 0:
+            fuel_price = 0
+        multiplier = np.float32(FLIGHT_MODES["CRUISE"][0] / speed)
+
+        def cruise(distance: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            fuel = np.maximum(1, np.round(distance))
+            return fuel, np.round(fuel * multiplier + 15)
+
+        # The fuel and seconds to fly from the ship to each source.
+        to_source = np.zeros(len(self.markets), np.float32)
+        to_source_seconds = np.zeros(len(self.markets), np.float32)
+        if origin is not None:
+            distance = self.distances_from(origin)
+            to_source, to_source_seconds = cruise(distance)
+            # The ship is already at the markets at its waypoint.
+            here = distance == 0
+            to_source[here] = to_source_seconds[here] = 0
+
+        candidates = []
+
+        def add_routes(sources, destinations, distances) -> float:
+            """Scores pairs of markets, keeping the best routes.
+
+            Returns:
+                The score a route needs to be one of the best routes so far.
+            """
+            fuel, seconds = cruise(distances)
+            profit = self.margins(sources, destinations) * np.float32(cargo_capacity)
+            if fuel_capacity > 0:
+                profit[fuel > fuel_capacity] = -np.inf
+            fuel += to_source[sources]
+            seconds += to_source_seconds[sources]
+            profit -= fuel * np.float32(fuel_price)
+            score = np.where(profit > 0, profit / seconds, -np.inf)
+
+            count = min(limit, int(np.count_nonzero(score > -np.inf)))
+            if count:
+                for pair in np.argpartition(-score, count - 1)[:count]:
+                    candidates.append(
+                        (
+                            float(score[pair]),
+                            int(sources[pair]),
+                            int(destinations[pair]),
+                            int(profit[pair]),
+                            int(fuel[pair]) if fuel_capacity > 0 else 0,
+                            int(seconds[pair]),
+                        )
+                    )
+                candidates.sort(key=lambda candidate: -candidate[0])
+                del candidates[limit:]
+            return candidates[-1][0] if len(candidates) == limit else 0
+
+        # The routes within a system are scored first. They are the quickest, so the
+        # best of them rule out most of the routes between systems.
+        rows, destinations = self._same_system(self.systems)
+        sources = rows[rows != destinations]
+        destinations = destinations[rows != destinations]
+        threshold = add_routes(
+            sources,
+            destinations,
+            np.hypot(
+                self.positions[sources, 2] - self.positions[destinations, 2],
+                self.positions[sources, 3] - self.positions[destinations, 3],
+            ),
+        )
+
+        for first in range(0, len(self.markets), BLOCK_SIZE):
+            sources = np.arange(first, min(first + BLOCK_SIZE, len(self.markets)))
+            # The routes within a system were already scored, so only the distances
+            # between systems are needed. They are compared squared, and only the
+            # distances of the pairs that are scored are worked out.
+            squared = self.positions[sources, 0, np.newaxis] - self.positions[:, 0]
+            squared *= squared
+            squared_y = self.positions[sources, 1, np.newaxis] - self.positions[:, 1]
+            squared_y *= squared_y
+            squared += squared_y
+            # A route beating the threshold must take less than max_seconds, even
+            # when it earns the best margin of its source. Only the pairs close enough
+            # for that are scored, with some slack for the rounding of cruise.
+            best_margins = self._best_margins[sources]
+            max_distance = np.where(best_margins > 0, np.inf, 0)
+            if threshold > 0:
+                max_seconds = (
+                    best_margins * cargo_capacity / threshold
+                    - to_source_seconds[sources]
+                )
+                max_distance = np.maximum((max_seconds - 14) / multiplier + 1, 0)
+            if fuel_capacity > 0:
+                max_distance = np.minimum(max_distance, fuel_capacity + 1)
+            close = squared < np.square(max_distance)[:, np.newaxis]
+            rows, destinations = np.nonzero(close)
+            other_system = self.systems[sources[rows]] != self.systems[destinations]
+            rows, destinations = rows[other_system], destinations[other_system]
+            threshold = add_routes(
+                sources[rows], destinations, np.sqrt(squared[rows, destinations])
+            )
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        routes = []
+        for _, source, destination, profit, fuel, seconds in candidates[:limit]:
+            good = self.best_good(source, destination)
+            routes.append(
+                TradeRoute(
+                    source=self.markets[source],
+                    destination=self.markets[destination],
+                    good=self.goods[good],
+                    purchase_price=int(self.purchase[source, good]),
+                    sell_price=int(self.sell[destination, good]),
+                    units=cargo_capacity,
+                    profit=profit,
+                    fuel=fuel,
+                    seconds=seconds,
+                )
+            )
+        return routes
+
+    def fuel_price(self) -> float:
+        """Gets the average price of fuel in the markets that sell it."""
+        if "FUEL" not in self.goods:
+            return DEFAULT_FUEL_PRICE
+        prices = self.purchase[:, self.goods.index("FUEL")]
+        prices = prices[~np.isnan(prices)]
+        return float(prices.mean()) if len(prices) else DEFAULT_FUEL_PRICE
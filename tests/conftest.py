@@ -0,0 +1,44 @@
+import pytest
+
+from spaceterminal import main
+from spaceterminal.client import BURST, PER_SECOND, SCHEDULER, TokenBucket
+from spaceterminal.constants import URL
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.markets import MarketStore
+from spaceterminal.mockserver import MockServer
+from spaceterminal.snapshots import SnapshotStore
+from spaceterminal.timeseries import TimeSeriesStore
+
+
+@pytest.fixture(autouse=True)
+def full_rate_limit():
+    """Starts each test with a full rate limit, so tests don't slow each other down."""
+    SCHEDULER.bucket = TokenBucket(PER_SECOND, BURST)
+
+
+@pytest.fixture(autouse=True)
+def app_stores(tmp_path, monkeypatch):
+    """Points the stores of the app at a temporary directory, so tests don't leave a
+    cache behind."""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(main, "GALAXY", GalaxyIndex(str(cache / "galaxy.sqlite3")))
+    monkeypatch.setattr(main, "MARKETS", MarketStore(str(cache / "markets.sqlite3")))
+    monkeypatch.setattr(main, "TIMESERIES", TimeSeriesStore(str(cache / "timeseries")))
+    monkeypatch.setattr(main, "SNAPSHOTS", SnapshotStore(str(cache / "snapshots")))
+
+
+@pytest.fixture
+def mock_server(request):
+    """Starts a mock server, and points the URL endpoints at it.
+
+    The options of the server come from the parameter of an indirectly parametrized
+    test, or else from the MOCK_SERVER dict of the test module.
+    """
+    options = getattr(request, "param", getattr(request.module, "MOCK_SERVER", {}))
+    base = URL.BASE
+    with MockServer(**options) as server:
+        URL.set_base(server.base_url)
+        try:
+            yield server
+        finally:
+            URL.set_base(base)
@@ -0,0 +1,74 @@
+import time
+
+import requests_mock
+
+from spaceterminal.cache import ResponseCache
+from spaceterminal.client import Client
+from spaceterminal.constants import URL
+
+JSON_AGENT = {"data": {"symbol": "TEST-SYMBOL", "credits": 123456}}
+
+
+def test_ttl():
+    """Tests that each endpoint gets the TTL of its longest matching path."""
+    cache = ResponseCache()
+    assert cache.ttl(URL.BASE) == 5 * 60
+    assert cache.ttl(f"{URL.BASE}/") == 5 * 60
+    assert cache.ttl(URL.AGENT) == 10
+    assert cache.ttl(f"{URL.SHIPS}/?page=2&limit=20") == 15
+    assert cache.ttl(f"{URL.BASE}/systems") == 0
+
+
+def test_cache_hit_and_miss():
+    """Tests that a fresh response is served from the cache, per access token."""
+    with requests_mock.Mocker() as m:
+        m.get(URL.AGENT, json=JSON_AGENT)
+        client = Client("token")
+        assert client.get(URL.AGENT).json() == JSON_AGENT
+        assert client.get(URL.AGENT).json() == JSON_AGENT
+        assert m.call_count == 1
+
+        client.access_token = "other-token"
+        client.get(URL.AGENT)
+        assert m.call_count == 2
+
+        stats = client.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["entries"] == 2
+
+
+def test_cache_revalidation():
+    """Tests that an expired response is revalidated with its ETag."""
+    with requests_mock.Mocker() as m:
+        m.get(URL.AGENT, json=JSON_AGENT, headers={"ETag": 'W/"1"'})
+        client = Client("token", cache=ResponseCache({"/my/agent": 0.01}))
+        first = client.get(URL.AGENT)
+        time.sleep(0.02)
+
+        m.get(URL.AGENT, status_code=304)
+        assert client.get(URL.AGENT) is first
+        assert m.last_request.headers["If-None-Match"] == 'W/"1"'
+        assert client.get(URL.AGENT) is first
+        assert m.call_count == 2
+        assert client.cache.stats()["revalidations"] == 1
+
+
+def test_cache_invalidated_by_post():
+    """Tests that a successful POST drops the cached responses of the token."""
+    with requests_mock.Mocker() as m:
+        m.get(URL.AGENT, json=JSON_AGENT)
+        m.get(URL.CONTRACTS, json={"data": []})
+        m.post(f"{URL.CONTRACTS}/contract-1/accept", json={"data": {}})
+        client = Client("token")
+        client.get(URL.AGENT)
+        client.get(URL.CONTRACTS)
+
+        client.post(f"{URL.CONTRACTS}/contract-1/accept", invalidate=(URL.CONTRACTS,))
+        client.get(URL.AGENT)
+        client.get(URL.CONTRACTS)
+        assert m.call_count == 4
+
+        client.post(f"{URL.CONTRACTS}/contract-1/accept")
+        client.get(URL.AGENT)
+        assert m.call_count == 6
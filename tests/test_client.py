@@ -1,4 +1,21 @@
-from spaceterminal.client import Client
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests_mock
+
+from spaceterminal.client import (
+    PRIORITY,
+    SCHEDULER,
+    AsyncClient,
+    Client,
+    Priority,
+    RequestScheduler,
+    priority,
+)
+from spaceterminal.constants import URL
+from spaceterminal.mockserver import MockServer
 
 
 def test_client():
@@ -17,3 +34,202 @@ def test_client():
     client.access_token = new_token
     assert client.auth.access_token == new_token
     assert client.session.auth.access_token == new_token
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Responds with empty JSON, keeping the connection open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_client_session_persists():
+    """Tests that the session is only rebuilt when the access token changes."""
+    client = Client("old-token")
+    session = client.session
+    assert client.session is session
+    assert client.session.scheduler is SCHEDULER
+
+    client.access_token = "old-token"
+    assert client.session is session
+
+    client.access_token = "new-token"
+    assert client.session is not session
+    assert client.session.scheduler is SCHEDULER
+
+
+def test_client_connections_reused():
+    """Tests that requests reuse the pooled connection instead of opening new ones."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        client = Client("token")
+        for _ in range(3):
+            assert client.session.get(url).status_code == 200
+        assert client.connections_opened == 1
+        assert client.connections_reused == 2
+
+        # The counts are kept when the session is rebuilt for a new token.
+        client.access_token = "new-token"
+        client.session.get(url)
+        assert client.connections_opened == 2
+        assert client.connections_reused == 2
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_client():
+    """Tests that the async client uses the auth of the wrapped client."""
+    client = Client("old-token")
+    async_client = AsyncClient(client)
+
+    with requests_mock.Mocker() as m:
+        m.get(URL.AGENT, json={"data": {}})
+        response = asyncio.run(async_client.get(URL.AGENT))
+        assert response.json() == {"data": {}}
+        assert m.last_request.headers["Authorization"] == "Bearer old-token"
+
+        client.access_token = "new-token"
+        asyncio.run(async_client.get(URL.AGENT))
+        assert m.last_request.headers["Authorization"] == "Bearer new-token"
+
+
+def test_async_client_iterate():
+    """Tests that a blocking iterator can be consumed asynchronously, and stopped."""
+
+    def numbers():
+        yield from range(5)
+
+    async def consume(stop_at=None):
+        items = []
+        async for item in AsyncClient(Client()).iterate(numbers()):
+            items.append(item)
+            if item == stop_at:
+                break
+        return items
+
+    assert asyncio.run(consume()) == [0, 1, 2, 3, 4]
+    assert asyncio.run(consume(stop_at=1)) == [0, 1]
+
+
+def test_scheduler_priority():
+    """Tests that queued user requests are sent before background requests."""
+    scheduler = RequestScheduler(per_second=20, burst=1)
+    scheduler.acquire()
+    order = []
+
+    def request(level, name):
+        scheduler.acquire(level)
+        order.append(name)
+
+    threads = [
+        threading.Thread(target=request, args=(Priority.BACKGROUND, "background"))
+    ]
+    threads[0].start()
+    while not scheduler.stats()["queue_depth"]:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=request, args=(Priority.USER, "user")))
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["user", "background"]
+    stats = scheduler.stats()
+    assert stats["requests"] == 3
+    assert stats["max_queue_depth"] == 2
+    assert stats["wait_max"] > 0
+
+
+def test_scheduler_adapts_to_headers():
+    """Tests that the token bucket follows the rate limit headers."""
+    scheduler = RequestScheduler(per_second=2, burst=10)
+    with requests_mock.Mocker() as m:
+        m.get(
+            URL.AGENT,
+            json={"data": {}},
+            headers={
+                "x-ratelimit-limit-per-second": "5",
+                "x-ratelimit-limit-burst": "30",
+                "x-ratelimit-remaining": "0",
+            },
+        )
+        Client("token", scheduler=scheduler).session.get(URL.AGENT)
+    assert scheduler.bucket.per_second == 5
+    assert scheduler.bucket.burst == 30
+    assert scheduler.bucket.wait_time() > 0
+
+
+def test_scheduler_retries_rate_limited():
+    """Tests that a 429 is retried after Retry-After, instead of failing."""
+    scheduler = RequestScheduler(per_second=100, burst=100, backoff=0.01)
+    with requests_mock.Mocker() as m:
+        m.get(
+            URL.AGENT,
+            [
+                {"status_code": 429, "headers": {"Retry-After": "0.05"}},
+                {"status_code": 502},
+                {"json": {"data": {}}},
+            ],
+        )
+        response = Client("token", scheduler=scheduler).session.get(URL.AGENT)
+    assert response.status_code == 200
+    assert m.call_count == 3
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 2
+
+
+def test_scheduler_does_not_retry_bad_gateway_post():
+    """Tests that a POST failing with a 502 isn't sent again, as the server may have
+    handled it, while a 429 is still retried."""
+    scheduler = RequestScheduler(per_second=100, burst=100, backoff=0.01)
+    with requests_mock.Mocker() as m:
+        m.post(
+            URL.AGENT,
+            [
+                {"status_code": 429, "headers": {"Retry-After": "0.01"}},
+                {"status_code": 502},
+                {"json": {"data": {}}},
+            ],
+        )
+        response = Client("token", scheduler=scheduler).session.post(URL.AGENT)
+    assert response.status_code == 502
+    assert m.call_count == 2
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_scheduler_backs_off_mock_server():
+    """Tests that the rate limit of the mock server is never exceeded."""
+    scheduler = RequestScheduler(per_second=100, burst=100, backoff=0.01)
+    with MockServer(per_second=5, burst=1) as server:
+        client = Client("mock-token", scheduler=scheduler)
+        responses = [client.session.get(f"{server.base_url}/") for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    # The bucket adapted to the limit of the server.
+    assert scheduler.stats()["per_second"] == 5
+
+
+def test_priority_context():
+    """Tests that the priority context is kept by AsyncClient calls."""
+
+    async def get_priority():
+        with priority(Priority.BACKGROUND):
+            return await AsyncClient(Client()).run(PRIORITY.get)
+
+    assert asyncio.run(get_priority()) == Priority.BACKGROUND
+    assert PRIORITY.get() == Priority.USER
@@ -0,0 +1,134 @@
+import pytest
+import requests
+from textual.widgets import Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal import space as s
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.contracts import (
+    ACCEPT,
+    DELIVER,
+    FULFILL,
+    ContractAction,
+    MyContracts,
+    contract_node,
+)
+
+MOCK_SERVER = {"ships": 5, "contracts": 3}
+
+
+@pytest.fixture
+def contracts(mock_server):
+    scheduler = RequestScheduler(per_second=1000, burst=1000)
+    contracts = MyContracts(Client("mock-token", scheduler=scheduler))
+    contracts.load(
+        contract
+        for page in s.get_my_contracts_pages(contracts.client)
+        for contract in page["data"]
+    )
+    return contracts
+
+
+def test_accept_batch(contracts, mock_server):
+    """Tests that contracts are accepted straight away, and then as the server has
+    them, with a failed action put back."""
+    first, second, third = contracts.values()
+    mock_server.state.contracts[third["id"]]["accepted"] = True
+
+    actions = [ContractAction(ACCEPT, c["id"]) for c in (first, second, third)]
+    previous = contracts.apply(actions)
+    assert all(contracts[c["id"]]["accepted"] for c in (first, second, third))
+    # The contracts shown in a tree aren't changed.
+    assert not first["accepted"] and not third["accepted"]
+
+    requests = mock_server.requests
+    results = contracts.send(actions, previous)
+    assert mock_server.requests == requests + 3
+    assert [("error" in result) for result in results] == [False, False, True]
+    assert contracts[first["id"]]["accepted"] and contracts[second["id"]]["accepted"]
+    assert contracts[third["id"]] is third
+    credits = 100000 + sum(c["terms"]["payment"]["onAccepted"] for c in (first, second))
+    assert mock_server.state.agent["credits"] == credits
+
+
+def test_accept_batch_fails(contracts, mock_server):
+    """Tests that the contracts are put back when the server drops the batch."""
+    first, second = contracts.values()[:2]
+
+    def dropped(query, payload, contract_id):
+        raise ConnectionResetError("The connection was dropped.")
+
+    mock_server.routes.insert(
+        0, ("POST", r"/my/contracts/(?P<contract_id>[^/]+)/accept", dropped, True)
+    )
+    actions = [ContractAction(ACCEPT, c["id"]) for c in (first, second)]
+    previous = contracts.apply(actions)
+    with pytest.raises(requests.RequestException):
+        contracts.send(actions, previous)
+    assert contracts[first["id"]] is first and contracts[second["id"]] is second
+    assert not first["accepted"] and not second["accepted"]
+
+
+def test_models(contracts):
+    """Tests that a contract is decoded once, and again after an action changed it."""
+    contract_id = contracts.values()[0]["id"]
+    model = contracts.model(contract_id)
+    assert contracts.model(contract_id) is model
+    assert ContractAction(ACCEPT, contract_id).allowed(model)
+    assert not ContractAction(FULFILL, contract_id).allowed(model)
+
+    contracts.accept([contract_id])
+    model = contracts.model(contract_id)
+    assert model.accepted
+    assert not ContractAction(ACCEPT, contract_id).allowed(model)
+    # The goods haven't been delivered yet.
+    assert not ContractAction(FULFILL, contract_id).allowed(model)
+    assert ContractAction(DELIVER, contract_id).allowed(model)
+
+
+def test_deliver_and_fulfill(contracts, mock_server):
+    """Tests that the actions on one contract are sent in order, and the rest are
+    skipped once one fails."""
+    contract = contracts.values()[0]
+    good = contract["terms"]["deliver"][0]
+    ship = next(iter(mock_server.state.ships.values()))
+    ship["cargo"] = {
+        "capacity": 1000,
+        "units": good["unitsRequired"],
+        "inventory": [{"symbol": good["tradeSymbol"], "units": good["unitsRequired"]}],
+    }
+    delivery = (contract["id"], ship["symbol"], good["tradeSymbol"])
+    half = good["unitsRequired"] // 2
+
+    contracts.accept([contract["id"]])
+    results = contracts.deliver(
+        [(*delivery, half), (*delivery, good["unitsRequired"] - half)]
+    )
+    assert all("data" in result for result in results)
+    assert contracts[contract["id"]]["terms"]["deliver"][0]["unitsFulfilled"] == (
+        good["unitsRequired"]
+    )
+    assert not ship["cargo"]["inventory"]
+
+    results = contracts.run(
+        [
+            ContractAction("deliver", *delivery, 1),
+            ContractAction("fulfill", contract["id"]),
+        ]
+    )
+    assert "error" in results[0] and results[1] is None
+    assert not contracts[contract["id"]]["fulfilled"]
+    assert "data" in contracts.fulfill([contract["id"]])[0]
+    assert contracts[contract["id"]]["fulfilled"]
+
+
+def test_contract_node():
+    contracts = [{"id": "a", "terms": {"deliver": [{"tradeSymbol": "IRON"}]}}]
+    node = Tree("Root").root.add("")
+    jt.add_json(node, contracts, "Contracts")
+
+    contract = node.children[0]
+    good = jt.reveal(node, (0, "terms", "deliver", 0, "tradeSymbol"))
+    assert contract_node(good) is contract
+    assert contract_node(contract) is contract
+    assert contract_node(node) is None
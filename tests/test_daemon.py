@@ -0,0 +1,144 @@
+import asyncio
+import datetime
+
+import pytest
+import requests
+
+from spaceterminal import daemon as d
+from spaceterminal import synthetic, timers
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.markets import MarketStore
+from spaceterminal.timeseries import TimeSeriesStore
+
+MOCK_SERVER = {"ships": 12, "systems": 5}
+
+
+@pytest.fixture
+def fleet(tmp_path, mock_server):
+    scheduler = RequestScheduler(per_second=1000, burst=1000)
+    fleet = d.FleetDaemon(
+        Client("mock-token", scheduler=scheduler),
+        markets=MarketStore(str(tmp_path / "markets.sqlite3")),
+        timeseries=TimeSeriesStore(str(tmp_path / "timeseries")),
+    )
+    yield fleet
+    fleet.markets.close()
+
+
+async def run_until(fleet: d.FleetDaemon, done, timeout: float = 10) -> None:
+    """Runs the daemon until done returns True."""
+    task = asyncio.create_task(fleet.run())
+    try:
+        async with asyncio.timeout(timeout):
+            while not done():
+                await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_daemon_runs_every_ship(fleet, mock_server):
+    """Tests that every ship runs its behavior, and records the markets it is at."""
+
+    def every_ship_ran() -> bool:
+        return len(fleet.status) == 12 and all(
+            status.runs for status in fleet.status.values()
+        )
+
+    asyncio.run(run_until(fleet, every_ship_ran))
+
+    assert all(status.error is None for status in fleet.status.values())
+    assert "agent.AGENT.credits" in fleet.timeseries.names()
+    assert "ship.AGENT-1.fuel" in fleet.timeseries.names()
+    docked = {
+        ship.nav.waypoint_symbol
+        for ship in fleet.ships.values()
+        if ship.nav.status != "IN_TRANSIT"
+    }
+    markets = {market for market, *_ in fleet.markets.prices()}
+    assert markets <= docked
+
+
+def test_daemon_isolates_failures(fleet, monkeypatch):
+    """Tests that a failing behavior is recorded on its ship and doesn't stop others."""
+
+    async def broken(daemon: d.FleetDaemon, ship) -> float:
+        if ship.symbol == "AGENT-1":
+            raise RuntimeError("broken")
+        return 60
+
+    monkeypatch.setitem(d.BEHAVIORS, "broken", broken)
+    fleet.behavior = "broken"
+    asyncio.run(
+        run_until(
+            fleet,
+            lambda: fleet.status
+            and all(status.runs for status in fleet.status.values()),
+        )
+    )
+    assert fleet.status["AGENT-1"].state == "error"
+    assert "broken" in fleet.status["AGENT-1"].error
+    assert fleet.status["AGENT-2"].state == "waiting"
+
+
+def test_daemon_survives_refresh_errors(fleet, monkeypatch):
+    """Tests that a refresh that can't reach the server is recorded and counted,
+    instead of stopping the daemon."""
+    errors = d.REFRESH_ERRORS.total()
+
+    def unreachable(agent):
+        raise requests.ConnectionError("unreachable")
+
+    monkeypatch.setattr(type(fleet.agent), "get_agent_response", unreachable)
+    fleet.interval = 0.01
+    asyncio.run(run_until(fleet, lambda: d.REFRESH_ERRORS.total() >= errors + 2))
+    assert fleet.error == {"message": "ConnectionError: unreachable"}
+    assert not fleet.ships
+
+
+def test_state_server(fleet):
+    """Tests that the state of the daemon is served as JSON."""
+    asyncio.run(fleet.refresh())
+    server = d.StateServer(fleet, port=0)
+    url = server.start()
+    try:
+        state = requests.get(url).json()
+    finally:
+        server.stop()
+    assert state["agent"]["symbol"] == "AGENT"
+    assert len(state["ships"]) == 12
+    assert state["ships"][0]["state"] == "starting"
+    assert state["scheduler"]["requests"] > 0
+
+
+def test_metrics_server(fleet):
+    """Tests that the metrics of the daemon are served in the Prometheus format."""
+    asyncio.run(fleet.refresh())
+    server = d.StateServer(fleet, port=0)
+    server.start()
+    try:
+        response = requests.get(server.url.replace("/state", "/metrics"))
+    finally:
+        server.stop()
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert "# TYPE spaceterminal_request_seconds histogram" in response.text
+    assert 'spaceterminal_fleet_ships{state="starting"} 12' in response.text
+    assert 'method="GET",endpoint="/my/ships",le="+Inf"' in response.text
+
+
+def test_daemon_wakes_ship_on_arrival(fleet, mock_server, monkeypatch):
+    """Tests that a ship is refreshed and run again when it arrives, without waiting
+    for the next fleet refresh."""
+    monkeypatch.setattr(timers, "GRACE", 0)
+    ship = mock_server.state.ships["AGENT-1"]
+    ship["nav"]["status"] = "IN_TRANSIT"
+    ship["nav"]["route"]["arrival"] = synthetic.format_time(
+        datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=0.3)
+    )
+
+    def ran_again() -> bool:
+        status = fleet.status.get("AGENT-1")
+        return status is not None and status.runs >= 2
+
+    asyncio.run(run_until(fleet, ran_again))
+    assert fleet.ships["AGENT-1"].nav.status == "IN_ORBIT"
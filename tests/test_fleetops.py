@@ -0,0 +1,156 @@
+import datetime
+import threading
+
+import pytest
+
+from spaceterminal import fleetops
+from spaceterminal import space as s
+from spaceterminal import synthetic
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.fleetops import (
+    DOCK,
+    ORBIT,
+    REFUEL,
+    SELL,
+    FleetOperations,
+    ShipOperation,
+)
+from spaceterminal.models import Ship
+
+MOCK_SERVER = {"ships": 4}
+
+
+@pytest.fixture
+def fleet(mock_server):
+    scheduler = RequestScheduler(per_second=1000, burst=1000)
+    return FleetOperations(Client("mock-token", scheduler=scheduler))
+
+
+def test_run_batch():
+    """Tests that items with the same key are sent in order, items with different keys
+    at the same time, and the rest of a key is skipped after an error."""
+    items = [("a", 1), ("b", 1), ("a", 2), ("b", 2), ("a", 3)]
+    sent = []
+    started = threading.Barrier(2, timeout=5)
+
+    def send(item):
+        key, number = item
+        if number == 1:
+            # Both keys must be sending at the same time to get past the barrier.
+            started.wait()
+        sent.append(item)
+        if item == ("b", 1):
+            return {"error": {"message": "Failed", "code": 1}}
+        return {"data": item}
+
+    results = dict(s.run_batch(items, lambda item: item[0], send, max_workers=2))
+    assert [item for item in sent if item[0] == "a"] == [("a", 1), ("a", 2), ("a", 3)]
+    assert ("b", 2) not in sent
+    assert "error" in results[1] and results[3] is None
+    assert [results[index]["data"] for index in (0, 2, 4)] == [
+        ("a", 1),
+        ("a", 2),
+        ("a", 3),
+    ]
+
+
+def test_run_batch_streams_results():
+    """Tests that a result is yielded while the other keys are still sending."""
+    release = threading.Event()
+
+    def send(item):
+        if item == "slow":
+            release.wait(5)
+        return {"data": item}
+
+    batch = s.run_batch(["slow", "fast"], lambda item: item, send)
+    assert next(batch) == (1, {"data": "fast"})
+    release.set()
+    assert next(batch) == (0, {"data": "slow"})
+
+
+def test_plan():
+    ship = Ship.from_json(synthetic.make_ship(0, "AGENT"))
+    ship.nav.status = "IN_ORBIT"
+    ship.fuel.current, ship.fuel.capacity = 10, 100
+
+    assert [o.action for o in fleetops.plan(REFUEL, [ship])] == [DOCK, REFUEL]
+    assert [o.action for o in fleetops.plan(DOCK, [ship])] == [DOCK]
+    ship.nav.status = "DOCKED"
+    ship.fuel.current = 100
+    assert fleetops.plan(REFUEL, [ship]) == []
+    sells = fleetops.plan(SELL, [ship])
+    assert [o.payload["symbol"] for o in sells] == [
+        item.symbol for item in ship.cargo.inventory
+    ]
+    with pytest.raises(ValueError):
+        fleetops.plan("jump", [ship])
+
+
+def test_plan_orbit_and_dock():
+    """Tests that only the ships that aren't in orbit or docked already, and aren't
+    in transit, are sent to orbit or dock."""
+    ships = [Ship.from_json(synthetic.make_ship(index, "AGENT")) for index in range(3)]
+    for ship, status in zip(ships, ("DOCKED", "IN_ORBIT", "IN_TRANSIT")):
+        ship.nav.status = status
+
+    assert [o.ship_symbol for o in fleetops.plan(ORBIT, ships)] == ["AGENT-1"]
+    assert [o.ship_symbol for o in fleetops.plan(DOCK, ships)] == ["AGENT-2"]
+
+
+def test_sell_cargo(fleet, mock_server):
+    """Tests that each ship is docked before its cargo is sold, and a ship in transit
+    fails without its sales being sent."""
+    docked, moving = list(mock_server.state.ships.values())[:2]
+    for ship in (docked, moving):
+        ship["cargo"] = {
+            "capacity": 100,
+            "units": 30,
+            "inventory": [
+                {"symbol": "IRON_ORE", "name": "Iron Ore", "units": 10},
+                {"symbol": "COPPER_ORE", "name": "Copper Ore", "units": 20},
+            ],
+        }
+    docked["nav"]["status"] = "IN_ORBIT"
+    moving["nav"]["status"] = "IN_TRANSIT"
+    arrival = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+    moving["nav"]["route"]["arrival"] = synthetic.format_time(arrival)
+
+    ships = [Ship.from_json(ship) for ship in (docked, moving)]
+    operations = fleetops.plan(SELL, ships)
+    assert len(operations) == 6
+
+    requests = mock_server.requests
+    results = list(fleet.run(operations))
+    assert mock_server.requests == requests + 4
+    by_ship = {}
+    for operation, result in results:
+        by_ship.setdefault(operation.ship_symbol, []).append((operation, result))
+
+    assert [o.action for o, _ in by_ship[docked["symbol"]]] == [DOCK, SELL, SELL]
+    assert all("data" in result for _, result in by_ship[docked["symbol"]])
+    assert not docked["cargo"]["inventory"]
+    credits = 100000 + 10 * synthetic.base_price("IRON_ORE")
+    credits += 20 * synthetic.base_price("COPPER_ORE")
+    assert mock_server.state.agent["credits"] == credits
+
+    (_, error), *skipped = by_ship[moving["symbol"]]
+    assert error["error"]["code"] == 4214
+    assert [result for _, result in skipped] == [None, None]
+    assert len(moving["cargo"]["inventory"]) == 2
+
+
+def test_refuel(fleet, mock_server):
+    ship = next(iter(mock_server.state.ships.values()))
+    ship["nav"]["status"] = "DOCKED"
+    ship["fuel"] = {"current": 150, "capacity": 400}
+
+    operation = ShipOperation(REFUEL, ship["symbol"])
+    [(_, result)] = fleet.run([operation])
+    assert result["data"]["fuel"]["current"] == 400
+    assert result["data"]["transaction"]["totalPrice"] == 3 * 72
+    assert fleetops.describe(operation, result) == "250 FUEL, -216 credits"
+
+    merged = fleetops.merge_result({"symbol": ship["symbol"]}, result)
+    assert merged["fuel"] == ship["fuel"]
+    assert "agent" not in merged
@@ -0,0 +1,65 @@
+import dataclasses
+
+import pytest
+
+from spaceterminal.fleetview import FleetView
+from spaceterminal.models import Ship
+from spaceterminal.synthetic import make_fleet
+
+
+@pytest.fixture
+def fleet():
+    fleet = FleetView()
+    fleet.update(Ship.from_json(ship) for ship in make_fleet(20))
+    return fleet
+
+
+def test_update_only_reports_changes(fleet):
+    ship = fleet.ships["AGENT-1"]
+    assert fleet.update([ship]) == []
+
+    fuel = dataclasses.replace(ship.fuel, current=ship.fuel.current - 1)
+    assert fleet.update([dataclasses.replace(ship, fuel=fuel)]) == ["AGENT-1"]
+    assert fleet.cells["AGENT-1"][4] == f"{fuel.current}/{fuel.capacity}"
+
+    removed = fleet.keep(["AGENT-1", "AGENT-2"])
+    assert len(removed) == 18 and "AGENT-1" not in removed
+    assert sorted(fleet.ships) == ["AGENT-1", "AGENT-2"]
+    assert not fleet.matches(removed[0])
+
+
+def test_filter(fleet):
+    fleet.set_filter("docked")
+    docked = fleet.visible()
+    assert docked
+    assert all(fleet.ships[symbol].nav.status == "DOCKED" for symbol in docked)
+
+    # Every word has to match, in any of the cells.
+    ship = fleet.ships[docked[0]]
+    fleet.set_filter(f"{ship.nav.waypoint_symbol.lower()} Docked")
+    assert ship.symbol in fleet.visible()
+    assert set(fleet.visible()) <= set(docked)
+
+    fleet.set_filter("")
+    assert len(fleet.visible()) == 20
+
+
+def test_sort(fleet):
+    symbols = fleet.visible()
+    # Ships are numbered in hex.
+    assert symbols[:2] == ["AGENT-1", "AGENT-2"]
+    assert symbols.index("AGENT-F") < symbols.index("AGENT-10")
+
+    fleet.sort_by("fuel")
+    fuel = [fleet.ships[symbol].fuel for symbol in fleet.visible()]
+    ratios = [f.current / f.capacity if f.capacity else 1.0 for f in fuel]
+    assert ratios == sorted(ratios)
+
+    fleet.sort_by("fuel")
+    assert fleet.reverse
+    assert fleet.visible()[0] == max(
+        fleet.ships, key=lambda symbol: fleet.sort_key(symbol)
+    )
+
+    with pytest.raises(ValueError):
+        fleet.sort_by("speed")
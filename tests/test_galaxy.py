@@ -0,0 +1,116 @@
+import pytest
+
+from spaceterminal import space, synthetic
+from spaceterminal.client import Client
+from spaceterminal.galaxy import GalaxyIndex
+
+MOCK_SERVER = {"systems": 30}
+
+
+@pytest.fixture
+def galaxy(tmp_path):
+    index = GalaxyIndex(str(tmp_path / "galaxy.sqlite3"))
+    yield index
+    index.close()
+
+
+def test_import_systems(galaxy):
+    """Tests that systems and their waypoints can be queried after an import."""
+    systems = synthetic.make_galaxy(10, waypoints=5)
+    assert galaxy.import_systems(systems, "2024-01-01") == 10
+    assert galaxy.is_current("2024-01-01")
+    assert not galaxy.is_current("2024-01-15")
+
+    system = galaxy.system("X1-S3")
+    assert system.x == systems[2]["x"] and system.y == systems[2]["y"]
+    assert galaxy.system("X1-MISSING") is None
+    assert len(galaxy.waypoints("X1-S3")) == 5
+    assert galaxy.stats() == {
+        "systems": 10,
+        "systems_with_traits": 0,
+        "waypoints": 50,
+    }
+
+    # Importing again replaces the index.
+    galaxy.import_systems(systems[:2], "2024-01-15")
+    assert galaxy.stats()["systems"] == 2
+    assert galaxy.reset_date == "2024-01-15"
+
+
+def test_query_waypoints(galaxy):
+    """Tests the type and trait filters once the waypoints of a system are imported."""
+    systems = synthetic.make_galaxy(3, waypoints=10)
+    galaxy.import_systems(systems, "2024-01-01")
+    assert not galaxy.has_waypoints("X1-S1")
+    galaxy.import_waypoints("X1-S1", systems[0]["waypoints"])
+    assert galaxy.has_waypoints("X1-S1")
+
+    waypoints = systems[0]["waypoints"]
+    markets = [
+        w["symbol"]
+        for w in waypoints
+        if "MARKETPLACE" in [trait["symbol"] for trait in w["traits"]]
+    ]
+    found = galaxy.waypoints("X1-S1", trait="MARKETPLACE")
+    assert [w.symbol for w in found] == sorted(markets)
+    assert all("MARKETPLACE" in w.traits for w in found)
+
+    kind = waypoints[0]["type"]
+    expected = sorted(
+        w["symbol"]
+        for system in systems
+        for w in system["waypoints"]
+        if w["type"] == kind
+    )
+    assert [w.symbol for w in galaxy.waypoints(type=kind)] == expected
+
+    waypoint = galaxy.waypoint(waypoints[0]["symbol"])
+    assert waypoint.faction_symbol == "COSMIC"
+    assert waypoint.system_symbol == "X1-S1"
+
+
+def test_systems_near(galaxy):
+    """Tests that only the systems in range are found, nearest first."""
+    systems = [
+        {"symbol": "A", "sectorSymbol": "X1", "type": "RED_STAR", "x": 0, "y": 0},
+        {"symbol": "B", "sectorSymbol": "X1", "type": "RED_STAR", "x": 3, "y": 4},
+        {"symbol": "C", "sectorSymbol": "X1", "type": "RED_STAR", "x": 1, "y": 1},
+        {"symbol": "D", "sectorSymbol": "X1", "type": "RED_STAR", "x": 4, "y": 4},
+    ]
+    galaxy.import_systems(systems, "2024-01-01")
+    assert [system.symbol for system in galaxy.systems_near(0, 0, 5)] == [
+        "A",
+        "C",
+        "B",
+    ]
+
+
+def test_update_galaxy(galaxy, mock_server):
+    """Tests that the galaxy is only imported once per reset date."""
+    client = Client("mock-token")
+    assert space.update_galaxy(client, galaxy, "2024-01-01") is None
+    assert galaxy.stats()["systems"] == 30
+    requests = mock_server.requests
+
+    assert space.update_galaxy(client, galaxy, "2024-01-01") is None
+    assert mock_server.requests == requests
+
+    assert space.update_system_waypoints(client, galaxy, "X1-S2") is None
+    assert galaxy.has_waypoints("X1-S2")
+    requests = mock_server.requests
+    assert space.update_system_waypoints(client, galaxy, "X1-S2") is None
+    assert mock_server.requests == requests
+
+    error = space.update_system_waypoints(client, galaxy, "X1-MISSING")
+    assert error["error"]["code"] == 404
+
+
+def test_update_galaxy_pages(galaxy, mock_server):
+    """Tests that the systems are paginated when the bulk endpoint is unavailable."""
+    mock_server.routes = [
+        route
+        for route in mock_server.routes
+        if route[2] != mock_server.get_systems_json
+    ]
+    assert space.update_galaxy(Client("mock-token"), galaxy, "2024-01-01") is None
+    assert galaxy.stats()["systems"] == 30
@@ -0,0 +1,156 @@
+from textual.widgets import Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal.synthetic import make_fleet
+
+
+def labels(node) -> list:
+    return [str(child.label) for child in node.children]
+
+
+def test_add_json_lazy():
+    """Tests that only the ship nodes are added until a ship is expanded."""
+    ships = make_fleet(3)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships, lazy=True)
+
+    assert str(node.label) == "[] Ships"
+    assert labels(node) == [f"{{}} {ship['symbol']}" for ship in ships]
+    ship_node = node.children[0]
+    assert not ship_node.children
+    assert ship_node.allow_expand
+
+    jt.load_children(ship_node)
+    assert len(ship_node.children) == len(ships[0])
+    assert str(ship_node.children[0].label) == f"symbol='{ships[0]['symbol']}'"
+
+    # Loading again does not add the children twice.
+    jt.load_children(ship_node)
+    assert len(ship_node.children) == len(ships[0])
+
+
+def test_add_json_lazy_matches_eager():
+    """Tests that fully loading a lazy tree gives the same tree as an eager build."""
+    ships = make_fleet(2)
+    eager = Tree("Root").root.add("")
+    lazy = Tree("Root").root.add("")
+    jt.add_json(eager, ships)
+    jt.add_json(lazy, ships, lazy=True)
+    jt.load_all(lazy)
+    assert flatten(lazy) == flatten(eager)
+
+
+def test_add_json_items():
+    """Tests that another page of items is added to an existing node."""
+    ships = make_fleet(4)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships[:2], lazy=True)
+    jt.add_json_items(node, ships[2:], len(node.children), lazy=True)
+    assert labels(node) == [f"{{}} {ship['symbol']}" for ship in ships]
+    assert node.data == ships
+
+
+def flatten(node) -> list:
+    """Gets the labels of a node and all of its offspring."""
+    return [str(node.label)] + [
+        label for child in node.children for label in flatten(child)
+    ]
+
+
+def test_update_json_unchanged():
+    """Tests that updating with the same data doesn't touch any nodes."""
+    ships = make_fleet(3)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships)
+    assert jt.update_json(node, make_fleet(3)) == 0
+
+
+def test_update_json_changed_value():
+    """Tests that only the changed label is updated, keeping the nodes expanded."""
+    ships = make_fleet(3)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships, lazy=True)
+    ship_node = node.children[1]
+    jt.load_all(ship_node)
+    ship_node.expand_all()
+    fuel_node = [c for c in ship_node.children if str(c.label) == "{} fuel"][0]
+
+    new_ships = make_fleet(3)
+    new_ships[1]["fuel"]["current"] += 1
+    assert jt.update_json(node, new_ships, lazy=True) == 1
+    assert node.children[1] is ship_node
+    assert ship_node.is_expanded
+    assert fuel_node.children[0].label.plain == (
+        f"current={new_ships[1]['fuel']['current']}"
+    )
+
+
+def test_update_json_added_and_removed():
+    """Tests that ships are matched by symbol when others are added or removed."""
+    ships = make_fleet(4)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships, lazy=True)
+    kept = node.children[2]
+
+    new_ships = [ships[0], ships[2], ships[3]] + make_fleet(6)[4:]
+    assert jt.update_json(node, new_ships, lazy=True) == 3
+    assert node.children[1] is kept
+    assert labels(node) == [f"{{}} {ship['symbol']}" for ship in new_ships]
+
+
+def test_update_json_matches_add_json():
+    """Tests that an updated tree is the same as a tree built from the new data."""
+    ships = make_fleet(5)
+    new_ships = list(reversed(make_fleet(5, seed=1)))
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships)
+    jt.update_json(node, new_ships)
+
+    expected = Tree("Root").root.add("")
+    jt.add_json(expected, new_ships)
+    assert flatten(node) == flatten(expected)
+
+
+def test_reveal():
+    """Tests that only the nodes on the way to a value are loaded and expanded."""
+    ships = make_fleet(3)
+    node = Tree("Root").root.add("")
+    jt.add_json(node, ships, lazy=True)
+
+    target = jt.reveal(node, (1, "nav", "route", "destination", "symbol"))
+    assert target.data == ships[1]["nav"]["route"]["destination"]["symbol"]
+    assert node.children[1].is_expanded
+    assert not node.children[0].children and not node.children[2].children
+    cargo = next(
+        child for child in node.children[1].children if child.data is ships[1]["cargo"]
+    )
+    assert not cargo.children and not cargo.is_expanded
+
+
+def nested(depth: int, end: int) -> dict:
+    data = value = {}
+    for _ in range(depth):
+        value["next"] = value = {}
+    value["end"] = end
+    return data
+
+
+def test_add_json_deep():
+    """Tests that data deeper than the recursion limit can be added and updated."""
+    root = Tree("Root").root.add("")
+    jt.add_json(root, nested(5000, 1))
+    assert jt.update_json(root, nested(5000, 2)) == 1
+
+    node = root
+    for _ in range(5001):
+        node = node.children[0]
+    assert str(node.label) == "end=2"
+
+
+def test_value_labels_cached():
+    jt.value_label.cache_clear()
+    ships = make_fleet(20)
+    jt.add_json(Tree("Root").root.add(""), ships)
+    info = jt.value_label.cache_info()
+    assert info.hits > info.misses
+    assert jt.value_label("a", 1) is not jt.value_label("a", True)
@@ -0,0 +1,226 @@
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+import requests
+import requests_mock
+from textual.widgets import Button, Input, TabbedContent, Tree
+
+from spaceterminal import main, synthetic
+from spaceterminal.constants import URL
+from spaceterminal.snapshots import SnapshotStore
+from spaceterminal.timers import ARRIVAL, ShipEvent
+
+# Time allowed from launching the app to the first frame being drawn.
+STARTUP_BUDGET = 2.0
+
+
+def test_import_without_network():
+    """Tests that importing the app does not make any requests."""
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.ConnectionError,
+        )
+        importlib.reload(main)
+        assert m.call_count == 0
+
+
+def test_startup_time_to_first_frame():
+    """Tests that the app draws its first frame quickly, even while offline."""
+
+    async def time_to_first_frame() -> float:
+        start = time.perf_counter()
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            elapsed = time.perf_counter() - start
+            await pilot.pause()
+        return elapsed
+
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.ConnectionError,
+        )
+        elapsed = asyncio.run(time_to_first_frame())
+        assert not any(r.url.startswith(URL.FACTIONS) for r in m.request_history)
+
+    assert elapsed < STARTUP_BUDGET
+
+
+@pytest.mark.parametrize("mock_server", [{"ships": 25, "systems": 5}], indirect=True)
+def test_warm_up_after_login(mock_server, monkeypatch):
+    """Tests that logging in builds the trees of the hidden tabs, so switching to them
+    only needs the cache."""
+    monkeypatch.setattr(main.CLIENT, "access_token", main.CLIENT.access_token)
+
+    async def running(app, group: str) -> bool:
+        await asyncio.sleep(0.01)
+        return any(w.group == group and w.is_running for w in app.workers)
+
+    async def log_in() -> None:
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.query_one("#input-access-token", Input).value = "mock-token"
+            app.query_one("#button-login", Button).press()
+            await pilot.pause()
+            while await running(app, "warm-up"):
+                pass
+
+            assert main.AGENT.symbol == "AGENT"
+            ships = app.query_one("#tree-ships", Tree)
+            contracts = app.query_one("#tree-contracts", Tree)
+            assert len(ships.root.children[0].children) == 25
+            assert len(contracts.root.children[0].children) == 3
+
+            sent = mock_server.requests
+            app.query_one(TabbedContent).active = "ships"
+            await pilot.pause()
+            while await running(app, "ships"):
+                pass
+            assert mock_server.requests == sent
+
+    asyncio.run(log_in())
+
+
+def test_warm_up_errors(monkeypatch):
+    """Tests that a timeout or a response that isn't JSON during the warm up is
+    shown, rather than stopping the app."""
+    monkeypatch.setattr(main.CLIENT, "access_token", main.CLIENT.access_token)
+
+    async def log_in() -> list:
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.query_one("#input-access-token", Input).value = "mock-token"
+            app.query_one("#button-login", Button).press()
+            await pilot.pause()
+            while any(w.group == "warm-up" and w.is_running for w in app.workers):
+                await asyncio.sleep(0.01)
+            assert app.is_running
+            status = app.query_one(main.StatusBody).status_markdown
+            assert status.has_class("offline")
+            return [notification.title for notification in app._notifications]
+
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.Timeout,
+        )
+        m.get(URL.STATUS, text="<html>Bad Gateway</html>")
+        titles = asyncio.run(log_in())
+    assert "Unable to load" in titles
+
+
+def test_galaxy_import_runs_once(monkeypatch):
+    """Tests that the galaxy is imported once at a time, and that switching tabs
+    doesn't cancel the import."""
+    imports = []
+    # The first import runs until the second one has been asked for.
+    released = threading.Event()
+
+    def update_galaxy(client, galaxy, reset_date):
+        imports.append(reset_date)
+        released.wait(5)
+        return None
+
+    monkeypatch.setattr(main.s, "update_galaxy", update_galaxy)
+
+    async def import_twice() -> None:
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            app.pop_screen()
+            await pilot.pause()
+            body = app.query_one(main.StatusBody)
+            body.update_galaxy("2024-01-01")
+            await pilot.pause()
+            app.query_one(TabbedContent).active = "tab-metrics"
+            await pilot.pause()
+            body.update_galaxy("2024-01-01")
+            await pilot.pause()
+            released.set()
+            while any(w.group == "galaxy" and w.is_running for w in app.workers):
+                await asyncio.sleep(0.01)
+
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.ConnectionError,
+        )
+        asyncio.run(import_twice())
+    assert imports == ["2024-01-01"]
+
+
+def test_warm_start_from_snapshot(tmp_path, monkeypatch):
+    """Tests that logging in shows the ships, contracts, and agent of the last session
+    straight away, marked as stale, even when the server can't be reached."""
+    store = SnapshotStore(str(tmp_path))
+    ships = [{"symbol": f"AGENT-{index}", "fuel": {"current": 1}} for index in range(3)]
+    contracts = [{"id": "contract-1", "accepted": False}]
+    agent = {
+        "accountId": "account",
+        "symbol": "AGENT",
+        "headquarters": "X1-DF55-A1",
+        "credits": 1234,
+        "startingFaction": "COSMIC",
+    }
+    store.save("mock-token", "ships", ships)
+    store.save("mock-token", "contracts", contracts)
+    store.save("mock-token", "agent", agent)
+    monkeypatch.setattr(main, "SNAPSHOTS", SnapshotStore(str(tmp_path)))
+    monkeypatch.setattr(main.CLIENT, "access_token", main.CLIENT.access_token)
+
+    async def log_in() -> None:
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app.query_one("#input-access-token", Input).value = "mock-token"
+            app.query_one("#button-login", Button).press()
+            await pilot.pause()
+            while any(w.group == "warm-up" and w.is_running for w in app.workers):
+                await asyncio.sleep(0.01)
+
+            tree = app.query_one("#tree-ships", Tree)
+            assert [node.data for node in tree.root.children[0].children] == ships
+            assert app.query_one(main.ShipsBody).has_class("stale")
+            assert main.CONTRACTS["contract-1"] == contracts[0]
+            assert main.AGENT.my_credits == 1234
+
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.ConnectionError,
+        )
+        asyncio.run(log_in())
+
+
+def test_ship_event_under_modal():
+    """Tests that a ship arriving updates the ships tab while the login modal is shown
+    over it."""
+    ship = synthetic.make_ship(0, "AGENT")
+
+    async def arrive() -> None:
+        app = main.SpaceApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert isinstance(app.screen, main.LoginScreen)
+            await app.ship_event(ShipEvent(ship["symbol"], ARRIVAL, time.time()))
+            body = app.main_screen.query_one(main.ShipsBody)
+            assert body.ships_json[ship["symbol"]] == ship
+
+    with requests_mock.Mocker() as m:
+        m.register_uri(
+            requests_mock.ANY,
+            requests_mock.ANY,
+            exc=requests.exceptions.ConnectionError,
+        )
+        m.get(f"{URL.SHIPS}/{ship['symbol']}", json={"data": ship})
+        asyncio.run(arrive())
@@ -0,0 +1,91 @@
+import pytest
+import requests_mock
+from textual.widgets import Tree
+
+from spaceterminal import jsonTree as jt
+from spaceterminal import metrics, synthetic
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.constants import URL
+from spaceterminal.metrics import Histogram
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    metrics.REGISTRY.clear()
+    yield metrics.REGISTRY
+    metrics.REGISTRY.clear()
+
+
+def test_endpoint():
+    assert metrics.endpoint(f"{URL.SHIPS}?page=2&limit=20") == "/my/ships"
+    assert metrics.endpoint(f"{URL.SHIPS}/AGENT-1/orbit") == (
+        "/my/ships/{shipSymbol}/orbit"
+    )
+    assert metrics.endpoint(f"{URL.SYSTEMS}/X1-A/waypoints/X1-A-B/market") == (
+        "/systems/{systemSymbol}/waypoints/{waypointSymbol}/market"
+    )
+    assert metrics.endpoint(URL.STATUS) == "/"
+
+
+def test_histogram():
+    histogram = Histogram("test_seconds", "Test.", ("name",), buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value, name="a")
+
+    series = histogram.get(name="a")
+    assert series.counts == [1, 2, 1, 1]
+    assert series.count == 5 and series.sum == 16.5 and series.max == 10
+    assert 1 <= histogram.quantile(0.5, series) <= 2
+    assert histogram.quantile(1, series) == 10
+    assert histogram.quantile(0.5, histogram.get(name="b")) == 0
+
+    text = metrics.format_metric(histogram)
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{name="a",le="2"} 3' in text
+    assert 'test_seconds_bucket{name="a",le="+Inf"} 5' in text
+    assert 'test_seconds_sum{name="a"} 16.5' in text
+
+
+def test_client_metrics():
+    """Tests that the client measures each endpoint, the 429s, and the cache hits."""
+    scheduler = RequestScheduler(per_second=1000, burst=1000, backoff=0)
+    client = Client("mock-token", scheduler=scheduler)
+    with requests_mock.Mocker() as m:
+        m.get(URL.AGENT, json={"data": {}})
+        m.get(
+            f"{URL.SHIPS}/AGENT-1",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "0"}, "json": {}},
+                {"json": {"data": {}}},
+            ],
+        )
+        client.get(URL.AGENT)
+        client.get(URL.AGENT)
+        client.session.get(f"{URL.SHIPS}/AGENT-1")
+
+    labels = {"method": "GET", "endpoint": "/my/ships/{shipSymbol}"}
+    assert metrics.REQUESTS.value(**labels, status=429) == 1
+    assert metrics.REQUESTS.value(**labels, status=200) == 1
+    assert metrics.REQUESTS.value(method="GET", endpoint="/my/agent", status=200) == 1
+    assert metrics.REQUEST_SECONDS.get(**labels).count == 2
+    assert metrics.RATE_LIMITED.total() == 1
+    assert metrics.RETRIES.total() == 1
+    assert metrics.CACHE_HITS.total() == 1
+    assert metrics.LIMITER_WAIT_SECONDS.get(priority="user").count == 3
+
+    rows = metrics.endpoint_stats()
+    assert rows[0]["endpoint"] == "/my/ships/{shipSymbol}"
+    assert rows[0]["requests"] == 2 and rows[0]["rate_limited"] == 1
+
+
+def test_tree_metrics():
+    ships = [synthetic.make_ship(index) for index in range(20)]
+    node = Tree("Root").root.add("Ships")
+    jt.add_json(node, ships, lazy=True)
+    jt.load_all(node)
+    jt.update_json(node, ships, lazy=True)
+
+    for operation in ("add", "load_all", "update"):
+        assert metrics.TREE_SECONDS.get(operation=operation).count == 1
+    text = metrics.REGISTRY.to_prometheus()
+    assert 'spaceterminal_tree_build_seconds_count{operation="add"} 1' in text
@@ -0,0 +1,59 @@
+import pytest
+import requests
+
+from spaceterminal import space
+from spaceterminal.agent import Agent
+from spaceterminal.client import Client
+from spaceterminal.constants import URL
+from spaceterminal.mockserver import MockServer
+
+MOCK_SERVER = {"ships": 45, "contracts": 3}
+
+
+def test_set_base():
+    """Tests that every endpoint follows the base URL."""
+    base = URL.BASE
+    URL.set_base("http://localhost:8080/v2/")
+    try:
+        assert URL.BASE == "http://localhost:8080/v2"
+        assert URL.SHIPS == "http://localhost:8080/v2/my/ships"
+        assert URL.STATUS == "http://localhost:8080/v2/"
+    finally:
+        URL.set_base(base)
+    assert URL.SHIPS == f"{base}/my/ships"
+
+
+def test_mock_server_pagination(mock_server):
+    """Tests that the client fetches every page of ships from the mock server."""
+    client = Client("mock-token")
+    pages = list(space.get_my_ships_pages(client))
+    ships = [ship["symbol"] for page in pages for ship in page["data"]]
+    assert len(pages) == 3
+    assert ships == list(mock_server.state.ships)
+
+
+def test_mock_server_agent(mock_server):
+    """Tests the agent endpoints, and that they need a valid token."""
+    agent = Agent(Client("mock-token"))
+    agent.update_agent()
+    assert agent.symbol == "AGENT"
+
+    agent = Agent(Client("invalid-token"))
+    agent.update_agent()
+    assert agent.error["code"] == 4100
+
+    agent = Agent(Client())
+    agent.register_agent("NEW-AGENT", "cosmic")
+    assert agent.error is None
+    assert agent.symbol == "NEW-AGENT"
+    assert agent.client.access_token in mock_server.state.tokens
+
+
+def test_mock_server_rate_limit():
+    """Tests that requests over the rate limit get a 429 with Retry-After."""
+    with MockServer(per_second=1, burst=2) as server:
+        responses = [requests.get(f"{server.base_url}/") for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert float(responses[2].headers["Retry-After"]) > 0
+    assert responses[2].json()["error"]["code"] == 429
+    assert server.rate_limited == 1
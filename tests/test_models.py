@@ -0,0 +1,68 @@
+import datetime
+import sys
+
+from spaceterminal.models import Contract, ServerStatus, Ship, ShipModels
+from spaceterminal.synthetic import make_contract, make_ship
+
+JSON_STATUS = {
+    "status": "SpaceTraders is currently online and available to play",
+    "version": "v2.2.0",
+    "resetDate": "2024-06-16",
+    "description": "SpaceTraders is a headless game.",
+    "stats": {"agents": 1000, "ships": 5000, "systems": 8000, "waypoints": 80000},
+    "serverResets": {"next": "2024-06-30T16:00:00.000Z", "frequency": "fortnightly"},
+}
+
+
+def test_ship_from_json():
+    """Tests that a ship and its nav, fuel, and cargo are decoded."""
+    data = make_ship(0)
+    ship = Ship.from_json(data)
+    assert ship.symbol == data["symbol"]
+    assert ship.role == data["registration"]["role"]
+    assert ship.nav.waypoint_symbol == data["nav"]["waypointSymbol"]
+    assert ship.nav.route.destination.x == data["nav"]["route"]["destination"]["x"]
+    assert ship.nav.route.arrival == datetime.datetime.fromisoformat(
+        data["nav"]["route"]["arrival"].replace("Z", "+00:00")
+    )
+    assert ship.fuel.current == data["fuel"]["current"]
+    assert ship.cargo.units == data["cargo"]["units"]
+    assert len(ship.cargo.inventory) == len(data["cargo"]["inventory"])
+    assert ship.cooldown.expiration is None
+
+
+def test_ship_models():
+    """Tests that the JSON of a ship is decoded once, and again once it is replaced."""
+    models = ShipModels()
+    data = make_ship(0)
+    ship = models.decode(data)
+    assert models.decode(data) is ship
+    data = make_ship(0)
+    assert models.decode(data) is not ship
+    assert models.decode(data) == ship
+
+
+def test_models_are_slotted():
+    """Tests that the models don't carry a __dict__ per instance."""
+    ship = Ship.from_json(make_ship(0))
+    assert not hasattr(ship, "__dict__")
+    assert not hasattr(ship.nav, "__dict__")
+    assert sys.getsizeof(ship) < sys.getsizeof(make_ship(0))
+
+
+def test_contract_from_json():
+    data = make_contract(0)
+    contract = Contract.from_json(data)
+    assert contract.id == data["id"]
+    assert contract.terms.on_fulfilled == data["terms"]["payment"]["onFulfilled"]
+    assert contract.terms.deliver[0].trade_symbol == (
+        data["terms"]["deliver"][0]["tradeSymbol"]
+    )
+    assert not contract.accepted
+
+
+def test_server_status_from_json():
+    status = ServerStatus.from_json(JSON_STATUS)
+    assert status.waypoints == 80000
+    assert status.reset_date == "2024-06-16"
+    assert status.reset_frequency == "fortnightly"
@@ -0,0 +1,83 @@
+from spaceterminal import navigation, synthetic
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.models import Ship
+from spaceterminal.navigation import RoutePlanner, SpatialGrid
+
+# A line of points 100 apart, with fuel only sold at B.
+POINTS = {"A": (0, 0), "B": (100, 0), "C": (200, 0), "D": (300, 0)}
+
+
+def test_spatial_grid():
+    """Tests that the grid finds the same points as measuring every point."""
+    grid = SpatialGrid(cell_size=50)
+    systems = synthetic.make_galaxy(200, waypoints=0)
+    for system in systems:
+        grid.insert(system["symbol"], system["x"], system["y"])
+    found = {symbol for symbol, _ in grid.within(0, 0, 1500)}
+    expected = {
+        system["symbol"]
+        for system in systems
+        if (system["x"] ** 2 + system["y"] ** 2) ** 0.5 <= 1500
+    }
+    assert found == expected
+
+
+def test_plan_direct():
+    """Tests that the fastest mode the fuel allows is used."""
+    planner = RoutePlanner(POINTS)
+    route = planner.plan("A", "B", speed=10, fuel=400, fuel_capacity=400)
+    assert [(leg.origin, leg.destination, leg.mode) for leg in route.legs] == [
+        ("A", "B", "BURN")
+    ]
+    assert route.fuel == navigation.leg_fuel(100, "BURN") == 200
+    assert route.seconds == navigation.leg_seconds(100, "BURN", 10)
+
+    route = planner.plan("A", "B", speed=10, fuel=150, fuel_capacity=400)
+    assert route.legs[0].mode == "CRUISE"
+    assert route.fuel == 100
+
+
+def test_plan_refuel():
+    """Tests that the route stops to refuel when the tank is too small."""
+    planner = RoutePlanner(POINTS, refuel={"B"})
+    route = planner.plan(
+        "A", "D", speed=10, fuel=150, fuel_capacity=200, modes=("CRUISE",)
+    )
+    assert [leg.destination for leg in route.legs] == ["B", "D"]
+    assert route.refuels == ["B"]
+    assert route.legs[-1].arrival == sum(leg.seconds for leg in route.legs)
+
+    # Without fuel at B, the ship can't make it without drifting.
+    planner = RoutePlanner(POINTS)
+    assert (
+        planner.plan("A", "D", speed=10, fuel=150, fuel_capacity=200, modes=("CRUISE",))
+        is None
+    )
+    route = planner.plan("A", "D", speed=10, fuel=150, fuel_capacity=200)
+    assert "DRIFT" in [leg.mode for leg in route.legs]
+
+
+def test_plan_no_fuel():
+    """Tests that ships without fuel can fly anywhere within the longest leg."""
+    planner = RoutePlanner(POINTS)
+    route = planner.plan("A", "D", speed=10, fuel=0, fuel_capacity=0, max_leg=150)
+    assert len(route.legs) == 3
+    assert route.fuel == 0
+    assert planner.plan("A", "A", speed=10, fuel=0, fuel_capacity=0).legs == []
+    assert planner.plan("A", "X", speed=10, fuel=0, fuel_capacity=0) is None
+
+
+def test_plan_galaxy(tmp_path):
+    """Tests planning between the systems of the galaxy index, for a ship."""
+    index = GalaxyIndex(str(tmp_path / "galaxy.sqlite3"))
+    systems = synthetic.make_galaxy(300, waypoints=0)
+    index.import_systems(systems, "2024-01-01")
+    planner = RoutePlanner.from_galaxy(index)
+    index.close()
+
+    ship = Ship.from_json(synthetic.make_ship(0))
+    ship.nav.system_symbol = "X1-S1"
+    ship.fuel.capacity = ship.fuel.current = 0
+    route = planner.plan_ship(ship, "X1-S2", max_leg=5000)
+    assert route.legs[0].origin == "X1-S1"
+    assert route.legs[-1].destination == "X1-S2"
@@ -0,0 +1,121 @@
+import datetime
+import email.utils
+import json
+import time
+
+import pytest
+
+from spaceterminal import space
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.constants import URL
+from spaceterminal.recording import REDACTED, Recorder, ReplayAdapter, read_log
+
+MOCK_SERVER = {"ships": 45, "latency": 0.05}
+
+
+@pytest.fixture
+def recorded(tmp_path, mock_server):
+    """Records a session against the mock server, with 50 ms of latency."""
+    path = str(tmp_path / "session.jsonl")
+    recorder = Recorder(path)
+    scheduler = RequestScheduler(per_second=1000, burst=1000)
+    client = Client("mock-token", scheduler=scheduler, recorder=recorder)
+    pages = list(space.get_my_ships_pages(client))
+    agent = client.get(URL.AGENT).json()
+    missing = space.get_my_ship(client, "MISSING").status_code
+    recorder.close()
+    return path, pages, agent, missing
+
+
+def test_record(recorded):
+    path, pages, _, _ = recorded
+    entries = read_log(path)
+    assert len(entries) == len(pages) + 2
+    assert entries[0]["u"] == "/my/ships?page=1&limit=20"
+    assert entries[0]["ms"] >= 50
+    assert entries[-1]["s"] == 404
+    with open(path) as file:
+        assert "mock-token" not in file.read()
+
+
+def test_record_redacts_token(tmp_path, mock_server):
+    """Tests that the access token of a newly registered agent isn't in the log."""
+    path = str(tmp_path / "session.jsonl")
+    recorder = Recorder(path)
+    client = Client(recorder=recorder)
+    response = client.post(
+        URL.REGISTER, json={"symbol": "RECORDED", "faction": "COSMIC"}
+    )
+    recorder.close()
+    token = response.json()["data"]["token"]
+    with open(path) as file:
+        assert token not in file.read()
+    [entry] = read_log(path)
+    assert json.loads(entry["r"])["data"]["token"] == REDACTED
+
+
+def test_replay(recorded):
+    """Tests that a replay serves the recorded responses without a server."""
+    path, pages, agent, missing = recorded
+    replay = ReplayAdapter(path, speed=0)
+    client = Client("mock-token", replay=replay)
+
+    start = time.perf_counter()
+    assert list(space.get_my_ships_pages(client)) == pages
+    assert client.get(URL.AGENT).json() == agent
+    assert space.get_my_ship(client, "MISSING").status_code == missing
+    assert time.perf_counter() - start < 0.1
+    assert replay.served == len(pages) + 2
+
+    # The last response is served again once the recorded ones run out.
+    assert client.session.get(URL.AGENT).json() == agent
+    assert client.session.get(URL.CONTRACTS).status_code == 404
+    assert replay.missed == 1
+    assert client.connections_opened == 0
+
+
+def test_replay_timing(recorded):
+    """Tests that a replay takes the recorded time, divided by its speed."""
+    path, pages, _, _ = recorded
+    recorded_seconds = sum(entry["ms"] for entry in read_log(path)[:3]) / 1000
+
+    client = Client("mock-token", replay=ReplayAdapter(path, speed=1))
+    start = time.perf_counter()
+    list(space.get_my_ships_pages(client))
+    assert time.perf_counter() - start >= recorded_seconds / 2
+
+    client = Client("mock-token", replay=ReplayAdapter(path, speed=10))
+    start = time.perf_counter()
+    list(space.get_my_ships_pages(client))
+    assert time.perf_counter() - start < recorded_seconds / 2
+
+
+def test_replay_headers(tmp_path):
+    """Tests that the rate limit is sped up with the replay."""
+    path = tmp_path / "session.jsonl"
+    entry = {
+        "t": 0,
+        "ms": 0,
+        "m": "GET",
+        "u": "/my/agent",
+        "b": None,
+        "s": 429,
+        "h": {"Retry-After": "1.000", "x-ratelimit-limit-per-second": "2"},
+        "r": "{}",
+    }
+    # The last line was cut short, like by a crash while recording.
+    path.write_text(json.dumps(entry) + "\n" + '{"t": 1, "ms"')
+    assert len(read_log(str(path))) == 1
+
+    headers = ReplayAdapter(str(path), speed=4).scale_headers(entry["h"])
+    assert float(headers["Retry-After"]) == 0.25
+    assert float(headers["x-ratelimit-limit-per-second"]) == 8
+    date = email.utils.format_datetime(
+        datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=40),
+        usegmt=True,
+    )
+    headers = ReplayAdapter(str(path), speed=4).scale_headers({"Retry-After": date})
+    assert 9 <= float(headers["Retry-After"]) <= 10
+    headers = ReplayAdapter(str(path), speed=0).scale_headers(entry["h"])
+    assert headers["Retry-After"] == "0"
+    assert "x-ratelimit-limit-per-second" not in headers
@@ -0,0 +1,52 @@
+import copy
+
+from spaceterminal import synthetic
+from spaceterminal.search import SearchIndex
+
+
+def test_search_prefix_and_words():
+    ships = synthetic.make_fleet(5)
+    index = SearchIndex()
+    assert index.update("ships", ships) == 5
+
+    waypoint = ships[2]["nav"]["waypointSymbol"]
+    system, _ = waypoint.rsplit("-", 1)
+    # The whole value, a prefix of it, or one of its words all match.
+    for query in (waypoint, system.lower(), waypoint.split("-")[1]):
+        matches = index.search(query)
+        assert ("symbol", ships[2]["symbol"]) in {match.key for match in matches}
+
+    matches = index.search(f"{ships[2]['symbol']} {waypoint}")
+    assert {match.key for match in matches} == {("symbol", ships[2]["symbol"])}
+    assert ("nav", "waypointSymbol") in {match.path for match in matches}
+    assert index.search("no-such-thing") == []
+    assert index.search("   ") == []
+
+
+def test_search_updates_incrementally():
+    ships = synthetic.make_fleet(3)
+    contracts = [synthetic.make_contract(0)]
+    index = SearchIndex()
+    index.update("ships", ships)
+    index.update("contracts", contracts)
+
+    good = contracts[0]["terms"]["deliver"][0]["tradeSymbol"]
+    assert index.search(good, "contracts")
+    assert not index.search(good, "ships")
+
+    # Only the ship that changed is indexed again.
+    refreshed = copy.deepcopy(ships)
+    refreshed[1]["nav"]["waypointSymbol"] = "X9-NEW-WAYPOINT"
+    assert index.update("ships", refreshed) == 1
+    assert [match.key for match in index.search("x9-new")] == [
+        ("symbol", ships[1]["symbol"])
+    ]
+    old = ships[1]["nav"]["waypointSymbol"]
+    assert ("symbol", ships[1]["symbol"]) not in {
+        match.key for match in index.search(old) if match.path[-1] == "waypointSymbol"
+    }
+
+    assert index.keep("ships", refreshed[:1]) == 2
+    assert len(index) == 2
+    assert index.search("x9-new") == []
+    assert index.search(good)
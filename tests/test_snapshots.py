@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+import time
+
+from spaceterminal import snapshots
+from spaceterminal.snapshots import SnapshotStore
+
+
+def test_save_and_load(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    ships = [{"symbol": "AGENT-1", "nav": {"status": "DOCKED"}}]
+    assert store.load("token") == {}
+
+    assert store.save("token", "ships", ships)
+    assert not store.save("token", "ships", json.loads(json.dumps(ships)))
+    assert store.save("token", "agent", {"symbol": "AGENT"})
+
+    loaded = SnapshotStore(str(tmp_path)).load("token")
+    assert loaded["ships"]["data"] == ships
+    assert loaded["agent"]["data"] == {"symbol": "AGENT"}
+    assert loaded["ships"]["saved"] <= loaded["agent"]["saved"]
+    assert SnapshotStore(str(tmp_path)).load("other") == {}
+    assert SnapshotStore(str(tmp_path)).load(None) == {}
+
+
+def test_save_unchanged(tmp_path, monkeypatch):
+    """Tests that saving unchanged data updates its saved time, and only writes it
+    once the file is old enough."""
+    store = SnapshotStore(str(tmp_path))
+    store.save("token", "agent", {"symbol": "AGENT"})
+    saved = store.load("token")["agent"]["saved"]
+    time.sleep(0.01)
+
+    assert not store.save("token", "agent", {"symbol": "AGENT"})
+    assert store.load("token")["agent"]["saved"] > saved
+    assert SnapshotStore(str(tmp_path)).load("token")["agent"]["saved"] == saved
+
+    monkeypatch.setattr(snapshots, "TOUCH_INTERVAL", 0)
+    assert store.save("token", "agent", {"symbol": "AGENT"})
+    assert SnapshotStore(str(tmp_path)).load("token")["agent"]["saved"] > saved
+
+
+def test_file(tmp_path):
+    """Tests that the file is compressed, doesn't contain the token, and is ignored
+    when it is from another version or unreadable."""
+    store = SnapshotStore(str(tmp_path))
+    store.save("secret-token", "status", {"status": "OK"})
+    path = store.path("secret-token")
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    assert "secret-token" not in path
+
+    with gzip.open(path, "rt") as file:
+        contents = json.load(file)
+    assert contents["version"] == snapshots.SNAPSHOT_VERSION
+
+    contents["version"] += 1
+    with gzip.open(path, "wt") as file:
+        json.dump(contents, file)
+    assert SnapshotStore(str(tmp_path)).load("secret-token") == {}
+
+    with open(path, "wb") as file:
+        file.write(b"not gzip")
+    assert SnapshotStore(str(tmp_path)).load("secret-token") == {}
@@ -0,0 +1,55 @@
+import requests_mock
+
+from spaceterminal import space
+from spaceterminal.client import Client
+from spaceterminal.constants import URL
+
+JSON_FACTIONS = {
+    "data": [
+        {"symbol": "COSMIC", "isRecruiting": True},
+        {"symbol": "VOID", "isRecruiting": False},
+    ]
+}
+
+
+def test_get_factions_list_cached(tmp_path):
+    """Tests that the recruiting factions are cached on disk until they expire."""
+    cache_file = str(tmp_path / "factions.json")
+    with requests_mock.Mocker() as m:
+        m.get(URL.FACTIONS, json=JSON_FACTIONS)
+        assert space.get_factions_list(cache_file) == ["COSMIC"]
+        assert space.get_factions_list(cache_file) == ["COSMIC"]
+        assert m.call_count == 1
+
+        assert space.get_factions_list(cache_file, max_age=-1) == ["COSMIC"]
+        assert m.call_count == 2
+
+
+def ships_page(request, context):
+    """Creates a page of ships for the requested page and limit."""
+    page = int(request.qs["page"][0])
+    limit = int(request.qs["limit"][0])
+    total = 45
+    start = (page - 1) * limit
+    data = [{"symbol": f"SHIP-{i}"} for i in range(start, min(start + limit, total))]
+    return {"data": data, "meta": {"total": total, "page": page, "limit": limit}}
+
+
+def test_get_pages():
+    """Tests that every page is fetched with the largest page size, in order."""
+    with requests_mock.Mocker() as m:
+        m.get(URL.SHIPS, json=ships_page)
+        pages = list(space.get_my_ships_pages(Client("token")))
+        assert [page["meta"]["page"] for page in pages] == [1, 2, 3]
+        symbols = [ship["symbol"] for page in pages for ship in page["data"]]
+        assert symbols == [f"SHIP-{i}" for i in range(45)]
+        assert m.call_count == 3
+        assert all(r.qs["limit"] == [str(space.PAGE_LIMIT)] for r in m.request_history)
+
+
+def test_get_pages_error():
+    """Tests that an error page is yielded and stops the pagination."""
+    error = {"error": {"message": "A failed response", "code": 4103}}
+    with requests_mock.Mocker() as m:
+        m.get(URL.SHIPS, json=error, status_code=401)
+        assert list(space.get_my_ships_pages(Client("token"))) == [error]
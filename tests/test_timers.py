@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from spaceterminal import space, synthetic
+from spaceterminal.client import Client
+from spaceterminal.models import Ship
+from spaceterminal.timers import ARRIVAL, COOLDOWN, GRACE, ShipTimers
+
+
+def make_ship(index: int, arrival: float = None, cooldown: float = None) -> Ship:
+    """Creates a ship in transit until arrival, with a cooldown that runs out at
+    cooldown, both in seconds from now."""
+    data = synthetic.make_ship(index)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if arrival is not None:
+        data["nav"]["status"] = "IN_TRANSIT"
+        data["nav"]["route"]["arrival"] = synthetic.format_time(
+            now + datetime.timedelta(seconds=arrival)
+        )
+    else:
+        data["nav"]["status"] = "DOCKED"
+    if cooldown is not None:
+        data["cooldown"]["expiration"] = synthetic.format_time(
+            now + datetime.timedelta(seconds=cooldown)
+        )
+    return Ship.from_json(data)
+
+
+def test_timers_fire_in_order():
+    timers = ShipTimers()
+    timers.update_fleet(
+        [
+            make_ship(0, arrival=30),
+            make_ship(1, arrival=10, cooldown=20),
+            make_ship(2),
+        ]
+    )
+    assert len(timers) == 3
+
+    now = time.time()
+    assert timers.pop_due(now) == []
+    events = timers.pop_due(now + 60)
+    assert [(event.ship_symbol, event.kind) for event in events] == [
+        ("AGENT-2", ARRIVAL),
+        ("AGENT-2", COOLDOWN),
+        ("AGENT-1", ARRIVAL),
+    ]
+    assert len(timers) == 0
+
+
+def test_timers_reschedule_and_cancel():
+    """Tests that replaced and cancelled timers never fire."""
+    timers = ShipTimers()
+    timers.update_ship(make_ship(0, arrival=10))
+    timers.update_ship(make_ship(0, arrival=100))
+    timers.update_fleet([make_ship(1, arrival=10)])
+
+    assert len(timers) == 1
+    events = timers.pop_due(time.time() + 1000)
+    assert [event.ship_symbol for event in events] == ["AGENT-2"]
+
+
+def test_timers_run():
+    """Tests that run wakes up for a timer added while it was waiting."""
+    timers = ShipTimers()
+    fired = []
+
+    async def callback(event):
+        fired.append(event)
+
+    async def main():
+        task = asyncio.create_task(timers.run(callback))
+        await asyncio.sleep(0.01)
+        timers.schedule("AGENT-1", ARRIVAL, time.time() + 0.05)
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(main())
+    assert [event.ship_symbol for event in fired] == ["AGENT-1"]
+
+
+def test_timers_run_slow_callback():
+    """Tests that a slow callback doesn't hold back the timers after it."""
+    timers = ShipTimers()
+    fired = []
+
+    async def callback(event):
+        fired.append(event.ship_symbol)
+        if event.ship_symbol == "AGENT-1":
+            await asyncio.sleep(1)
+
+    async def main():
+        task = asyncio.create_task(timers.run(callback))
+        timers.schedule("AGENT-1", ARRIVAL, time.time())
+        timers.schedule("AGENT-2", ARRIVAL, time.time() + 0.05)
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(main())
+    assert fired == ["AGENT-1", "AGENT-2"]
+
+
+@pytest.mark.parametrize("mock_server", [{"ships": 3}], indirect=True)
+def test_get_my_ship_after_arrival(mock_server):
+    """Tests that the mock server puts a ship in orbit once it arrives, and that the
+    single ship refresh skips the cached ships."""
+    client = Client("mock-token")
+    ship = mock_server.state.ships["AGENT-1"]
+    ship["nav"]["status"] = "IN_TRANSIT"
+    ship["nav"]["route"]["arrival"] = synthetic.format_time(
+        datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=0.2)
+    )
+    page = space.get_my_ships(client).json()
+    assert page["data"][0]["nav"]["status"] == "IN_TRANSIT"
+
+    time.sleep(0.2 + GRACE / 10)
+    response = space.get_my_ship(client, "AGENT-1")
+    nav = response.json()["data"]["nav"]
+    assert nav["status"] == "IN_ORBIT"
+    assert nav["waypointSymbol"] == nav["route"]["destination"]["symbol"]
+    page = space.get_my_ships(client).json()
+    assert page["data"][0]["nav"]["status"] == "IN_ORBIT"
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from spaceterminal import synthetic
+from spaceterminal.timeseries import (
+    DAY,
+    ROLLUP,
+    SAMPLE,
+    Series,
+    TimeSeriesStore,
+    market_samples,
+    read_records,
+    ship_samples,
+)
+
+START = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(str(tmp_path / "timeseries"))
+
+
+def test_append_and_read(store):
+    """Tests that samples are read back from the files in order."""
+    series = store.series("credits")
+    for minute in range(100):
+        series.append(1000 + minute, START + minute * 60)
+
+    samples = series.read()
+    assert len(samples) == len(series) == 100
+    assert samples.dtype == SAMPLE
+    assert samples["value"][0] == 1000
+    assert series.last() == (START + 99 * 60, 1099)
+
+    # A new store reads the same files.
+    reopened = TimeSeriesStore(store.directory).series("credits")
+    assert len(reopened.read(START + 10 * 60, START + 19 * 60)) == 10
+
+
+def test_read_is_memory_mapped(store):
+    series = store.series("credits")
+    series.append(1, START)
+    assert isinstance(read_records(series.raw_path, SAMPLE), np.memmap)
+
+
+def test_downsample(store):
+    """Tests averaging the samples into buckets, with empty buckets left as NaN."""
+    series = store.series("credits")
+    for minute in range(60):
+        series.append(minute, START + minute * 60)
+
+    values = series.downsample(START, START + 120 * 60, 4)
+    assert values[0] == pytest.approx(np.mean(range(30)))
+    assert values[1] == pytest.approx(np.mean(range(30, 60)))
+    assert np.isnan(values[2:]).all()
+
+
+def test_compact_rolls_up_old_samples(tmp_path):
+    """Tests that samples past the raw retention are rolled up into hours, and the
+    rollups past their retention are dropped."""
+    series = Series(
+        str(tmp_path / "credits"),
+        raw_retention=DAY,
+        rollup_interval=3600,
+        rollup_retention=3 * DAY,
+    )
+    values = np.arange(4 * 24 * 60, dtype=float)
+    # Appending compacts once the oldest sample is a day past the retention.
+    for minute, value in enumerate(values):
+        series.append(value, START + minute * 60)
+    now = START + len(values) * 60
+    series.compact(now)
+
+    rollups = read_records(series.rollup_path, ROLLUP)
+    samples = read_records(series.raw_path, SAMPLE)
+    assert samples[0]["time"] >= now - DAY - 3600
+    assert rollups[0]["time"] >= now - 3 * DAY
+    assert rollups[-1]["time"] + 3600 == samples[0]["time"]
+    # Each hour of minutes is one rollup.
+    assert (rollups["count"] == 60).all()
+    first = int((rollups[0]["time"] - START) // 60)
+    assert rollups[0]["mean"] == pytest.approx(values[first : first + 60].mean())
+    assert rollups[0]["min"] == values[first]
+    assert rollups[0]["max"] == values[first + 59]
+
+    # Reads cover the rollups and the samples, in order.
+    combined = series.read()
+    assert len(combined) == len(rollups) + len(samples)
+    assert (np.diff(combined["time"]) > 0).all()
+
+
+def test_series_names(store):
+    with pytest.raises(ValueError):
+        store.series("../credits")
+    store.record({"credits": 1, "ship.AGENT-1.fuel": 2}, START)
+    assert store.names() == ["credits", "ship.AGENT-1.fuel"]
+
+
+def test_record_changed_only(store):
+    """Tests that the same values seen again aren't recorded twice."""
+    store.record({"credits": 1, "fuel": 2}, START, changed_only=True)
+    store.record({"credits": 1, "fuel": 3}, START + 60, changed_only=True)
+    assert len(store.series("credits")) == 1
+    assert store.series("fuel").last() == (START + 60, 3)
+
+
+def test_samples():
+    """Tests the names of the samples of ships and markets."""
+    ship = synthetic.make_ship(0)
+    samples = ship_samples([ship])
+    assert samples[f"ship.{ship['symbol']}.fuel"] == ship["fuel"]["current"]
+    assert samples[f"ship.{ship['symbol']}.cargo"] == ship["cargo"]["units"]
+
+    market = synthetic.make_market("X1-S1-A1")
+    samples = market_samples(market)
+    assert len(samples) == 2 * len(market["tradeGoods"])
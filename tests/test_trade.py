@@ -0,0 +1,180 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from spaceterminal import space, synthetic, trade
+from spaceterminal.client import Client, RequestScheduler
+from spaceterminal.galaxy import GalaxyIndex
+from spaceterminal.markets import MarketStore
+from spaceterminal.navigation import leg_seconds
+from spaceterminal.timeseries import TimeSeriesStore
+from spaceterminal.trade import MarketSnapshot
+
+NAN = np.nan
+
+
+def make_snapshot() -> MarketSnapshot:
+    """Three markets in one system, 100 apart, trading IRON and COPPER."""
+    return MarketSnapshot(
+        markets=["A", "B", "C"],
+        goods=["COPPER", "IRON"],
+        purchase=np.array([[NAN, 10], [50, NAN], [NAN, NAN]], np.float32),
+        sell=np.array([[NAN, 8], [40, 30], [100, 20]], np.float32),
+        positions=np.array([[0, 0, 0, 0], [0, 0, 100, 0], [0, 0, 200, 0]], np.float32),
+        systems=np.array([0, 0, 0]),
+        system_ids={"X1-S1": 0},
+    )
+
+
+def test_rank_routes():
+    """Tests that the routes are the best good for each pair, by profit per second."""
+    routes = make_snapshot().rank_routes(10, 0, speed=10)
+    assert [(r.source, r.destination, r.good) for r in routes] == [
+        ("B", "C", "COPPER"),
+        ("A", "B", "IRON"),
+        ("A", "C", "IRON"),
+    ]
+    assert routes[0].profit == (100 - 50) * 10
+    assert routes[0].seconds == leg_seconds(100, "CRUISE", 10)
+    assert routes[0].fuel == 0
+
+
+def test_rank_routes_fuel():
+    """Tests that fuel is paid for, and that each trade has to fit in the tank."""
+    snapshot = make_snapshot()
+    routes = snapshot.rank_routes(10, 150, speed=10, fuel_price=1)
+    assert [(r.source, r.destination) for r in routes] == [("B", "C"), ("A", "B")]
+    assert routes[0].profit == 500 - 100
+    assert routes[0].fuel == 100
+
+    # Flying from A to the source B adds the time and fuel of the first leg.
+    routes = snapshot.rank_routes(
+        10, 150, speed=10, fuel_price=1, origin=("X1-S1", 0, 0, 0, 0)
+    )
+    b_to_c = next(r for r in routes if r.source == "B")
+    assert b_to_c.fuel == 200
+    assert b_to_c.seconds == 2 * leg_seconds(100, "CRUISE", 10)
+
+
+@pytest.mark.parametrize(
+    "fuel_capacity, origin", [(0, None), (60, ("X1-S9", 10, -20, 0, 0))]
+)
+def test_rank_routes_matches_pairs(fuel_capacity, origin):
+    """Tests the batched ranking against scoring each pair and good one at a time."""
+    rng = np.random.default_rng(0)
+    count, goods = 40, 6
+    purchase = rng.integers(10, 100, (count, goods)).astype(np.float32)
+    sell = np.round(purchase * rng.uniform(0.5, 1.5, (count, goods))).astype(np.float32)
+    purchase[rng.random((count, goods)) < 0.5] = NAN
+    sell[rng.random((count, goods)) < 0.5] = NAN
+    snapshot = MarketSnapshot(
+        [f"M{i}" for i in range(count)],
+        [f"G{i}" for i in range(goods)],
+        purchase,
+        sell,
+        rng.integers(-50, 50, (count, 4)).astype(np.float32),
+        rng.integers(0, 3, count),
+    )
+    fuel_price = 1 if fuel_capacity else 0
+
+    expected = []
+    distances = snapshot.distances(np.arange(count))
+    for source, destination in itertools.permutations(range(count), 2):
+        margin = np.nanmax(sell[destination] - purchase[source], initial=-np.inf)
+        fuel = max(1, round(distances[source, destination]))
+        if fuel_capacity and fuel > fuel_capacity:
+            continue
+        seconds = leg_seconds(distances[source, destination], "CRUISE", 10)
+        if origin is not None:
+            distance = np.hypot(*(snapshot.positions[source, :2] - origin[1:3]))
+            fuel += max(1, round(distance))
+            seconds += leg_seconds(distance, "CRUISE", 10)
+        profit = margin * 5 - fuel * fuel_price
+        if profit > 0:
+            expected.append(profit / seconds)
+    expected.sort(reverse=True)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # Small blocks, so the best routes of several blocks are merged.
+        monkeypatch.setattr(trade, "BLOCK_SIZE", 7)
+        routes = snapshot.rank_routes(
+            5, fuel_capacity, speed=10, origin=origin, fuel_price=fuel_price, limit=15
+        )
+    assert [r.profit_per_second for r in routes] == pytest.approx(expected[:15])
+
+
+def test_rank_routes_speed():
+    """Tests that the routes between 5,000 markets, in systems of 5, are ranked
+    quickly, as most pairs are ruled out before their margins are worked out."""
+    rng = np.random.default_rng(0)
+    count, goods = 5000, 20
+    purchase = rng.integers(10, 1000, (count, goods)).astype(np.float32)
+    sell = np.round(purchase * rng.uniform(0.5, 1.5, (count, goods))).astype(np.float32)
+    purchase[rng.random((count, goods)) < 0.7] = NAN
+    sell[rng.random((count, goods)) < 0.7] = NAN
+    systems = np.arange(count) // 5
+    positions = np.hstack(
+        [
+            rng.integers(-5000, 5000, (count // 5, 2)).repeat(5, axis=0),
+            rng.integers(-100, 100, (count, 2)),
+        ]
+    ).astype(np.float32)
+    snapshot = MarketSnapshot(
+        [f"M{i}" for i in range(count)],
+        [f"G{i}" for i in range(goods)],
+        purchase,
+        sell,
+        positions,
+        systems,
+    )
+
+    start = time.perf_counter()
+    routes = snapshot.rank_routes(60, 400, speed=30, fuel_price=72)
+    assert time.perf_counter() - start < 1
+    assert len(routes) == 20
+    scores = [route.profit_per_second for route in routes]
+    assert scores == sorted(scores, reverse=True)
+    assert all(route.profit > 0 for route in routes)
+
+
+def test_market_store(tmp_path):
+    """Tests that the latest prices of a market replace the old ones."""
+    store = MarketStore(str(tmp_path / "markets.sqlite3"))
+    market = synthetic.make_market("X1-S1-W1")
+    assert store.store(market) == len(market["tradeGoods"])
+    assert store.store({"symbol": "X1-S1-W2", "imports": []}) == 0
+
+    market["tradeGoods"] = market["tradeGoods"][:1]
+    store.store(market)
+    goods = store.goods("X1-S1-W1")
+    assert [good["symbol"] for good in goods] == [market["tradeGoods"][0]["symbol"]]
+    assert store.stats() == {"markets": 1, "prices": 1}
+    assert store.prices(max_age=-1) == []
+    store.close()
+
+
+@pytest.mark.parametrize("mock_server", [{"systems": 5}], indirect=True)
+def test_update_markets(tmp_path, mock_server):
+    """Tests ranking the routes from the markets of the mock server."""
+    galaxy = GalaxyIndex(str(tmp_path / "galaxy.sqlite3"))
+    store = MarketStore(str(tmp_path / "markets.sqlite3"))
+    timeseries = TimeSeriesStore(str(tmp_path / "timeseries"))
+    scheduler = RequestScheduler(per_second=1000, burst=1000)
+    client = Client("mock-token", scheduler=scheduler)
+    space.update_galaxy(client, galaxy, "2024-01-01")
+    waypoints = [w["symbol"] for w in mock_server.state.systems["X1-S1"]["waypoints"]]
+    updated = space.update_markets(client, store, waypoints, timeseries)
+    assert updated > 1
+
+    # Each good of each market has a purchase and a sell series.
+    assert len(timeseries.names()) == 2 * store.stats()["prices"]
+
+    snapshot = MarketSnapshot.from_store(store, galaxy)
+    assert len(snapshot.markets) == store.stats()["markets"]
+    routes = snapshot.rank_routes(60, 0, speed=10)
+    assert routes
+    assert all(route.profit > 0 for route in routes)
+    galaxy.close()
+    store.close()